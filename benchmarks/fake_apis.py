@@ -0,0 +1,327 @@
+"""
+Stand-in Graph API, LinkedIn v2 API and Telegram Bot API for benchmarks.
+
+One local server answers for all three, picking the API by the request's Host header
+(``graph.facebook.com``, ``graph-video.facebook.com``, ``api.linkedin.com``,
+``api.telegram.org``); any other host serves a small JPEG, for media downloads. Responses
+have the shapes the managers read: paginated posts with embedded comments, batch results,
+Instagram containers, chunked video sessions, LinkedIn upload registrations, Telegram
+messages. Every response waits ``--latency-ms`` (+/- ``--jitter-ms``), a ``--error-rate``
+fraction fails with a transient 5xx and a ``--throttle-rate`` fraction is rejected as rate
+limited (Graph error code 4, HTTP 429 with ``Retry-After`` on LinkedIn and Telegram). Graph
+responses report ``--usage-pct`` in the ``X-App-Usage`` and ``X-Business-Use-Case-Usage``
+headers.
+
+    python benchmarks/fake_apis.py --port 8900 --latency-ms 40 --jitter-ms 10 --error-rate 0.01
+
+Clients reach the server through ``FakeAPITransport``, which sends every request to it
+while keeping the original Host header:
+
+    client = httpx.AsyncClient(transport=FakeAPITransport("http://127.0.0.1:8900"))
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+
+@dataclass
+class FakeAPIConfig:
+    latency_ms: float = 20.0
+    jitter_ms: float = 5.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    usage_pct: float = 10.0
+    posts: int = 200
+    comments_per_post: int = 60
+    video_chunk_size: int = 16 * 1024
+
+
+NEGATIVE_MESSAGES = ("This is a scam, terrible service", "Worst experience ever, awful support")
+NEUTRAL_MESSAGES = ("Great post, thanks!", "When is the next event?", "Love this")
+# Smallest valid JPEG header plus padding, served for any media URL
+IMAGE_BYTES = b"\xff\xd8\xff\xe0" + bytes(2044)
+
+
+class FakeAPIs:
+    """ASGI app serving the three stand-in APIs."""
+
+    def __init__(self, config: FakeAPIConfig) -> None:
+        self.config = config
+        self.ids = itertools.count(1000)
+        self.requests = 0
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            return
+        request = Request(scope, receive)
+        self.requests += 1
+        delay = max(0.0, random.gauss(self.config.latency_ms, self.config.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        host = request.headers.get("host", "").split(":")[0]
+        if host.startswith("graph"):
+            response = await self.graph(request)
+        elif host == "api.linkedin.com":
+            response = await self.linkedin(request)
+        elif host == "api.telegram.org":
+            response = await self.telegram(request)
+        else:
+            response = Response(IMAGE_BYTES, media_type="image/jpeg")
+        await response(scope, receive, send)
+
+    def _fault(self) -> str | None:
+        roll = random.random()
+        if roll < self.config.throttle_rate:
+            return "throttle"
+        if roll < self.config.throttle_rate + self.config.error_rate:
+            return "error"
+        return None
+
+    # --- Graph API ---
+
+    def _usage_headers(self, usage: float) -> dict[str, str]:
+        counters = {"call_count": round(usage), "total_cputime": round(usage / 2), "total_time": round(usage / 2)}
+        return {
+            "x-app-usage": json.dumps(counters),
+            "x-business-use-case-usage": json.dumps({
+                "0": [{"type": "pages", **counters, "estimated_time_to_regain_access": 0}],
+            }),
+        }
+
+    async def graph(self, request: Request) -> Response:
+        if request.method == "HEAD":
+            return Response()
+        fault = self._fault()
+        if fault == "throttle":
+            return JSONResponse(
+                {"error": {"message": "(#4) Application request limit reached", "type": "OAuthException", "code": 4}},
+                status_code=400, headers=self._usage_headers(100.0),
+            )
+        headers = self._usage_headers(self.config.usage_pct)
+        if fault == "error":
+            return JSONResponse(
+                {"error": {"message": "An unexpected error has occurred.", "type": "OAuthException", "code": 2,
+                           "is_transient": True}},
+                status_code=500, headers=headers,
+            )
+        params = dict(request.query_params)
+        if request.method == "POST":
+            content_type = request.headers.get("content-type", "")
+            if content_type.startswith("application/json"):
+                params.update(await request.json())
+            elif content_type:
+                form = await request.form()
+                params.update({key: value for key, value in form.items() if isinstance(value, str)})
+        # Path after the API version
+        segments = [segment for segment in request.url.path.split("/")[2:] if segment]
+        return JSONResponse(self.graph_operation(request.method, segments, params), headers=headers)
+
+    def graph_operation(self, method: str, segments: list[str], params: dict[str, Any]) -> Any:
+        if method == "POST" and not segments:
+            return [self._batch_item(operation) for operation in json.loads(params["batch"])]
+        node, edge = (segments + [None])[:2]
+        if method == "DELETE":
+            return {"success": True}
+        if method == "GET":
+            if node == "me" and edge == "accounts":
+                return {"data": [{"id": "0", "name": "Benchmark Page", "access_token": "benchmark",
+                                  "instagram_business_account": {"id": "1"}}]}
+            if edge == "posts":
+                return self._posts(node, params)
+            if edge == "comments":
+                return self._page(node, self.config.comments_per_post, params, self._comment)
+            if "status_code" in params.get("fields", ""):
+                return {"id": node, "status_code": "FINISHED"}
+            return {"id": node}
+        if edge == "videos" and params.get("upload_phase") == "start":
+            return {"upload_session_id": str(next(self.ids)), "video_id": str(next(self.ids)),
+                    "start_offset": "0", "end_offset": str(self.config.video_chunk_size)}
+        if edge == "videos" and params.get("upload_phase") == "transfer":
+            offset = int(params["start_offset"]) + self.config.video_chunk_size
+            return {"start_offset": str(offset), "end_offset": str(offset + self.config.video_chunk_size)}
+        if edge == "videos" and params.get("upload_phase") == "finish":
+            return {"success": True}
+        object_id = str(next(self.ids))
+        if edge == "photos":
+            return {"id": object_id, "post_id": f"{node}_{object_id}"}
+        if edge in ("feed", "comments"):
+            return {"id": f"{node}_{object_id}"}
+        return {"id": object_id}
+
+    def _batch_item(self, operation: dict[str, Any]) -> dict[str, Any]:
+        url = urlsplit(operation["relative_url"])
+        segments = [segment for segment in url.path.split("/")[1:] if segment]
+        params = {**dict(parse_qsl(url.query)), **dict(parse_qsl(operation.get("body", "")))}
+        body = self.graph_operation(operation["method"], segments, params)
+        return {"code": 200, "headers": [], "body": json.dumps(body)}
+
+    def _posts(self, page_id: str, params: dict[str, Any]) -> dict[str, Any]:
+        fields = params.get("fields", "")
+        embedded = None
+        if "comments.limit(" in fields:
+            embedded = int(fields.split("comments.limit(")[1].split(")")[0])
+
+        def post(index: int) -> dict[str, Any]:
+            item = {
+                "id": f"{page_id}_{index}",
+                "message": f"Benchmark post {index}",
+                "created_time": time.strftime("%Y-%m-%dT%H:%M:%S+0000", time.gmtime(time.time() - index * 3600)),
+                "permalink_url": f"https://www.facebook.com/{page_id}/posts/{index}",
+            }
+            if embedded is not None:
+                item["comments"] = self._page(item["id"], self.config.comments_per_post, {"limit": embedded}, self._comment)
+            return item
+
+        return self._page(page_id, self.config.posts, params, post)
+
+    @staticmethod
+    def _comment(index: int) -> dict[str, Any]:
+        messages = NEGATIVE_MESSAGES if index % 7 == 0 else NEUTRAL_MESSAGES
+        return {
+            "id": f"c_{index}",
+            "message": messages[index % len(messages)],
+            "from": {"id": str(index), "name": f"User {index}"},
+            "created_time": "2026-01-01T00:00:00+0000",
+        }
+
+    @staticmethod
+    def _page(node: str, total: int, params: dict[str, Any], make: Any) -> dict[str, Any]:
+        start = int(params.get("after") or 0)
+        end = min(total, start + int(params.get("limit") or 25))
+        page: dict[str, Any] = {"data": [make(index) for index in range(start, end)]}
+        if end < total:
+            page["paging"] = {"cursors": {"after": str(end)}, "next": f"https://graph.facebook.com/{node}?after={end}"}
+        return page
+
+    # --- LinkedIn v2 API ---
+
+    async def linkedin(self, request: Request) -> Response:
+        if request.method == "HEAD":
+            return Response()
+        fault = self._fault()
+        if fault == "throttle":
+            return JSONResponse({"status": 429, "message": "Resource level throttle APPLICATION DAY limit reached"},
+                                status_code=429, headers={"retry-after": "1"})
+        if fault == "error":
+            return JSONResponse({"status": 500, "message": "Internal Server Error"}, status_code=500)
+        path = request.url.path
+        if path.startswith("/mediaUpload/"):
+            await request.body()
+            return Response(status_code=201)
+        if path == "/v2/assets" and request.query_params.get("action") == "registerUpload":
+            asset = next(self.ids)
+            return JSONResponse({"value": {
+                "asset": f"urn:li:digitalmediaAsset:{asset}",
+                "uploadMechanism": {"com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest": {
+                    "uploadUrl": f"https://api.linkedin.com/mediaUpload/{asset}",
+                }},
+            }})
+        if "/comments" in path:
+            if request.method == "POST":
+                return JSONResponse({"id": str(next(self.ids)), "message": (await request.json())["message"]}, status_code=201)
+            return JSONResponse({"elements": [
+                {"id": str(index), "message": {"text": self._comment(index)["message"]}} for index in range(10)
+            ], "paging": {"count": 10, "start": 0}})
+        if request.method == "DELETE":
+            return Response(status_code=204)
+        if request.method == "GET":
+            count = int(request.query_params.get("count", 5))
+            return JSONResponse({"elements": [
+                {"id": f"urn:li:share:{index}", "lifecycleState": "PUBLISHED"} for index in range(count)
+            ], "paging": {"count": count, "start": 0}})
+        await request.body()
+        share = f"urn:li:share:{next(self.ids)}"
+        return JSONResponse({"id": share}, status_code=201, headers={"x-restli-id": share})
+
+    # --- Telegram Bot API ---
+
+    async def telegram(self, request: Request) -> Response:
+        if request.method == "HEAD":
+            return Response()
+        fault = self._fault()
+        if fault == "throttle":
+            return JSONResponse({"ok": False, "error_code": 429, "description": "Too Many Requests: retry after 1",
+                                 "parameters": {"retry_after": 1}}, status_code=429, headers={"retry-after": "1"})
+        if fault == "error":
+            return JSONResponse({"ok": False, "error_code": 500, "description": "Internal Server Error"}, status_code=500)
+        method = request.url.path.rsplit("/", 1)[-1]
+        payload = await request.json() if request.method == "POST" else dict(request.query_params)
+        if method == "getUpdates":
+            limit = int(payload.get("limit", 20))
+            return JSONResponse({"ok": True, "result": [
+                {"update_id": index, "message": {"message_id": index, "date": int(time.time()), "text": "hi"}}
+                for index in range(limit)
+            ]})
+
+        def message(extra: dict[str, Any]) -> dict[str, Any]:
+            return {"message_id": next(self.ids), "chat": {"id": payload.get("chat_id")}, "date": int(time.time()), **extra}
+
+        if method == "sendMediaGroup":
+            return JSONResponse({"ok": True, "result": [message({"photo": [{"file_id": item["media"]}]})
+                                                        for item in payload["media"]]})
+        if method == "sendPhoto":
+            return JSONResponse({"ok": True, "result": message({"photo": [{"file_id": payload["photo"]}]})})
+        return JSONResponse({"ok": True, "result": message({"text": payload.get("text", "")})})
+
+
+class FakeAPITransport(httpx.AsyncBaseTransport):
+    """Sends every request to the stand-in server at ``url``, keeping the original Host header."""
+
+    def __init__(self, url: str, limits: httpx.Limits = httpx.Limits(max_connections=100)) -> None:
+        self.target = httpx.URL(url)
+        self.transport = httpx.AsyncHTTPTransport(limits=limits)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.url = request.url.copy_with(scheme=self.target.scheme, host=self.target.host, port=self.target.port)
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = FakeAPIConfig()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="Mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms, help="Standard deviation of the latency")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Fraction of transient 5xx errors")
+    parser.add_argument("--throttle-rate", type=float, default=defaults.throttle_rate, help="Fraction of rate-limit rejections")
+    parser.add_argument("--usage-pct", type=float, default=defaults.usage_pct, help="Usage reported in the Graph usage headers")
+    parser.add_argument("--posts", type=int, default=defaults.posts, help="Posts on the fake Page")
+    parser.add_argument("--comments-per-post", type=int, default=defaults.comments_per_post, help="Comments on every fake post")
+
+
+def config_from_arguments(args: argparse.Namespace) -> FakeAPIConfig:
+    return FakeAPIConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        usage_pct=args.usage_pct,
+        posts=args.posts,
+        comments_per_post=args.comments_per_post,
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(FakeAPIs(config_from_arguments(args)), host=args.host, port=args.port, log_level="warning",
+                lifespan="off")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+SSE load check: many concurrent MCP clients against one server process.
+
+Starts a server with ``MCP_TRANSPORT=sse`` and placeholder credentials (or targets an
+already running one with ``--url``), then opens ``--clients`` sessions at once. Each
+session initializes, lists the tools and, with ``--call``, runs one tool. Prints per-step
+latencies and the number of sessions the server turned away, as JSON.
+
+    python benchmarks/sse_clients.py --server social --clients 50 > sse.json
+    python benchmarks/sse_clients.py --url http://127.0.0.1:8000/sse --clients 20 \\
+        --call '{"name": "telegram_get_updates", "arguments": {"limit": 1}}'
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from startup import SERVERS, SRC_DIR
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "p50": round(statistics.median(ordered), 1),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+        "max": round(ordered[-1], 1),
+    }
+
+
+async def client_session(url: str, call: dict | None, headers: dict[str, str]) -> dict[str, float]:
+    started = time.perf_counter()
+    timings = {}
+    async with sse_client(url, headers=headers) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            timings["initialize_ms"] = (time.perf_counter() - started) * 1000
+            await session.list_tools()
+            timings["list_tools_ms"] = (time.perf_counter() - started) * 1000
+            if call:
+                await session.call_tool(call["name"], call.get("arguments"))
+                timings["call_tool_ms"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+async def wait_until_up(health_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(health_url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server did not come up at {health_url}")
+            await asyncio.sleep(0.1)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--server", default="social", help=f"Server to spawn: {', '.join(SERVERS)} (default social)")
+    parser.add_argument("--url", help="SSE endpoint of a running server; nothing is spawned")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the spawned server (default 8765)")
+    parser.add_argument("--clients", type=int, default=20, help="Concurrent sessions (default 20)")
+    parser.add_argument("--max-sessions", type=int, default=100, help="MCP_MAX_SESSIONS for the spawned server")
+    parser.add_argument("--call", type=json.loads, help='Tool call per session, e.g. {"name": ..., "arguments": {...}}')
+    parser.add_argument("--token", default=os.environ.get("MCP_AUTH_TOKEN"),
+                        help="Bearer token of the server (default $MCP_AUTH_TOKEN)")
+    args = parser.parse_args()
+    if args.server not in SERVERS:
+        parser.error(f"unknown server: {args.server}")
+
+    process = None
+    url = args.url
+    if url is None:
+        code, credentials = SERVERS[args.server]
+        env = {
+            **os.environ, **credentials, "PYTHONPATH": str(SRC_DIR),
+            "MCP_TRANSPORT": "sse", "MCP_PORT": str(args.port), "MCP_MAX_SESSIONS": str(args.max_sessions),
+        }
+        process = subprocess.Popen([sys.executable, "-c", code], env=env, stderr=subprocess.DEVNULL)
+        url = f"http://127.0.0.1:{args.port}/sse"
+    try:
+        await wait_until_up(url.removesuffix("/sse") + "/health")
+        started = time.perf_counter()
+        headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+        outcomes = await asyncio.gather(*(client_session(url, args.call, headers) for _ in range(args.clients)),
+                                        return_exceptions=True)
+        elapsed = time.perf_counter() - started
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    sessions = [outcome for outcome in outcomes if isinstance(outcome, dict)]
+    failures = [outcome for outcome in outcomes if not isinstance(outcome, dict)]
+    report = {
+        "clients": args.clients,
+        "completed": len(sessions),
+        "failed": len(failures),
+        "wall_ms": round(elapsed * 1000, 1),
+    }
+    if sessions:
+        report["latency"] = {metric: summarize([run[metric] for run in sessions]) for metric in sessions[0]}
+    if failures:
+        report["first_error"] = repr(failures[0])
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+Startup benchmark: how long an MCP client waits for each server after spawning it.
+
+Every run starts a fresh server process over stdio (as MCP clients do on demand) with
+placeholder credentials, then times the ``initialize`` handshake and the first
+``list_tools`` response from the moment of spawn. No request touches the network.
+
+    python benchmarks/startup.py --runs 10 > startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+SERVERS = {
+    "facebook": (
+        "import facebook_mcp_server; facebook_mcp_server.main()",
+        {"FACEBOOK_PAGE_ID": "0", "FACEBOOK_PAGE_ACCESS_TOKEN": "benchmark"},
+    ),
+    "linkedin": (
+        "import linkedin_mcp_server; linkedin_mcp_server.run()",
+        {"LINKEDIN_ACCESS_TOKEN": "benchmark", "LINKEDIN_ORGANIZATION_ID": "0"},
+    ),
+    "telegram": (
+        "import telegram_mcp_server; telegram_mcp_server.run()",
+        {"TELEGRAM_BOT_TOKEN": "benchmark", "TELEGRAM_CHAT_ID": "0"},
+    ),
+    "social": (
+        "import social_mcp_server; social_mcp_server.run()",
+        {
+            "FACEBOOK_PAGE_ID": "0", "FACEBOOK_PAGE_ACCESS_TOKEN": "benchmark",
+            "LINKEDIN_ACCESS_TOKEN": "benchmark", "LINKEDIN_ORGANIZATION_ID": "0",
+            "TELEGRAM_BOT_TOKEN": "benchmark", "TELEGRAM_CHAT_ID": "0",
+        },
+    ),
+}
+
+
+async def measure(code: str, credentials: dict[str, str]) -> dict[str, float]:
+    env = {**os.environ, **credentials, "PYTHONPATH": str(SRC_DIR)}
+    params = StdioServerParameters(command=sys.executable, args=["-c", code], env=env)
+    started = time.perf_counter()
+    async with stdio_client(params) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            initialized = time.perf_counter()
+            await session.list_tools()
+            listed = time.perf_counter()
+    return {
+        "initialize_ms": (initialized - started) * 1000,
+        "first_list_tools_ms": (listed - started) * 1000,
+    }
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    return {
+        "p50": round(statistics.median(samples), 1),
+        "min": round(min(samples), 1),
+        "max": round(max(samples), 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per server (default 5)")
+    parser.add_argument("servers", nargs="*", help=f"Servers to start (default: {' '.join(SERVERS)})")
+    args = parser.parse_args()
+    unknown = set(args.servers) - set(SERVERS)
+    if unknown:
+        parser.error(f"unknown server(s): {', '.join(sorted(unknown))}")
+
+    report = {}
+    for name in args.servers or SERVERS:
+        code, credentials = SERVERS[name]
+        runs = [await measure(code, credentials) for _ in range(args.runs)]
+        report[name] = {metric: summarize([run[metric] for run in runs]) for metric in runs[0]}
+    print(json.dumps({"python": sys.version.split()[0], "runs": args.runs, "servers": report}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,320 @@
+"""
+Throughput benchmark: latency and ops/sec of every manager method and of the MCP call_tool path.
+
+Runs against the stand-in APIs of ``fake_apis.py`` (spawned on ``--fake-port``, or an
+already running one given with ``--fake-url``), so no real service is touched. Every
+``FacebookManager``, ``LinkedInManager`` and ``TelegramManager`` method is a scenario, as are
+``list_tools`` and representative ``call_tool`` requests of the combined server's MCP request
+handlers (argument validation, dispatch and JSON rendering included). Each scenario runs
+``--ops`` operations, ``--concurrency`` at a time, after ``--warmup`` untimed ones, and
+reports p50/p95/p99/max latency, ops/sec and errors as JSON, for comparing versions.
+
+    python benchmarks/throughput.py --ops 200 --concurrency 16 > throughput.json
+    python benchmarks/throughput.py --filter telegram --latency-ms 80 --error-rate 0.05
+
+The Graph read cache is off unless ``--cache`` is given, so reads measure the API path.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from importlib import metadata
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from fake_apis import FakeAPITransport, add_arguments, config_from_arguments
+from startup import SRC_DIR
+
+
+Operation = Callable[[], Awaitable[Any]]
+
+IMAGES = [f"https://media.example.com/{index}.jpg" for index in range(4)]
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def is_error(result: Any) -> bool:
+    """Whether a manager or tool result reports a failure (Graph, LinkedIn, Telegram or MCP style)."""
+    if isinstance(result, dict):
+        status = result.get("status")
+        return (
+            "error" in result
+            or result.get("ok") is False
+            or (isinstance(status, int) and status >= 400)
+            or any(isinstance(value, dict) and "error" in value for value in result.values())
+        )
+    if isinstance(result, list):
+        return any(is_error(item) for item in result)
+    if hasattr(result, "content"):
+        return bool(getattr(result, "isError", False)) or any(
+            getattr(item, "text", "").startswith("Error:") for item in result.content
+        )
+    return False
+
+
+async def run_scenario(operation: Operation, ops: int, concurrency: int, warmup: int) -> dict[str, Any]:
+    for _ in range(warmup):
+        try:
+            await operation()
+        except Exception:
+            pass
+
+    latencies: list[float] = []
+    errors = 0
+    first_error = None
+    remaining = iter(range(ops))
+
+    async def worker() -> None:
+        nonlocal errors, first_error
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                result = await operation()
+                failed = is_error(result)
+                if failed and first_error is None:
+                    first_error = json.dumps(result, default=str)[:300]
+            except Exception as exc:
+                failed = True
+                first_error = first_error or repr(exc)[:300]
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    report = {
+        "ops": ops,
+        "errors": errors,
+        "ops_per_sec": round(ops / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(ordered, 0.50), 2),
+            "p95": round(percentile(ordered, 0.95), 2),
+            "p99": round(percentile(ordered, 0.99), 2),
+            "max": round(ordered[-1], 2),
+        },
+    }
+    if first_error:
+        report["first_error"] = first_error
+    return report
+
+
+async def collect(iterator: Any) -> int:
+    return len([item async for item in iterator])
+
+
+def facebook_scenarios(pages: Any, manager: Any, video_path: str) -> dict[str, Operation]:
+    post_ids = [f"0_{index}" for index in range(10)]
+    comment_ids = [f"c_{index}" for index in range(60)]
+
+    async def filter_negative_comments() -> Any:
+        return manager.filter_negative_comments(await manager.get_post_comments("0_1", max_items=100))
+
+    async def post_media_background() -> Any:
+        job = manager.start_post_media("Benchmark", IMAGES[:1], "image", ["facebook", "instagram"])
+        return (await pages.jobs.wait(job["id"], timeout=60))["result"]
+
+    return {
+        "facebook.post_to_facebook": lambda: manager.post_to_facebook("Benchmark post"),
+        "facebook.reply_to_comment": lambda: manager.reply_to_comment("0_1", "c_1", "Thanks!"),
+        "facebook.get_page_posts": lambda: manager.get_page_posts(limit=25, max_items=100),
+        "facebook.iter_page_posts": lambda: collect(manager.iter_page_posts(limit=25, max_items=100)),
+        "facebook.get_post_comments": lambda: manager.get_post_comments("0_1", limit=25, max_items=60),
+        "facebook.iter_post_comments": lambda: collect(manager.iter_post_comments("0_1", limit=25, max_items=60)),
+        "facebook.get_page_posts_with_comments": lambda: manager.get_page_posts_with_comments(max_posts=25, max_comments=60),
+        "facebook.scan_page_negative_comments": lambda: manager.scan_page_negative_comments(days=30, max_posts=50),
+        "facebook.filter_negative_comments": filter_negative_comments,
+        "facebook.delete_post": lambda: manager.delete_post("0_1"),
+        "facebook.delete_comment": lambda: manager.delete_comment("c_1"),
+        "facebook.bulk_delete_comments": lambda: manager.bulk_delete_comments(comment_ids),
+        "facebook.bulk_reply": lambda: manager.bulk_reply([{"comment_id": cid, "message": "Thanks!"} for cid in comment_ids]),
+        "facebook.get_comments_for_posts": lambda: manager.get_comments_for_posts(post_ids),
+        "facebook.post_media.image": lambda: manager.post_media("Benchmark", IMAGES[:1], "image", ["facebook", "instagram"]),
+        "facebook.post_media.carousel": lambda: manager.post_media("Benchmark", IMAGES, "carousel", ["facebook", "instagram"]),
+        "facebook.post_media.video_url": lambda: manager.post_media("Benchmark", ["https://media.example.com/v.mp4"], "video", ["facebook"]),
+        "facebook.post_media.reel": lambda: manager.post_media("Benchmark", ["https://media.example.com/r.mp4"], "reel", ["instagram"]),
+        "facebook.post_media.video_chunked": lambda: manager.post_media("Benchmark", [video_path], "video", ["facebook"]),
+        "facebook.post_media.background": post_media_background,
+        "facebook.list_pages": lambda: pages.list_pages(),
+    }
+
+
+def linkedin_scenarios(manager: Any) -> dict[str, Operation]:
+    return {
+        "linkedin.create_text_post": lambda: manager.create_text_post("Benchmark post", ["bench"]),
+        "linkedin.create_image_post": lambda: manager.create_image_post("Benchmark", IMAGES[0]),
+        "linkedin.create_carousel_post": lambda: manager.create_carousel_post("Benchmark", IMAGES),
+        "linkedin.create_link_post": lambda: manager.create_link_post("Benchmark", "https://example.com/article"),
+        "linkedin.list_recent_posts": lambda: manager.list_recent_posts(10),
+        "linkedin.comment_on_post": lambda: manager.comment_on_post("urn:li:share:1", "Thanks!"),
+        "linkedin.get_comments": lambda: manager.get_comments("urn:li:share:1"),
+        "linkedin.delete_post": lambda: manager.delete_post("urn:li:share:1"),
+    }
+
+
+def telegram_scenarios(manager: Any) -> dict[str, Operation]:
+    return {
+        "telegram.send_message": lambda: manager.send_message("Benchmark message", ["bench"]),
+        "telegram.send_photo": lambda: manager.send_photo(IMAGES[0], "Benchmark"),
+        "telegram.send_media_group": lambda: manager.send_media_group(IMAGES, "Benchmark"),
+        "telegram.send_link_with_preview": lambda: manager.send_link_with_preview("Benchmark", "https://example.com"),
+        "telegram.get_updates": lambda: manager.get_updates(20),
+    }
+
+
+def mcp_scenarios(server: Any) -> dict[str, Operation]:
+    import mcp.types as types
+
+    list_tools = server.request_handlers[types.ListToolsRequest]
+    call_tool = server.request_handlers[types.CallToolRequest]
+
+    def call(name: str, arguments: dict[str, Any]) -> Operation:
+        async def operation() -> Any:
+            request = types.CallToolRequest(method="tools/call", params=types.CallToolRequestParams(name=name, arguments=arguments))
+            return (await call_tool(request)).root
+        return operation
+
+    return {
+        "mcp.list_tools": lambda: list_tools(types.ListToolsRequest(method="tools/list")),
+        "mcp.call_tool.facebook_post_to_facebook": call("facebook_post_to_facebook", {"message": "Benchmark post"}),
+        "mcp.call_tool.facebook_get_page_posts": call("facebook_get_page_posts", {"limit": 25, "fields": ["id", "message"]}),
+        "mcp.call_tool.facebook_post_media": call("facebook_post_media", {
+            "caption": "Benchmark", "media_urls": IMAGES, "media_type": "carousel", "platforms": ["facebook", "instagram"],
+        }),
+        "mcp.call_tool.facebook_bulk_reply": call("facebook_bulk_reply", {
+            "replies": [{"comment_id": f"c_{index}", "message": "Thanks!"} for index in range(20)],
+        }),
+        "mcp.call_tool.facebook_get_rate_limit_status": call("facebook_get_rate_limit_status", {}),
+        "mcp.call_tool.linkedin_create_text_post": call("linkedin_create_text_post", {"text": "Benchmark post"}),
+        "mcp.call_tool.linkedin_list_posts": call("linkedin_list_posts", {"count": 10}),
+        "mcp.call_tool.telegram_send_message": call("telegram_send_message", {"text": "Benchmark message"}),
+        "mcp.call_tool.telegram_send_media_group": call("telegram_send_media_group", {"media_urls": IMAGES}),
+        "mcp.call_tool.rejected_unknown_tool": call("no_such_tool", {}),
+    }
+
+
+async def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(transport=FakeAPITransport(url)) as client:
+        while True:
+            try:
+                await client.head("https://api.telegram.org")
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Fake APIs did not come up at {url}")
+                await asyncio.sleep(0.1)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ops", type=int, default=100, help="Timed operations per scenario (default 100)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Operations in flight at once (default 8)")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed operations per scenario first (default 5)")
+    parser.add_argument("--filter", action="append", help="Only scenarios containing this text (repeatable)")
+    parser.add_argument("--cache", action="store_true", help="Keep the Graph read cache on")
+    parser.add_argument("--fake-url", help="URL of a running fake_apis.py server; nothing is spawned")
+    parser.add_argument("--fake-port", type=int, default=8900, help="Port for the spawned fake APIs (default 8900)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    fake_config = config_from_arguments(args)
+
+    sys.path.insert(0, str(SRC_DIR))
+    if not args.cache:
+        os.environ["FACEBOOK_CACHE_TTL"] = "0"
+    workdir = tempfile.mkdtemp(prefix="facebook_mcp_benchmark")
+    os.environ.setdefault("FACEBOOK_SCHEDULE_DB", os.path.join(workdir, "schedule.sqlite3"))
+    os.environ.setdefault("FACEBOOK_UPLOAD_STATE_DIR", os.path.join(workdir, "uploads"))
+    # The chunked-upload scenario reads its video from the work directory
+    os.environ["FACEBOOK_UPLOAD_DIR"] = workdir
+    logging.basicConfig(level=logging.ERROR)
+
+    from mcp.server import Server
+
+    from facebook_mcp_server.graph import GraphClient
+    from facebook_mcp_server.pages import pages_from_config
+    from facebook_mcp_server.tools import TOOLS as FACEBOOK_TOOLS
+    from linkedin_mcp_server import TOOLS as LINKEDIN_TOOLS, LinkedInManager
+    from social_mcp_common.registry import ToolRouter
+    from social_mcp_server import METRICS_TOOLS
+    from telegram_mcp_server import TOOLS as TELEGRAM_TOOLS, TelegramManager
+
+    process = None
+    url = args.fake_url
+    if url is None:
+        fake_args = [
+            "--port", str(args.fake_port), "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+            "--error-rate", str(args.error_rate), "--throttle-rate", str(args.throttle_rate),
+            "--usage-pct", str(args.usage_pct), "--posts", str(args.posts), "--comments-per-post", str(args.comments_per_post),
+        ]
+        process = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), "fake_apis.py"), *fake_args])
+        url = f"http://127.0.0.1:{args.fake_port}"
+
+    video_path = os.path.join(workdir, "video.mp4")
+    with open(video_path, "wb") as video:
+        video.write(os.urandom(4 * fake_config.video_chunk_size))
+
+    client = httpx.AsyncClient(transport=FakeAPITransport(url), timeout=60.0)
+    pages = pages_from_config("0", "benchmark", "1", None, graph=GraphClient(client=client))
+    linkedin = LinkedInManager(access_token="benchmark", organization_id="0", client=client)
+    telegram = TelegramManager(bot_token="benchmark", chat_id="0", client=client)
+    router = ToolRouter(logging.getLogger("benchmark"))
+    # Mounted as the combined server does (see social_mcp_server.mount_platforms)
+    for registry, manager, prefix in ((FACEBOOK_TOOLS, pages, "facebook_"), (LINKEDIN_TOOLS, linkedin, "linkedin_"),
+                                      (TELEGRAM_TOOLS, telegram, "telegram_")):
+        router.mount(registry, manager, prefix, exclude=(f"{prefix}get_metrics",))
+    router.mount(METRICS_TOOLS, None, "")
+    server = Server("benchmark")
+    router.attach(server)
+
+    results = {}
+    try:
+        await wait_until_up(url)
+        scenarios = {
+            **facebook_scenarios(pages, await pages.manager(), video_path),
+            **linkedin_scenarios(linkedin),
+            **telegram_scenarios(telegram),
+            **mcp_scenarios(server),
+        }
+        for name, operation in scenarios.items():
+            if args.filter and not any(text in name for text in args.filter):
+                continue
+            results[name] = await run_scenario(operation, args.ops, args.concurrency, args.warmup)
+            print(f"{name}: {results[name]['ops_per_sec']} ops/s, p95 {results[name]['latency_ms']['p95']} ms",
+                  file=sys.stderr)
+    finally:
+        await pages.aclose()
+        await client.aclose()
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    try:
+        version = metadata.version("facebook-mcp-server")
+    except metadata.PackageNotFoundError:
+        version = None
+    print(json.dumps({
+        "version": version,
+        "python": platform.python_version(),
+        "ops": args.ops,
+        "concurrency": args.concurrency,
+        "cache": args.cache,
+        "fake_api": asdict(fake_config),
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
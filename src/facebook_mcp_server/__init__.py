@@ -1,6 +1,5 @@
 from . import server
 import asyncio
-import argparse
 
 
 def main():
@@ -0,0 +1,33 @@
+import asyncio
+import random
+from typing import Any, Awaitable, Iterable, Iterator
+
+
+async def gather_limited(limit: int, aws: Iterable[Awaitable[Any]], return_exceptions: bool = False) -> list[Any]:
+    """
+    Awaits ``aws`` concurrently with at most ``limit`` in flight at once.
+
+    Results come back in input order, like ``asyncio.gather``. With
+    ``return_exceptions=True`` a failing awaitable yields its exception in its
+    slot instead of cancelling the rest.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws), return_exceptions=return_exceptions)
+
+
+def backoff_delays(initial: float, factor: float = 2.0, maximum: float = 30.0, jitter: float = 0.2) -> Iterator[float]:
+    """
+    Yields an endless sequence of exponentially growing delays, capped at ``maximum``.
+
+    Each delay is randomised by +/- ``jitter`` (a fraction) so that many waiters started
+    together do not all wake up at the same moment.
+    """
+    delay = initial
+    while True:
+        yield delay * random.uniform(1 - jitter, 1 + jitter)
+        delay = min(delay * factor, maximum)
@@ -0,0 +1,100 @@
+import re
+from typing import Iterable, Optional
+
+
+# Fields callers may request on Page posts and on comments. Connections (edges) accept
+# modifiers and nested sub-fields, e.g. "comments.summary(true).limit(0)" or
+# "attachments{media_type,url}".
+POST_FIELD_NAMES = frozenset({
+    "id", "message", "created_time", "updated_time", "permalink_url", "full_picture", "picture",
+    "status_type", "story", "from", "is_published", "is_hidden", "is_expired", "is_popular",
+    "message_tags", "parent_id", "place", "privacy", "scheduled_publish_time", "shares",
+    "attachments", "comments", "reactions", "likes", "sharedposts", "insights",
+})
+COMMENT_FIELD_NAMES = frozenset({
+    "id", "message", "created_time", "from", "like_count", "comment_count", "permalink_url",
+    "parent", "attachment", "message_tags", "is_hidden", "is_private", "can_comment", "can_remove",
+    "can_hide", "can_like", "can_reply_privately", "user_likes", "object",
+    "comments", "reactions", "likes",
+})
+# Sub-field allowlists for edges whose items have a known shape; other edges only get a syntax check
+NESTED_FIELDS = {"comments": COMMENT_FIELD_NAMES}
+
+FIELD_MODIFIERS = frozenset({"limit", "summary", "filter", "order", "type", "since", "until"})
+
+_TOKEN = re.compile(r"\s*(?:([A-Za-z_][A-Za-z0-9_]*)|(\([^()]*\))|([.,{}]))")
+
+
+class _Parser:
+    """Recursive-descent reader for Graph field expressions: ``name(.modifier(arg))*({sub,fields})?``."""
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        self.pos = 0
+
+    def peek(self) -> str:
+        """Returns the next token without consuming it; "" at the end or before an invalid character."""
+        match = _TOKEN.match(self.expression, self.pos)
+        return match.group(match.lastindex) if match else ""
+
+    def take(self) -> str:
+        token = self.peek()
+        if not token:
+            raise ValueError(f"Invalid fields expression near {self.expression[self.pos:]!r}")
+        self.pos = _TOKEN.match(self.expression, self.pos).end()
+        return token
+
+    def field_list(self, allowed: Optional[frozenset[str]], closing: str) -> list[str]:
+        """Reads comma-separated fields up to ``closing``; returns their names (not those of sub-fields)."""
+        names = []
+        while True:
+            names.append(self.field(allowed))
+            token = self.peek()
+            if token == ",":
+                self.take()
+            elif token == closing and (closing or not self.expression[self.pos:].strip()):
+                if closing:
+                    self.take()
+                return names
+            else:
+                raise ValueError(f"Invalid fields expression near {self.expression[self.pos:]!r}")
+
+    def field(self, allowed: Optional[frozenset[str]]) -> str:
+        name = self.take()
+        if not (name[0].isalpha() or name[0] == "_"):
+            raise ValueError(f"Expected a field name, got {name!r}")
+        if allowed is not None and name not in allowed:
+            raise ValueError(f"Unknown field {name!r}; allowed fields: {', '.join(sorted(allowed))}")
+        while self.peek() == ".":
+            self.take()
+            modifier = self.take()
+            if modifier not in FIELD_MODIFIERS:
+                raise ValueError(f"Unsupported modifier {modifier!r} on {name!r}; allowed: {', '.join(sorted(FIELD_MODIFIERS))}")
+            if not self.peek().startswith("("):
+                raise ValueError(f"Modifier {modifier!r} on {name!r} needs an argument, e.g. {modifier}(...)")
+            self.take()
+        if self.peek() == "{":
+            self.take()
+            self.field_list(NESTED_FIELDS.get(name), "}")
+        return name
+
+
+def graph_fields(fields: Iterable[str] | str, allowed: frozenset[str]) -> str:
+    """
+    Validates a caller-supplied Graph ``fields`` selection and returns it as a query value.
+
+    ``fields`` is a list of field expressions or one comma-separated string. Top-level names
+    must be in ``allowed``; modifiers are limited to ``FIELD_MODIFIERS``. Raises ValueError on
+    anything else, so a bad selection fails before a request is sent.
+    """
+    expressions = [fields] if isinstance(fields, str) else list(fields)
+    expression = ",".join(part.strip() for part in expressions if part and part.strip())
+    if not expression:
+        raise ValueError("fields must name at least one field.")
+    _Parser(expression).field_list(allowed, "")
+    return re.sub(r"\s+", "", expression)
+
+
+def top_level_fields(expression: str) -> list[str]:
+    """The top-level field names of a Graph ``fields`` expression, e.g. ``["id", "from"]`` for ``"id,from{id,name}"``."""
+    return _Parser(expression).field_list(None, "")
@@ -0,0 +1,363 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Hashable, Iterator, Optional
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlsplit
+
+from social_mcp_common.http import create_http_client
+
+from .cache import TTLCache
+from .concurrency import gather_limited
+from .ratelimit import UsageThrottle
+from .retry import RetryPolicy
+
+if TYPE_CHECKING:
+    import httpx
+
+
+logger = logging.getLogger('facebook_mcp_server')
+# httpx logs every request URL at INFO, which would leak access tokens into the server log
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Facebook Graph API endpoint
+GRAPH_API_VERSION = "v18.0"
+GRAPH_API_BASE_URL = f"https://graph.facebook.com/{GRAPH_API_VERSION}"
+# Video uploads go to a dedicated host
+GRAPH_VIDEO_BASE_URL = f"https://graph-video.facebook.com/{GRAPH_API_VERSION}"
+
+# The Graph batch endpoint accepts at most this many operations per request
+MAX_BATCH_SIZE = 50
+
+# Query parameters of a time-based ``paging.next`` URL that mark the position in the listing
+TIME_PAGING_KEYS = ("since", "until", "__paging_token")
+# Prefix of the resume tokens ``next_cursor`` returns for time-based pages
+TIME_CURSOR_PREFIX = "time:"
+
+def _throttle_scope(path: str, params: Optional[dict[str, Any]], data: Optional[dict[str, Any]]) -> Optional[str]:
+    # Page-level rate limits follow the access token a request is made with
+    for values in (params, data):
+        if values and values.get("access_token"):
+            return values["access_token"]
+    if path.startswith("http"):
+        return parse_qs(urlsplit(path).query).get("access_token", [None])[0]
+    return None
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+class GraphClient:
+    """
+    Async Graph API client backed by one long-lived, pooled ``httpx.AsyncClient``.
+
+    Every Graph call made by the server goes through a single instance so that
+    connections to graph.facebook.com are kept alive and reused (multiplexed over
+    HTTP/2 when the ``h2`` package is installed). The server only talks to one
+    host, so the pool limits below are effectively per-host limits.
+
+    A ``client`` passed in (e.g. one pool shared by several platform managers) is used
+    instead of creating one; its owner configures and closes it. ``httpx`` is only imported
+    when the client is first needed, so importing the server stays cheap.
+    """
+
+    def __init__(
+        self,
+        base_url: str = GRAPH_API_BASE_URL,
+        *,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+        cache: Optional[TTLCache] = None,
+        throttle: Optional[UsageThrottle] = None,
+        retry: Optional[RetryPolicy] = None,
+        client: Optional["httpx.AsyncClient"] = None,
+    ) -> None:
+        self.base_url = base_url
+        self.max_connections = max_connections or env_int("FACEBOOK_HTTP_MAX_CONNECTIONS", 20)
+        self.max_keepalive_connections = max_keepalive_connections or env_int("FACEBOOK_HTTP_MAX_KEEPALIVE", 10)
+        self.keepalive_expiry = keepalive_expiry or env_float("FACEBOOK_HTTP_KEEPALIVE_EXPIRY", 60.0)
+        self.timeout = timeout or env_float("FACEBOOK_HTTP_TIMEOUT", 60.0)
+        # None: HTTP/2 when the h2 package is installed
+        self.http2 = http2
+        self._client = client
+        self._owns_client = client is None
+        if cache is None:
+            cache_ttl = env_float("FACEBOOK_CACHE_TTL", 30.0)
+            if cache_ttl > 0:
+                cache = TTLCache(maxsize=env_int("FACEBOOK_CACHE_MAX_ENTRIES", 512), ttl=cache_ttl)
+        # Read cache for GETs; None when disabled (FACEBOOK_CACHE_TTL=0)
+        self.cache = cache
+        # Backoff/deadline for transient failures
+        self.retry = retry or RetryPolicy(
+            max_attempts=env_int("FACEBOOK_RETRY_MAX_ATTEMPTS", 4),
+            deadline=env_float("FACEBOOK_RETRY_DEADLINE", 60.0),
+        )
+        # Shared pacing from the Graph usage headers
+        self.throttle = throttle or UsageThrottle(
+            soft_limit=env_float("FACEBOOK_THROTTLE_SOFT_LIMIT", 75.0),
+            cooldown=env_float("FACEBOOK_THROTTLE_COOLDOWN", 30.0),
+            max_wait=env_float("FACEBOOK_THROTTLE_MAX_WAIT", 120.0),
+        )
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """The pooled client, created on first use so it binds to the running event loop."""
+        if self._client is None or self._client.is_closed:
+            self._client = create_http_client(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+                timeout=self.timeout,
+                http2=self.http2,
+            )
+            self._owns_client = True
+        return self._client
+
+    def url(self, path: str) -> str:
+        """Absolute URL for ``path``; paths are relative to the Graph base URL unless already absolute."""
+        return path if path.startswith("http") else self.base_url + path
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[dict[str, Any]] = None,
+        json: Optional[dict[str, Any]] = None,
+        data: Optional[dict[str, Any]] = None,
+        files: Optional[dict[str, Any]] = None,
+        idempotent: Optional[bool] = None,
+    ) -> Any:
+        """
+        Sends a request relative to the Graph base URL and returns the decoded JSON body.
+
+        Dispatch goes through the usage throttle; a request rejected for rate limiting is
+        queued again until access is regained. A request that would be held back beyond the
+        throttle's max wait (or the retry deadline) returns the rate limit error instead.
+        Transient failures are retried with backoff per the retry policy, within its deadline;
+        POSTs count as non-idempotent unless ``idempotent=True`` is passed.
+        """
+        import httpx
+
+        if idempotent is None:
+            idempotent = method != "POST"
+        scope = _throttle_scope(path, params, data)
+        deadline = time.monotonic() + self.retry.deadline
+        delays = self.retry.delays()
+        attempt = 0
+        waited = 0.0
+        while True:
+            attempt += 1
+            # Fail fast rather than hold a call (and its concurrency slot) through a long lockout
+            held = await self.throttle.acquire(scope, min(self.throttle.max_wait - waited, deadline - time.monotonic()))
+            if held is None:
+                return self.throttle.rejection(scope)
+            waited += held
+            try:
+                response = await self.client.request(method, self.url(path), params=params, json=json, data=data, files=files)
+            except httpx.TransportError as exc:
+                if self.retry.retry_exception(idempotent, exc) and await self._backoff(attempt, deadline, delays):
+                    logger.warning(f"Retrying Graph {method} {path} after {type(exc).__name__} (attempt {attempt})")
+                    continue
+                raise
+
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            if self.throttle.observe(response.headers, body, scope):
+                blocked_for = self.throttle.blocked_for(scope)
+                if blocked_for > 0:
+                    if waited + blocked_for <= self.throttle.max_wait:
+                        continue
+                # No regain time and no cooldown (FACEBOOK_THROTTLE_COOLDOWN=0): nothing would hold
+                # the next attempt back, so it backs off like a transient failure instead
+                elif await self._backoff(attempt, deadline, delays):
+                    logger.warning(f"Retrying Graph {method} {path} after a rate limit error (attempt {attempt})")
+                    continue
+            elif self.retry.retry_response(idempotent, response.status_code, body) and await self._backoff(attempt, deadline, delays):
+                logger.warning(f"Retrying Graph {method} {path} after HTTP {response.status_code} (attempt {attempt})")
+                continue
+
+            if body is None:
+                raise RuntimeError(f"Graph API returned HTTP {response.status_code} with a non-JSON body.")
+            return body
+
+    async def _backoff(self, attempt: int, deadline: float, delays: Iterator[float]) -> bool:
+        """Sleeps before the next attempt; returns False when the attempt or time budget is spent."""
+        delay = next(delays)
+        if attempt >= self.retry.max_attempts or time.monotonic() + delay > deadline:
+            return False
+        await asyncio.sleep(delay)
+        return True
+
+    async def get(self, path: str, params: Optional[dict[str, Any]] = None, cache: bool = True, **kwargs: Any) -> Any:
+        """
+        GETs ``path``, serving successful responses from the read cache while they are fresh.
+        Pass ``cache=False`` for reads that must always hit the API (e.g. status polling).
+        """
+        key = self._cache_key(path, params) if cache else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        resp = await self.request("GET", path, params=params, **kwargs)
+        if key is not None and isinstance(resp, dict) and "error" not in resp:
+            self.cache.set(key, resp)
+        return resp
+
+    def _cache_key(self, path: str, params: Optional[dict[str, Any]]) -> Optional[Hashable]:
+        # Absolute URLs (paging.next) embed the access token in their query, so they are not cached
+        if self.cache is None or path.startswith("http"):
+            return None
+        # Pages share this cache, so reads are keyed on the token too: a read made with one Page's
+        # token is never served to a call made with another's, which Graph might have refused
+        scope = _throttle_scope(path, params, None)
+        return path, scope, tuple(sorted((k, str(v)) for k, v in (params or {}).items() if k != "access_token"))
+
+    def invalidate(self, stale: Callable[[str], bool]) -> None:
+        """Drops cached reads whose request path matches ``stale``."""
+        if self.cache is not None:
+            self.cache.invalidate(lambda key: stale(key[0]))
+
+    async def post(self, path: str, **kwargs: Any) -> dict[str, Any]:
+        return await self.request("POST", path, **kwargs)
+
+    async def delete(self, path: str, **kwargs: Any) -> dict[str, Any]:
+        return await self.request("DELETE", path, **kwargs)
+
+    async def paginate(
+        self,
+        path: str,
+        params: dict[str, Any],
+        max_items: Optional[int] = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Yields successive pages of a Graph edge, following ``paging`` until it is exhausted
+        or ``max_items`` items have been fetched.
+
+        Pages are fetched lazily, one at a time, so callers can process (and stop consuming)
+        results without holding every page in memory. Page sizes are trimmed so the last page
+        ends exactly at ``max_items``, which keeps its ``after`` cursor a precise resume point.
+        An ``after`` param may be any ``next_cursor`` value, including a time-based resume token.
+        An error page is yielded as-is and ends the iteration.
+        """
+        url = path
+        params = dict(params)
+        if params.get("after"):
+            params.update(cursor_params(params.pop("after")))
+        page_size = int(params.get("limit", 25))
+        fetched = 0
+        while True:
+            if max_items is not None:
+                params["limit"] = min(page_size, max_items - fetched)
+            page = await self.get(url, params=params)
+            yield page
+
+            data = page.get("data") or []
+            fetched += len(data)
+            paging = page.get("paging") or {}
+            if "error" in page or not data or not paging.get("next"):
+                return
+            if max_items is not None and fetched >= max_items:
+                return
+            after = (paging.get("cursors") or {}).get("after")
+            if after:
+                params["after"] = after
+            else:
+                # Time-based paging: the next URL's query (token, fields, until, __paging_token, ...)
+                # is the whole request; httpx would drop it in favour of params, so it moves there
+                url, _, query = paging["next"].partition("?")
+                params = dict(parse_qsl(query, keep_blank_values=True))
+
+    async def batch(self, operations: list[dict[str, Any]], access_token: str, concurrency: int = 4) -> list[dict[str, Any]]:
+        """
+        Executes many Graph operations through the batch endpoint.
+
+        Each operation is ``{"method": "GET", "relative_url": "123/comments?fields=id", "body": {...}}``
+        with ``relative_url`` relative to the API version and ``body`` optional. Inputs larger than
+        ``MAX_BATCH_SIZE`` are split into several batch requests, sent at most ``concurrency`` at a time.
+        Returns one ``{"code": int | None, "body": dict}`` per operation, in input order.
+        """
+        chunks = [operations[i:i + MAX_BATCH_SIZE] for i in range(0, len(operations), MAX_BATCH_SIZE)]
+        responses = await gather_limited(concurrency, (self._send_batch(chunk, access_token) for chunk in chunks))
+        return [item for chunk in responses for item in chunk]
+
+    async def _send_batch(self, operations: list[dict[str, Any]], access_token: str) -> list[dict[str, Any]]:
+        batch = []
+        for operation in operations:
+            entry = {
+                "method": operation["method"],
+                "relative_url": f"{GRAPH_API_VERSION}/{operation['relative_url']}",
+            }
+            if operation.get("body"):
+                entry["body"] = urlencode(operation["body"])
+            batch.append(entry)
+
+        resp = await self.post("/", data={
+            "batch": json.dumps(batch),
+            "include_headers": "false",
+            "access_token": access_token,
+        })
+        if not isinstance(resp, list):
+            # The whole batch was rejected (bad token, throttling, ...): every operation shares that error
+            error = resp.get("error", resp) if isinstance(resp, dict) else resp
+            return [{"code": None, "body": {"error": error}} for _ in operations]
+        return [_decode_batch_item(item) for item in resp]
+
+    async def prewarm(self) -> None:
+        """Opens a pooled connection (DNS, TCP, TLS and HTTP/2 setup) ahead of the first real call."""
+        await self.client.request("HEAD", self.url("/"))
+
+    async def aclose(self) -> None:
+        """Closes the underlying connection pool, unless it was passed in by its owner."""
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _decode_batch_item(item: Optional[dict[str, Any]]) -> dict[str, Any]:
+    if item is None:
+        # Graph returns null for operations that did not complete before the batch timed out
+        return {"code": None, "body": {"error": {"message": "Batch operation did not complete; retry it."}}}
+    try:
+        body = json.loads(item.get("body") or "{}")
+    except ValueError:
+        body = {"raw": item.get("body")}
+    return {"code": item.get("code"), "body": body}
+
+
+def next_cursor(page: dict[str, Any]) -> Optional[str]:
+    """
+    The cursor that resumes listing after ``page``, or None when it was the last page.
+
+    This is the ``after`` cursor for cursor-based pages. Time-based pages (e.g. Page posts
+    filtered by ``since``/``until``) have none, so their position in ``paging.next`` is
+    returned as a resume token instead; ``paginate`` accepts either as ``after``.
+    """
+    paging = page.get("paging") or {}
+    if not paging.get("next"):
+        return None
+    after = (paging.get("cursors") or {}).get("after")
+    if after:
+        return after
+    position = [(k, v) for k, v in parse_qsl(urlsplit(paging["next"]).query) if k in TIME_PAGING_KEYS]
+    return TIME_CURSOR_PREFIX + urlencode(position) if position else None
+
+
+def cursor_params(cursor: str) -> dict[str, str]:
+    """The query params that resume a listing from a ``next_cursor`` value."""
+    if cursor.startswith(TIME_CURSOR_PREFIX):
+        return dict(parse_qsl(cursor[len(TIME_CURSOR_PREFIX):]))
+    return {"after": cursor}
@@ -0,0 +1,38 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+from .cache import TTLCache
+
+
+class IdempotencyStore:
+    """
+    Remembers the outcome of publish calls by caller-supplied idempotency key.
+
+    A publish retried with the same key gets the original result back instead of posting
+    again. Calls sharing a key are serialised, so a retry that races the original waits
+    for it rather than publishing a second copy. Keys expire after ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl: float = 86400.0, maxsize: int = 1000) -> None:
+        self._results = TTLCache(maxsize=maxsize, ttl=ttl)
+        # key -> (lock, number of calls holding or waiting for it)
+        self._locks: dict[str, tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def claim(self, key: str) -> AsyncIterator[Optional[Any]]:
+        """Holds ``key`` exclusively and yields the result stored for it, if any."""
+        lock, users = self._locks.get(key) or (asyncio.Lock(), 0)
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield self._results.get(key)
+        finally:
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    def save(self, key: str, result: Any) -> None:
+        self._results.set(key, result)
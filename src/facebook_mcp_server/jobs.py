@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+
+logger = logging.getLogger('facebook_mcp_server')
+
+
+class Job:
+    """A publish running in the background, with the progress of each pipeline stage."""
+
+    def __init__(self, kind: str, page_id: Optional[str]) -> None:
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.page_id = page_id
+        self.status = "running"
+        # Stage name -> {"status": "running" | "done" | "failed", "ms": duration, ...progress}
+        self.stages: dict[str, dict[str, Any]] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def snapshot(self) -> dict[str, Any]:
+        finished_at = self.finished_at or time.time()
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "page_id": self.page_id,
+            "status": self.status,
+            "stages": {name: dict(stage) for name, stage in self.stages.items()},
+            "result": self.result,
+            "error": self.error,
+            "created_at": datetime.fromtimestamp(self.created_at, timezone.utc).isoformat(timespec="seconds"),
+            "elapsed_ms": round((finished_at - self.created_at) * 1000, 1),
+        }
+
+
+# The job (and stage name prefix) that the running pipeline reports to; unset outside background jobs
+_current_job: ContextVar[Optional[Job]] = ContextVar("facebook_mcp_job", default=None)
+_stage_prefix: ContextVar[str] = ContextVar("facebook_mcp_job_stage_prefix", default="")
+_current_stage: ContextVar[Optional[dict[str, Any]]] = ContextVar("facebook_mcp_job_stage", default=None)
+
+
+@contextmanager
+def stage_scope(prefix: str) -> Iterator[None]:
+    """Reports the stages of the enclosed block as ``<prefix>.<stage>`` (e.g. ``instagram.publish``)."""
+    token = _stage_prefix.set(f"{_stage_prefix.get()}{prefix}.")
+    try:
+        yield
+    finally:
+        _stage_prefix.reset(token)
+
+
+@contextmanager
+def job_stage(stage: str) -> Iterator[None]:
+    """Marks ``stage`` running, then done or failed, on the current background job; a no-op otherwise."""
+    job = _current_job.get()
+    if job is None:
+        yield
+        return
+    record: dict[str, Any] = {"status": "running"}
+    job.stages[_stage_prefix.get() + stage] = record
+    token = _current_stage.set(record)
+    started = time.perf_counter()
+    try:
+        yield
+        record["status"] = "done"
+    except BaseException:
+        record["status"] = "failed"
+        raise
+    finally:
+        record["ms"] = round((time.perf_counter() - started) * 1000, 1)
+        _current_stage.reset(token)
+
+
+def report_progress(**progress: Any) -> None:
+    """Adds progress counters (e.g. ``chunks_done``) to the running stage of the current background job."""
+    record = _current_stage.get()
+    if record is not None:
+        record.update(progress)
+
+
+class JobTracker:
+    """
+    Runs publishes as background tasks and keeps their status for ``get_job_status``/``wait_job``.
+
+    A job is ``running`` until its coroutine returns (``completed``, with the same result the
+    tool returns when called directly) or raises (``failed``). Stages the pipeline enters via
+    ``job_stage`` are recorded as they start and finish. Finished jobs are kept for ``ttl``
+    seconds, and at most ``max_finished`` of them; jobs only live in this process.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_finished: int = 1000) -> None:
+        self.ttl = ttl
+        self.max_finished = max_finished
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+
+    def submit(self, kind: str, run: Callable[[], Awaitable[Any]], page_id: Optional[str] = None) -> dict[str, Any]:
+        """Starts ``run()`` in the background and returns the new job's status right away."""
+        self._prune()
+        job = Job(kind, page_id)
+        self._jobs[job.id] = job
+        token = _current_job.set(job)
+        try:
+            # The task copies the current context, so the pipeline reports to this job
+            job.task = asyncio.create_task(self._run(job, run))
+        finally:
+            _current_job.reset(token)
+        return job.snapshot()
+
+    async def _run(self, job: Job, run: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            job.result = await run()
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status, job.error = "failed", "Cancelled by server shutdown"
+            raise
+        except Exception as exc:
+            logger.exception(f"Background job {job.id} ({job.kind}) failed")
+            job.status, job.error = "failed", str(exc)
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Job:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"No job {job_id}; finished jobs are kept for {self.ttl:g}s")
+        return job
+
+    def status(self, job_id: str) -> dict[str, Any]:
+        return self.get(job_id).snapshot()
+
+    async def wait(self, job_id: str, timeout: float) -> dict[str, Any]:
+        """The job's status once it finishes, or after ``timeout`` seconds if it is still running."""
+        job = self.get(job_id)
+        if job.task is not None and not job.task.done():
+            await asyncio.wait((job.task,), timeout=timeout)
+        return job.snapshot()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl
+        finished = [job for job in self._jobs.values() if job.finished_at is not None]
+        excess = len(finished) - self.max_finished
+        for job in finished:
+            if job.finished_at < cutoff or excess > 0:
+                del self._jobs[job.id]
+                excess -= 1
+
+    async def aclose(self) -> None:
+        """Cancels the jobs still running."""
+        tasks = [job.task for job in self._jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
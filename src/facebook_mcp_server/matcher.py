@@ -0,0 +1,126 @@
+import os
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Iterable
+
+
+DEFAULT_NEGATIVE_KEYWORDS = ("bad", "terrible", "awful", "hate", "dislike", "problem", "issue")
+
+# Joins comment texts for single-pass scanning; neither a word character nor whitespace,
+# so matches can never straddle two comments.
+_SEPARATOR = "\x00"
+
+
+def _normalize(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    Builds one regex alternation for ``terms`` with common prefixes factored out.
+
+    A flat ``a|b|c|...`` alternation makes the regex engine try every term at every
+    position; the trie form only explores branches that share the text seen so far,
+    which keeps lexicons of thousands of terms fast.
+    """
+    trie: dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict[str, Any]) -> str:
+        optional = "" in node
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + emit(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            # Longest match first: the engine tries the longer branch before ending the term here
+            return f"(?:{body})?" if len(branches) > 1 or len(body) > 1 else f"{body}?"
+        return body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """
+    Precompiled whole-word matcher for a weighted keyword lexicon.
+
+    Terms are matched case-insensitively on word boundaries (so "issue" does not fire on
+    "tissue"); multi-word terms tolerate any run of whitespace between words. A comment's
+    score is the sum of the weights of every term occurrence it contains.
+    """
+
+    def __init__(self, terms: Iterable[str] | dict[str, float] = DEFAULT_NEGATIVE_KEYWORDS) -> None:
+        weighted = terms.items() if isinstance(terms, dict) else ((term, 1.0) for term in terms)
+        self.weights: dict[str, float] = {}
+        for term, weight in weighted:
+            normalized = _normalize(term)
+            if normalized:
+                self.weights[normalized] = float(weight)
+        if not self.weights:
+            raise ValueError("Keyword lexicon is empty.")
+        self.pattern = re.compile(rf"(?<!\w){_trie_pattern(self.weights)}(?!\w)", re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path: str) -> "KeywordMatcher":
+        """
+        Loads a lexicon with one term per line, optionally followed by a tab and a weight.
+        Blank lines and lines starting with ``#`` are ignored.
+        """
+        terms: dict[str, float] = {}
+        with open(path, encoding="utf-8") as lexicon:
+            for line in lexicon:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                term, _, weight = line.partition("\t")
+                terms[term] = float(weight) if weight.strip() else 1.0
+        return cls(terms)
+
+    @classmethod
+    def from_env(cls) -> "KeywordMatcher":
+        """Uses the lexicon file named by FACEBOOK_NEGATIVE_LEXICON, or the built-in keywords."""
+        path = os.environ.get("FACEBOOK_NEGATIVE_LEXICON")
+        return cls.from_file(path) if path else cls()
+
+    def score_texts(self, texts: list[str]) -> list[tuple[list[str], float]]:
+        """Returns ``(matched_terms, score)`` for every text, scanning the whole batch in one pass."""
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+
+        matched: list[dict[str, None]] = [{} for _ in texts]
+        scores = [0.0] * len(texts)
+        for match in self.pattern.finditer(_SEPARATOR.join(texts)):
+            index = bisect_right(starts, match.start()) - 1
+            term = _normalize(match.group())
+            matched[index][term] = None
+            scores[index] += self.weights.get(term, 1.0)
+        return [(list(terms), score) for terms, score in zip(matched, scores)]
+
+    def score_comments(self, comments: list[dict[str, Any]], min_score: float = 0.0) -> list[dict[str, Any]]:
+        """
+        Scores a batch of Graph comments and returns those scoring above ``min_score``,
+        each annotated with its ``matched_terms`` and ``score``.
+        """
+        texts = [comment.get("message") or "" for comment in comments]
+        flagged = []
+        for comment, (terms, score) in zip(comments, self.score_texts(texts)):
+            if terms and score > min_score:
+                flagged.append({**comment, "matched_terms": terms, "score": score})
+        return flagged
+
+
+@lru_cache(maxsize=32)
+def matcher_for(terms: tuple[str, ...]) -> KeywordMatcher:
+    """Compiled matcher for an ad-hoc keyword list, reused across calls with the same list."""
+    return KeywordMatcher(terms)
@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, NamedTuple, Optional
+
+from .graph import GraphClient, env_float, env_int, next_cursor
+from .jobs import JobTracker
+from .scheduler import PostScheduler, parse_publish_time
+from .server import FacebookManager
+
+
+logger = logging.getLogger('facebook_mcp_server')
+
+# One field-expanded me/accounts call returns each Page's token and its linked Instagram account
+ACCOUNT_FIELDS = "id,name,access_token,instagram_business_account{id}"
+# A lookup for an unknown Page refreshes the directory at most this often (seconds)
+MIN_REFRESH_INTERVAL = 60.0
+
+
+def data_dir() -> str:
+    """
+    Directory for state that must outlive the process, such as the scheduled-post queue:
+    ``FACEBOOK_DATA_DIR``, or ``facebook-mcp-server`` in the user's data directory.
+    """
+    configured = os.environ.get("FACEBOOK_DATA_DIR")
+    if configured:
+        return configured
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "facebook-mcp-server")
+
+
+class PageAccount(NamedTuple):
+    id: str
+    name: Optional[str]
+    access_token: str
+    instagram_account_id: Optional[str]
+
+
+class PageDirectory:
+    """
+    The Pages a server may act for, with their Page access tokens.
+
+    Pages come from the Pages configured directly (Page ID plus Page token) and, when a user
+    or system user token is given, from ``me/accounts``: one paginated, field-expanded listing
+    returns every Page the token manages with its Page token and linked Instagram business
+    account. The listing is cached for ``ttl`` seconds and refreshed on expiry, on demand, or
+    when an unknown Page is asked for; concurrent lookups share a single refresh.
+    """
+
+    def __init__(self, graph: GraphClient, user_access_token: Optional[str] = None,
+                 static_pages: tuple[PageAccount, ...] = (), ttl: float = 3600.0) -> None:
+        self.graph = graph
+        self.user_access_token = user_access_token
+        self.static_pages = {page.id: page for page in static_pages}
+        self.ttl = ttl
+        self._pages: dict[str, PageAccount] = dict(self.static_pages)
+        self._refreshed_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _stale(self) -> bool:
+        if self.user_access_token is None:
+            return False
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.ttl
+
+    async def pages(self, refresh: bool = False) -> list[PageAccount]:
+        """Every known Page, refreshing the ``me/accounts`` listing first when it is stale or ``refresh`` is set."""
+        if refresh or self._stale():
+            await self.refresh(force=refresh)
+        return list(self._pages.values())
+
+    async def get(self, page_id: str) -> PageAccount:
+        """The Page ``page_id``; raises ValueError when the configured tokens do not manage it."""
+        if self._stale():
+            await self.refresh()
+        page = self._pages.get(page_id)
+        if page is None and self.user_access_token is not None and (
+            time.monotonic() - (self._refreshed_at or 0.0) > MIN_REFRESH_INTERVAL
+        ):
+            # The Page may have been connected since the last listing
+            await self.refresh(force=True)
+            page = self._pages.get(page_id)
+        if page is None:
+            raise ValueError(f"Page {page_id} is not managed by the configured tokens; "
+                             f"known pages: {', '.join(self._pages) or 'none'}")
+        return page
+
+    async def refresh(self, force: bool = False) -> None:
+        """Re-reads ``me/accounts``; callers waiting on the same refresh reuse its result."""
+        if self.user_access_token is None:
+            return
+        started = time.monotonic()
+        async with self._lock:
+            if not force and not self._stale():
+                return
+            if force and self._refreshed_at is not None and self._refreshed_at >= started:
+                return
+            pages = dict(self.static_pages)
+            params: dict[str, Any] = {"fields": ACCOUNT_FIELDS, "limit": 100, "access_token": self.user_access_token}
+            while True:
+                # Never cached: the response carries Page tokens
+                resp = await self.graph.get("/me/accounts", params=params, cache=False)
+                if "error" in resp:
+                    raise RuntimeError(f"Could not list Pages for the user token: {resp['error']}")
+                for item in resp.get("data") or []:
+                    instagram = item.get("instagram_business_account") or {}
+                    page = PageAccount(
+                        id=item["id"],
+                        name=item.get("name"),
+                        access_token=item["access_token"],
+                        instagram_account_id=instagram.get("id"),
+                    )
+                    configured = self.static_pages.get(page.id)
+                    if configured is not None:
+                        # A configured Page keeps its own token and Instagram account; the listing fills the gaps
+                        page = configured._replace(
+                            name=configured.name or page.name,
+                            instagram_account_id=configured.instagram_account_id or page.instagram_account_id,
+                        )
+                    pages[page.id] = page
+                after = next_cursor(resp)
+                if not after:
+                    break
+                params["after"] = after
+            self._pages = pages
+            self._refreshed_at = time.monotonic()
+            logger.info(f"Page directory refreshed: {len(pages)} page(s)")
+
+
+class FacebookPages:
+    """
+    Serves many Pages from one process: hands out a FacebookManager per Page, all sharing
+    one GraphClient (connection pool, read cache and usage throttle). The throttle keeps
+    Page-level limits per Page token, so only app-level limits pause every Page.
+
+    Calls without a ``page_id`` go to ``default_page_id``, or to the only Page when exactly
+    one is known. A Page's manager is created on first use and keeps its idempotency keys;
+    its token is updated in place when the directory refreshes.
+
+    Posts scheduled for later are queued in ``scheduler`` and published by its background
+    workers through the same managers; publishes started in background mode on any Page are
+    tracked in ``jobs``.
+    """
+
+    def __init__(self, directory: PageDirectory, default_page_id: Optional[str] = None,
+                 scheduler_path: Optional[str] = None, scheduler_workers: int = 2,
+                 jobs: Optional[JobTracker] = None) -> None:
+        self.directory = directory
+        self.graph = directory.graph
+        self.default_page_id = default_page_id
+        self._managers: dict[str, FacebookManager] = {}
+        self.jobs = jobs or JobTracker()
+        self.scheduler = PostScheduler(
+            self.manager,
+            self.page_ids,
+            scheduler_path or os.path.join(data_dir(), "schedule.sqlite3"),
+            workers=scheduler_workers,
+        )
+
+    async def manager(self, page_id: Optional[str] = None) -> FacebookManager:
+        page = await self.directory.get(page_id or await self._default_page_id())
+        manager = self._managers.get(page.id)
+        if manager is None:
+            manager = self._managers[page.id] = FacebookManager(
+                page_id=page.id,
+                access_token=page.access_token,
+                instagram_account_id=page.instagram_account_id,
+                graph=self.graph,
+                jobs=self.jobs,
+            )
+        else:
+            manager.access_token = page.access_token
+            manager.instagram_account_id = page.instagram_account_id
+        return manager
+
+    async def page_ids(self) -> list[str]:
+        """IDs of every managed Page."""
+        return [page.id for page in await self.directory.pages()]
+
+    async def _default_page_id(self) -> str:
+        if self.default_page_id:
+            return self.default_page_id
+        pages = await self.directory.pages()
+        if len(pages) == 1:
+            return pages[0].id
+        raise ValueError(f"page_id is required; available pages: {', '.join(page.id for page in pages) or 'none'}")
+
+    async def list_pages(self, refresh: bool = False) -> dict[str, Any]:
+        """The managed Pages (without their tokens)."""
+        pages = await self.directory.pages(refresh=refresh)
+        return {"data": [
+            {
+                "id": page.id,
+                "name": page.name,
+                "instagram_account_id": page.instagram_account_id,
+                "default": page.id == self.default_page_id or len(pages) == 1,
+            }
+            for page in pages
+        ]}
+
+    async def schedule_post(self, message: str, publish_at: str | float,
+                            page_id: Optional[str] = None) -> dict[str, Any]:
+        """Queues a text post to be published on the Page at ``publish_at`` (unix time or ISO 8601)."""
+        manager = await self.manager(page_id)
+        return await self.scheduler.schedule(manager.page_id, "post", {"message": message},
+                                             parse_publish_time(publish_at))
+
+    async def schedule_media(self, caption: str, media_urls: list[str], media_type: str, platforms: list[str],
+                             publish_at: str | float, page_id: Optional[str] = None) -> dict[str, Any]:
+        """Queues a ``post_media`` publish for ``publish_at`` (unix time or ISO 8601)."""
+        manager = await self.manager(page_id)
+        payload = {"caption": caption, "media_urls": media_urls, "media_type": media_type, "platforms": platforms}
+        return await self.scheduler.schedule(manager.page_id, "media", payload, parse_publish_time(publish_at))
+
+    def rate_limit_status(self) -> dict[str, Any]:
+        """Latest Graph usage budgets (the app's and each Page's) and the resulting request pacing."""
+        return self.graph.throttle.status({page_id: manager.access_token for page_id, manager in self._managers.items()})
+
+    def cache_stats(self) -> dict[str, Any]:
+        """Hit/miss counters and occupancy of the Graph read cache."""
+        if self.graph.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.graph.cache.stats()}
+
+    async def aclose(self) -> None:
+        """Stops the scheduled-post workers and background jobs, and releases the pooled Graph API connections."""
+        await self.scheduler.aclose()
+        await self.jobs.aclose()
+        await self.graph.aclose()
+
+
+def pages_from_config(page_id: Optional[str], page_access_token: Optional[str],
+                      instagram_account_id: Optional[str], user_access_token: Optional[str],
+                      graph: Optional[GraphClient] = None) -> FacebookPages:
+    """Builds the Page directory and managers from ``load_facebook_config()`` values."""
+    static_pages = ()
+    if page_id and page_access_token:
+        static_pages = (PageAccount(page_id, None, page_access_token, instagram_account_id),)
+    directory = PageDirectory(
+        graph or GraphClient(),
+        user_access_token=user_access_token,
+        static_pages=static_pages,
+        ttl=env_float("FACEBOOK_PAGE_TOKEN_TTL", 3600.0),
+    )
+    return FacebookPages(
+        directory,
+        default_page_id=page_id,
+        scheduler_path=os.environ.get("FACEBOOK_SCHEDULE_DB"),
+        scheduler_workers=env_int("FACEBOOK_SCHEDULE_WORKERS", 2),
+        jobs=JobTracker(ttl=env_float("FACEBOOK_JOB_TTL", 3600.0)),
+    )
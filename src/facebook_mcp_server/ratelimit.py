@@ -0,0 +1,206 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Mapping, Optional
+
+
+logger = logging.getLogger('facebook_mcp_server')
+
+# Graph error codes that mean "slow down": app (4), user (17), page (32), custom (613)
+# and business use case (80000-80014) rate limits.
+THROTTLE_ERROR_CODES = frozenset({4, 17, 32, 613, *range(80000, 80015)})
+
+USAGE_HEADERS = {
+    "app": "x-app-usage",
+    "page": "x-page-usage",
+    "business_use_case": "x-business-use-case-usage",
+}
+# Limits on the whole app, shared by every Page token; all other limits apply to one Page (token)
+APP_SCOPE = "app"
+APP_THROTTLE_ERROR_CODES = frozenset({4})
+# Idle Page budgets are dropped once more than this many are tracked
+MAX_SCOPES = 256
+
+
+def _usage_pct(usage: Mapping[str, Any]) -> float:
+    return max(
+        (float(value) for key, value in usage.items() if key in ("call_count", "total_time", "total_cputime")),
+        default=0.0,
+    )
+
+
+class Budget:
+    """Reported usage, pacing and lockout of one rate limit scope: the app, or one Page token."""
+
+    __slots__ = ("usage", "usage_pct", "blocked_until", "next_slot")
+
+    def __init__(self) -> None:
+        self.usage: dict[str, Any] = {}
+        self.usage_pct = 0.0
+        self.blocked_until = 0.0
+        self.next_slot = 0.0
+
+    def idle(self, now: float) -> bool:
+        return self.blocked_until <= now and self.next_slot <= now
+
+
+class UsageThrottle:
+    """
+    Paces Graph API calls from the usage headers Facebook returns on every response.
+
+    ``X-App-Usage``, ``X-Page-Usage`` and ``X-Business-Use-Case-Usage`` report how much of
+    each rolling budget is used, as a percentage. Below ``soft_limit`` requests go out
+    unthrottled; above it dispatch is spaced out, quadratically more as usage nears 100%,
+    so the budget is not exhausted. When Facebook reports a lockout (a throttling error or
+    ``estimated_time_to_regain_access``) dispatch pauses until access is regained. In both
+    cases requests wait in FIFO order instead of failing, unless their slot is further away
+    than the caller can wait; those fail at once with a rate limit error.
+
+    Only app-level limits (``X-App-Usage``, error code 4) hold back every request. Page-level
+    usage and lockouts are kept per ``scope`` (the Page access token a request is made with),
+    so one Page reaching its limit does not pause the other Pages served by the process.
+    """
+
+    def __init__(self, soft_limit: float = 75.0, max_interval: float = 2.0, cooldown: float = 30.0,
+                 max_wait: float = 120.0) -> None:
+        self.soft_limit = soft_limit
+        self.max_interval = max_interval
+        self.cooldown = cooldown
+        # Longest a single request is held back (across re-dispatches) before its error is returned
+        self.max_wait = max_wait
+        self.throttled_responses = 0
+        self.total_wait = 0.0
+        self.app = Budget()
+        self._scopes: dict[str, Budget] = {}
+        # Code of the last throttling error, reported again by requests that are not sent
+        self._last_error_code = 4
+
+    def interval(self, budget: Budget) -> float:
+        """Current minimum spacing between requests dispatched against ``budget``, in seconds."""
+        if budget.usage_pct <= self.soft_limit:
+            return 0.0
+        pressure = min(1.0, (budget.usage_pct - self.soft_limit) / (100.0 - self.soft_limit))
+        return self.max_interval * pressure * pressure
+
+    def _budgets(self, scope: Optional[str]) -> tuple[Budget, ...]:
+        if scope is None:
+            return (self.app,)
+        budget = self._scopes.get(scope)
+        if budget is None:
+            if len(self._scopes) >= MAX_SCOPES:
+                now = time.monotonic()
+                self._scopes = {key: item for key, item in self._scopes.items() if not item.idle(now)}
+            budget = self._scopes[scope] = Budget()
+        return self.app, budget
+
+    def blocked_for(self, scope: Optional[str] = None) -> float:
+        now = time.monotonic()
+        return max(0.0, *(budget.blocked_until - now for budget in self._budgets(scope)))
+
+    def delay(self, scope: Optional[str] = None) -> float:
+        """Seconds until the next free dispatch slot for ``scope``."""
+        now = time.monotonic()
+        return max(0.0, *(max(budget.blocked_until, budget.next_slot) - now for budget in self._budgets(scope)))
+
+    async def acquire(self, scope: Optional[str] = None, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Reserves the next dispatch slot for ``scope``, waits for it and returns how long the
+        caller was held back. Returns None straight away, reserving nothing, when the slot is
+        more than ``max_wait`` seconds off.
+        """
+        budgets = self._budgets(scope)
+        started = time.monotonic()
+        while True:
+            now = time.monotonic()
+            # The slot is taken before the first await, so slots go out in FIFO order and the
+            # wait itself holds nothing that other callers need
+            slots = [max(now, budget.blocked_until, budget.next_slot) for budget in budgets]
+            slot = max(slots)
+            if max_wait is not None and slot - started > max_wait:
+                return None
+            # The app budget is spaced from its own slot, so one Page's pacing never delays the others
+            for budget, budget_slot in zip(budgets, slots):
+                budget.next_slot = (budget_slot if budget is self.app else slot) + self.interval(budget)
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            # A lockout reported while this caller waited holds it back again
+            if all(budget.blocked_until <= time.monotonic() for budget in budgets):
+                break
+        waited = time.monotonic() - started
+        self.total_wait += waited
+        return waited
+
+    def rejection(self, scope: Optional[str] = None) -> dict[str, Any]:
+        """Graph-style error body for a request not sent because its slot is beyond its max wait."""
+        usage_pct = max(budget.usage_pct for budget in self._budgets(scope))
+        return {"error": {
+            "message": f"Graph API rate limit reached (usage {usage_pct:.0f}%); requests are held back "
+                       f"for another {self.delay(scope):.0f}s, longer than this request may wait. Retry later.",
+            "type": "OAuthException",
+            "code": self._last_error_code,
+            "is_transient": True,
+        }}
+
+    def observe(self, headers: Mapping[str, str], body: Any, scope: Optional[str] = None) -> bool:
+        """Records the usage reported by a response to a ``scope`` request; returns True if it was a throttling error."""
+        budgets = self._budgets(scope)
+        page = budgets[-1]
+        regain_minutes = 0.0
+        for name, header in USAGE_HEADERS.items():
+            raw = headers.get(header)
+            if not raw:
+                continue
+            try:
+                usage = json.loads(raw)
+            except ValueError:
+                continue
+            (self.app if name == APP_SCOPE else page).usage[name] = usage
+            if name == "business_use_case":
+                for entries in usage.values():
+                    for entry in entries:
+                        regain_minutes = max(regain_minutes, float(entry.get("estimated_time_to_regain_access") or 0))
+        self.app.usage_pct = _usage_pct(self.app.usage.get("app", {}))
+        if page is not self.app:
+            page.usage_pct = max(
+                [_usage_pct(page.usage.get("page", {}))]
+                + [_usage_pct(entry) for entries in page.usage.get("business_use_case", {}).values() for entry in entries]
+            )
+
+        error = body.get("error") if isinstance(body, dict) else None
+        throttled = isinstance(error, dict) and error.get("code") in THROTTLE_ERROR_CODES
+        if throttled:
+            self.throttled_responses += 1
+            self._last_error_code = error["code"]
+        if throttled or regain_minutes:
+            pause = regain_minutes * 60 if regain_minutes else self.cooldown
+            app_wide = throttled and error["code"] in APP_THROTTLE_ERROR_CODES
+            budget = self.app if app_wide else page
+            budget.blocked_until = max(budget.blocked_until, time.monotonic() + pause)
+            level = "app" if budget is self.app else "page"
+            logger.warning(f"Graph API {level} rate limit reached (usage {budget.usage_pct:.0f}%); "
+                           f"pausing its dispatch for {pause:.1f}s")
+        return throttled
+
+    def _budget_status(self, budget: Budget) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "usage": budget.usage,
+            "max_usage_pct": budget.usage_pct,
+            "pacing_interval_seconds": round(self.interval(budget), 3),
+            "blocked_for_seconds": round(max(0.0, budget.blocked_until - now), 1),
+        }
+
+    def status(self, scopes: Optional[Mapping[str, str]] = None) -> dict[str, Any]:
+        """
+        The app budget and overall counters; ``scopes`` maps labels (e.g. Page IDs) to the scopes
+        whose budgets are listed under ``pages``, so access tokens are never shown.
+        """
+        pages = {label: self._scopes[scope] for label, scope in (scopes or {}).items() if scope in self._scopes}
+        return {
+            **self._budget_status(self.app),
+            "soft_limit_pct": self.soft_limit,
+            "throttled_responses": self.throttled_responses,
+            "total_wait_seconds": round(self.total_wait, 1),
+            "pages": {label: self._budget_status(budget) for label, budget in pages.items()},
+        }
@@ -0,0 +1,45 @@
+from typing import Any, Iterator, Optional
+
+from .concurrency import backoff_delays
+
+
+# Graph error codes documented as temporary: unknown error (1), service unavailable (2)
+TRANSIENT_ERROR_CODES = frozenset({1, 2})
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed Graph call is retried and how long to wait before retrying.
+
+    Idempotent calls (GETs, DELETEs, and POSTs the caller marks as safe to repeat) are
+    retried on any transport error, 5xx, or transient Graph error. Other POSTs are retried
+    only when Facebook cannot have acted on them: the connection was never made, or Graph
+    flagged the error as transient. A retried write must not create a duplicate post.
+    Retries stop after ``max_attempts`` or when the per-call ``deadline`` (seconds) would
+    be exceeded.
+    """
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 8.0,
+                 deadline: float = 60.0) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def delays(self) -> Iterator[float]:
+        return backoff_delays(self.base_delay, factor=2.0, maximum=self.max_delay)
+
+    def retry_exception(self, idempotent: bool, exc: Exception) -> bool:
+        # Only called for httpx errors, so httpx is already loaded
+        import httpx
+
+        # Transport failures raised before the request reached Facebook are safe to retry for any method
+        if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            return True
+        return idempotent and isinstance(exc, httpx.TransportError)
+
+    def retry_response(self, idempotent: bool, status_code: int, body: Optional[Any]) -> bool:
+        error = body.get("error") if isinstance(body, dict) else None
+        if isinstance(error, dict) and (error.get("is_transient") or error.get("code") in TRANSIENT_ERROR_CODES):
+            return True
+        return idempotent and status_code >= 500
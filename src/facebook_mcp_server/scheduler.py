@@ -0,0 +1,336 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+
+logger = logging.getLogger('facebook_mcp_server')
+
+JOB_KINDS = ("post", "media")
+JOB_STATUSES = ("scheduled", "running", "published", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scheduled_posts (
+    id TEXT PRIMARY KEY,
+    page_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    publish_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS scheduled_posts_due ON scheduled_posts (status, publish_at);
+"""
+# Columns added after the first release of the table, added to existing queues on open
+_ADDED_COLUMNS = {"owner": "TEXT", "lease_until": "REAL"}
+# A running job whose publisher has not renewed its lease for this long is taken to be abandoned
+LEASE_SECONDS = 60.0
+
+
+def parse_publish_time(value: str | float) -> float:
+    """
+    Unix timestamp for a publish time given as a timestamp or an ISO 8601 date/time.
+    Times without a UTC offset are taken as UTC.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = value.strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"publish_at must be a unix timestamp or an ISO 8601 time, got {value!r}") from None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="seconds")
+
+
+class ScheduledPostQueue:
+    """
+    SQLite table of scheduled publishes. Every method is a short blocking transaction; the
+    connection is shared by the threads that run them, one at a time.
+
+    Several processes may share a queue (a server publishing, a command-line run adding jobs).
+    A publisher claims a job for the Pages it manages under its ``owner`` ID with a lease that
+    it renews while publishing; only jobs whose lease ran out (their publisher died) are
+    failed by the others.
+    """
+
+    def __init__(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(scheduled_posts)")}
+        for name, kind in _ADDED_COLUMNS.items():
+            if name not in columns:
+                self._db.execute(f"ALTER TABLE scheduled_posts ADD COLUMN {name} {kind}")
+        self._lock = threading.Lock()
+
+    def add(self, page_id: str, kind: str, payload: dict[str, Any], publish_at: float) -> dict[str, Any]:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO scheduled_posts (id, page_id, kind, payload, publish_at, status, created_at, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, 'scheduled', ?, ?)",
+                (job_id, page_id, kind, json.dumps(payload), publish_at, now, now),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict[str, Any]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM scheduled_posts WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"No scheduled job {job_id}")
+        return self._job(row)
+
+    def list_jobs(self, status: Optional[str] = None, page_id: Optional[str] = None, limit: int = 50) -> list[dict[str, Any]]:
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if page_id:
+            clauses.append("page_id = ?")
+            params.append(page_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM scheduled_posts {where} ORDER BY publish_at LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def cancel(self, job_id: str) -> dict[str, Any]:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE scheduled_posts SET status = 'cancelled', updated_at = ? WHERE id = ? AND status = 'scheduled'",
+                (time.time(), job_id),
+            )
+        job = self.get(job_id)
+        if not cursor.rowcount:
+            raise ValueError(f"Job {job_id} is {job['status']}; only scheduled jobs can be cancelled")
+        return job
+
+    def claim_due(self, owner: str, page_ids: list[str], now: float, limit: int) -> list[dict[str, Any]]:
+        """
+        Marks up to ``limit`` jobs of ``page_ids`` due at ``now`` as running under a lease for
+        ``owner`` and returns them, earliest first.
+        """
+        marks = ", ".join("?" * len(page_ids))
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    f"SELECT * FROM scheduled_posts WHERE status = 'scheduled' AND publish_at <= ?"
+                    f" AND page_id IN ({marks}) ORDER BY publish_at LIMIT ?",
+                    (now, *page_ids, limit),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE scheduled_posts SET status = 'running', owner = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                    [(owner, now + LEASE_SECONDS, now, row["id"]) for row in rows],
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return [{**self._job(row), "status": "running"} for row in rows]
+
+    def renew(self, owner: str, now: float) -> None:
+        """Extends the leases of the jobs ``owner`` is publishing."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE scheduled_posts SET lease_until = ? WHERE status = 'running' AND owner = ?",
+                (now + LEASE_SECONDS, owner),
+            )
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE scheduled_posts SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, None if result is None else json.dumps(result, default=str), error, time.time(), job_id),
+            )
+
+    def next_due(self, page_ids: list[str]) -> Optional[float]:
+        marks = ", ".join("?" * len(page_ids))
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT MIN(publish_at) FROM scheduled_posts WHERE status = 'scheduled' AND page_id IN ({marks})",
+                page_ids,
+            ).fetchone()
+        return row[0]
+
+    def expire_leases(self, now: float) -> int:
+        """Fails running jobs whose publisher stopped renewing its lease; they may or may not have been published."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE scheduled_posts SET status = 'failed', error = ?, updated_at = ?"
+                " WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+                ("Interrupted by a server restart while publishing; check the Page before rescheduling.", now, now),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> dict[str, Any]:
+        return {
+            "id": row["id"],
+            "page_id": row["page_id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "publish_at": _iso(row["publish_at"]),
+            "payload": json.loads(row["payload"]),
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": _iso(row["created_at"]),
+            "updated_at": _iso(row["updated_at"]),
+        }
+
+
+class PostScheduler:
+    """
+    Publishes scheduled posts in the background.
+
+    Jobs live in a ``ScheduledPostQueue`` at ``path``, so they survive restarts. A dispatcher
+    task sleeps until the next publish time (or until a job is added), claims the due jobs of
+    the Pages returned by ``page_ids`` and publishes them on at most ``workers`` tasks at
+    once, renewing their leases meanwhile. Database calls run in a worker thread, so neither
+    the queue nor publishing ever blocks interactive tool calls. A failed dispatch round is
+    logged and retried after ``poll_interval``.
+
+    Nothing is published until ``start()`` is called (servers do, one-off command-line runs
+    only queue). Until the database file exists the dispatcher only polls for it, so jobs
+    queued by another process sharing ``path`` are picked up without creating the file here.
+    """
+
+    def __init__(self, resolve_manager: Callable[[str], Awaitable[Any]], page_ids: Callable[[], Awaitable[Iterable[str]]],
+                 path: str, workers: int = 2, poll_interval: float = 30.0) -> None:
+        self.resolve_manager = resolve_manager
+        self.page_ids = page_ids
+        self.path = path
+        # Lease owner of the jobs this process claims
+        self.owner = uuid.uuid4().hex
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self._queue: Optional[ScheduledPostQueue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running: set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+
+    async def _call(self, method: str, *args: Any) -> Any:
+        if self._queue is None:
+            self._queue = await asyncio.to_thread(ScheduledPostQueue, self.path)
+        return await asyncio.to_thread(getattr(self._queue, method), *args)
+
+    def start(self) -> None:
+        """Starts publishing due jobs in the background; call from a running event loop."""
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def schedule(self, page_id: str, kind: str, payload: dict[str, Any], publish_at: float) -> dict[str, Any]:
+        job = await self._call("add", page_id, kind, payload, publish_at)
+        self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> dict[str, Any]:
+        return await self._call("get", job_id)
+
+    async def list_jobs(self, status: Optional[str] = None, page_id: Optional[str] = None, limit: int = 50) -> dict[str, Any]:
+        return {"data": await self._call("list_jobs", status, page_id, limit)}
+
+    async def cancel(self, job_id: str) -> dict[str, Any]:
+        return await self._call("cancel", job_id)
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                delay = await self._dispatch_due()
+            except Exception:
+                logger.exception("Scheduled post dispatch failed; retrying")
+                delay = self.poll_interval
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch_due(self) -> float:
+        """Starts publishing the due jobs that free workers can take; returns how long to sleep."""
+        if self._queue is None and not os.path.exists(self.path):
+            return self.poll_interval
+        now = time.time()
+        expired = await self._call("expire_leases", now)
+        if expired:
+            logger.warning(f"{expired} scheduled post(s) were interrupted by a restart and marked failed")
+        if self._running:
+            await self._call("renew", self.owner, now)
+        page_ids = list(await self.page_ids())
+        free = self.workers - len(self._running)
+        if free > 0 and page_ids:
+            for job in await self._call("claim_due", self.owner, page_ids, now, free):
+                task = asyncio.create_task(self._publish(job))
+                self._running.add(task)
+                task.add_done_callback(self._publish_done)
+        delay = self.poll_interval
+        if len(self._running) < self.workers and page_ids:
+            next_due = await self._call("next_due", page_ids)
+            if next_due is not None:
+                delay = min(delay, max(0.0, next_due - time.time()))
+        # Otherwise woken up when a worker frees up; leases are renewed well before they run out
+        return min(delay, LEASE_SECONDS / 3) if self._running else delay
+
+    def _publish_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._wakeup.set()
+
+    async def _publish(self, job: dict[str, Any]) -> None:
+        payload = job["payload"]
+        # The job ID doubles as idempotency key, so a publish retried within this process is not duplicated
+        idempotency_key = f"scheduled:{job['id']}"
+        try:
+            manager = await self.resolve_manager(job["page_id"])
+            if job["kind"] == "post":
+                result = await manager.post_to_facebook(payload["message"], idempotency_key=idempotency_key)
+                failed = "error" in result
+            else:
+                result = await manager.post_media(**payload, idempotency_key=idempotency_key)
+                failed = any(not isinstance(outcome, dict) or "error" in outcome for outcome in result.values())
+            status, error = ("failed", "Publishing failed; see result") if failed else ("published", None)
+        except Exception as exc:
+            logger.exception(f"Scheduled post {job['id']} failed")
+            result, status, error = None, "failed", str(exc)
+        await self._call("finish", job["id"], status, result, error)
+        logger.info(f"Scheduled post {job['id']} {status}")
+
+    async def aclose(self) -> None:
+        """Stops the dispatcher and workers; posts cut off mid-publish are failed once their lease runs out."""
+        tasks = [task for task in (self._dispatcher, *self._running) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+        if self._queue is not None:
+            await asyncio.to_thread(self._queue.close)
+            self._queue = None
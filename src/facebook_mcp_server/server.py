@@ -1,264 +1,710 @@
 import asyncio
+import heapq
 import logging
 import os
-import sys
 import time
-from typing import Any, Optional
-
-import mcp.server.stdio
-import requests
-from dotenv import load_dotenv
-from mcp.server import NotificationOptions, Server
-from mcp.server.models import InitializationOptions
-import mcp.types as types
-
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Reconfigure UnicodeEncodeError prone default (i.e. windows-1252) to utf-8
-if sys.platform == "win32" and os.environ.get('PYTHONIOENCODING') is None:
-    sys.stdin.reconfigure(encoding="utf-8")
-    sys.stdout.reconfigure(encoding="utf-8")
-    sys.stderr.reconfigure(encoding="utf-8")
-
-# Configure basic logging for easier debugging inside MCP clients
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-)
-logger = logging.getLogger('facebook_mcp_server')
-logger.info("Starting Facebook MCP Server")
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional
+from urllib.parse import urlencode
+
+from social_mcp_common.startup import configure_process, env_flag, start_prewarm
+from social_mcp_common.transport import serve
 
-# Facebook Graph API endpoint
-GRAPH_API_VERSION = "v18.0"
-GRAPH_API_BASE_URL = f"https://graph.facebook.com/{GRAPH_API_VERSION}"
+from .concurrency import backoff_delays, gather_limited
+from .fields import COMMENT_FIELD_NAMES, POST_FIELD_NAMES, graph_fields, top_level_fields
+from .graph import GraphClient, env_float, env_int, next_cursor
+from .idempotency import IdempotencyStore
+from .jobs import JobTracker, job_stage, stage_scope
+from .matcher import KeywordMatcher, matcher_for
+from .video_upload import ChunkedVideoUploader, is_local_media
 
 
-def load_facebook_config() -> tuple[str, str, Optional[str]]:
-    """Ensure required Facebook credentials are present."""
+logger = logging.getLogger('facebook_mcp_server')
+
+def load_facebook_config() -> tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """
+    Ensure required Facebook credentials are present.
+
+    Returns ``(page_id, page_access_token, instagram_account_id, user_access_token)``. Either a
+    Page ID with its Page token, or a user/system user token (whose Pages are discovered through
+    ``me/accounts``), or both must be set; with a user token, ``FACEBOOK_PAGE_ID`` alone selects
+    the default Page.
+    """
     page_access_token = os.environ.get("FACEBOOK_PAGE_ACCESS_TOKEN")
     page_id = os.environ.get("FACEBOOK_PAGE_ID")
     instagram_account_id = os.environ.get("INSTAGRAM_ACCOUNT_ID")
-
-    missing = [name for name, value in {
-        "FACEBOOK_PAGE_ACCESS_TOKEN": page_access_token,
-        "FACEBOOK_PAGE_ID": page_id,
-    }.items() if not value]
+    user_access_token = os.environ.get("FACEBOOK_USER_ACCESS_TOKEN")
+
+    if user_access_token:
+        # A Page token still has to say which Page it belongs to
+        required = {"FACEBOOK_PAGE_ID": page_id} if page_access_token else {}
+    else:
+        required = {
+            "FACEBOOK_PAGE_ACCESS_TOKEN": page_access_token,
+            "FACEBOOK_PAGE_ID": page_id,
+        }
+    missing = [name for name, value in required.items() if not value]
 
     if missing:
         raise RuntimeError(
             f"Missing required environment variable(s): {', '.join(missing)}. "
-            "Set them in a .env file or your shell before starting the server."
+            "Set them (or FACEBOOK_USER_ACCESS_TOKEN to serve every Page it manages) "
+            "in a .env file or your shell before starting the server."
         )
 
-    return page_id, page_access_token, instagram_account_id
+    return page_id, page_access_token, instagram_account_id, user_access_token
+
+
+COMMENT_FIELDS = "id,message,from,created_time"
+POST_FIELDS = "id,message,created_time"
+
+# Listing defaults: Graph page size and the overall cap on items returned by one call
+DEFAULT_PAGE_SIZE = 25
+DEFAULT_MAX_ITEMS = 100
+
+# Instagram media container status_code values
+IG_CONTAINER_READY = ("FINISHED",)
+IG_CONTAINER_FAILED = ("ERROR", "EXPIRED")
+
+# Largest comments.limit() requested inside a nested field expansion
+MAX_EMBEDDED_COMMENTS = 100
+
+
+def _is_error(result: Any) -> bool:
+    return not isinstance(result, dict) or "error" in result
+
+
+def _outcome_unknown(result: Any) -> bool:
+    """Whether a publish result leaves open if the post was created (e.g. it timed out mid-pipeline)."""
+    return isinstance(result, dict) and result.get("outcome") == "unknown"
+
+
+def _batch_item_result(item_id: str, response: dict[str, Any]) -> dict[str, Any]:
+    """Turns one decoded batch response into a per-item tool result."""
+    body = response["body"]
+    if isinstance(body, dict) and "error" in body:
+        return {"id": item_id, "error": body["error"]}
+    return {"id": item_id, "result": body}
+
+
+def _batch_page(response: dict[str, Any]) -> dict[str, Any]:
+    """
+    Turns one decoded batch response for an edge into the ``{"data", "next_cursor"}`` shape of
+    paginated reads; its ``paging`` URLs embed the access token, so they are not passed on.
+    """
+    body = response["body"]
+    if not isinstance(body, dict) or "error" in body:
+        return {"error": body.get("error") if isinstance(body, dict) else body}
+    return {"data": body.get("data", []), "next_cursor": next_cursor(body)}
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+@contextmanager
+def _timed_stage(timings: dict[str, float], stage: str) -> Iterator[None]:
+    """
+    Records the wall-clock duration of the enclosed block in ``timings[stage]`` (milliseconds),
+    and reports the stage to the background job running it, if any.
+    """
+    started = time.perf_counter()
+    try:
+        with job_stage(stage):
+            yield
+    finally:
+        timings[stage] = _elapsed_ms(started)
 
 
 class FacebookManager:
-    def __init__(self, page_id: str, access_token: str, instagram_account_id: Optional[str] = None) -> None:
+    def __init__(self, page_id: str, access_token: str, instagram_account_id: Optional[str] = None,
+                 graph: Optional[GraphClient] = None, upload_concurrency: Optional[int] = None,
+                 platform_timeouts: Optional[dict[str, float]] = None,
+                 negative_matcher: Optional[KeywordMatcher] = None, jobs: Optional[JobTracker] = None) -> None:
         self.page_id = page_id
         self.access_token = access_token
         self.instagram_account_id = instagram_account_id
+        self.graph = graph or GraphClient()
+        # Max number of media uploads/containers created in parallel for a single post
+        self.upload_concurrency = upload_concurrency or env_int("FACEBOOK_UPLOAD_CONCURRENCY", 5)
+        # Max number of follow-up Graph reads issued in parallel by listing tools
+        self.read_concurrency = env_int("FACEBOOK_READ_CONCURRENCY", 8)
+        # Results of publish calls by idempotency key, so retried publishes are not duplicated
+        self.idempotency = IdempotencyStore(ttl=env_float("FACEBOOK_IDEMPOTENCY_TTL", 86400.0))
+        # Publishes started in background mode; shared by the managers of every Page
+        self.jobs = jobs or JobTracker(ttl=env_float("FACEBOOK_JOB_TTL", 3600.0))
+        # Lexicon used by filter_negative_comments (FACEBOOK_NEGATIVE_LEXICON file or built-in keywords);
+        # loaded and compiled on first use so a large lexicon does not slow down startup
+        self._negative_matcher = negative_matcher
+        # Resumable chunked uploads for local video files
+        self.video_uploader = ChunkedVideoUploader(
+            self.graph,
+            state_dir=os.environ.get("FACEBOOK_UPLOAD_STATE_DIR"),
+            source_dir=os.environ.get("FACEBOOK_UPLOAD_DIR"),
+        )
+        # How long to wait for Instagram to finish processing a media container before publishing
+        self.container_timeout = env_float("INSTAGRAM_CONTAINER_TIMEOUT", 240.0)
+        # Per-platform deadline (seconds) for a whole post_media pipeline
+        self.platform_timeouts = {
+            "facebook": env_float("FACEBOOK_PUBLISH_TIMEOUT", 120.0),
+            "instagram": env_float("INSTAGRAM_PUBLISH_TIMEOUT", 300.0),
+            **(platform_timeouts or {}),
+        }
+
+    @property
+    def negative_matcher(self) -> KeywordMatcher:
+        if self._negative_matcher is None:
+            self._negative_matcher = KeywordMatcher.from_env()
+        return self._negative_matcher
 
-    def post_to_facebook(self, message: str) -> dict[str, Any]:
-        """Posts a simple text message to the Facebook Page."""
-        url = f"{GRAPH_API_BASE_URL}/{self.page_id}/feed"
+    async def aclose(self) -> None:
+        """Releases the pooled Graph API connections."""
+        await self.graph.aclose()
+
+    async def post_to_facebook(self, message: str, idempotency_key: Optional[str] = None) -> dict[str, Any]:
+        """
+        Posts a simple text message to the Facebook Page.
+
+        Retrying with the same ``idempotency_key`` returns the original post instead of
+        publishing it twice.
+        """
+        if not idempotency_key:
+            return await self._publish_text(message)
+        async with self.idempotency.claim(f"post_to_facebook:{idempotency_key}") as previous:
+            if previous is not None:
+                return {**previous, "idempotent_replay": True}
+            result = await self._publish_text(message)
+            if not _is_error(result):
+                self.idempotency.save(f"post_to_facebook:{idempotency_key}", result)
+            return result
+
+    async def _publish_text(self, message: str) -> dict[str, Any]:
         params = {
             "message": message,
             "access_token": self.access_token,
         }
-        response = requests.post(url, params=params)
-        return response.json()
+        result = await self.graph.post(f"/{self.page_id}/feed", params=params)
+        self._invalidate_reads(f"/{self.page_id}")
+        return result
 
-    def reply_to_comment(self, post_id: str, comment_id: str, message: str) -> dict[str, Any]:
+    async def reply_to_comment(self, post_id: str, comment_id: str, message: str) -> dict[str, Any]:
         """Replies to a comment on a specific post."""
-        url = f"{GRAPH_API_BASE_URL}/{comment_id}/comments"
         params = {
             "message": message,
             "access_token": self.access_token,
         }
-        response = requests.post(url, params=params)
-        return response.json()
+        result = await self.graph.post(f"/{comment_id}/comments", params=params)
+        self._invalidate_reads(f"/{post_id}", f"/{comment_id}", comments=True)
+        return result
+
+    async def get_page_posts(self, limit: int = DEFAULT_PAGE_SIZE, max_items: int = DEFAULT_MAX_ITEMS,
+                             since: Optional[str] = None, until: Optional[str] = None,
+                             after: Optional[str] = None, fields: Optional[list[str] | str] = None) -> dict[str, Any]:
+        """
+        Retrieves posts published on the Facebook Page, following pagination up to ``max_items``.
+
+        ``since``/``until`` bound the publish time (unix timestamp or any strtotime() value) and
+        ``after`` resumes from the ``next_cursor`` of a previous call. ``fields`` replaces the
+        default Graph field selection, e.g. ``["id", "permalink_url", "comments.summary(true).limit(0)"]``
+        to get comment counts without the comment bodies.
+        """
+        params = self._posts_params(limit, since, until, after, fields)
+        return await self._collect(f"/{self.page_id}/posts", params, max_items)
+
+    async def iter_page_posts(self, limit: int = DEFAULT_PAGE_SIZE, max_items: Optional[int] = None,
+                              since: Optional[str] = None, until: Optional[str] = None,
+                              after: Optional[str] = None, fields: Optional[list[str] | str] = None) -> AsyncIterator[dict[str, Any]]:
+        """Yields Page posts one at a time, fetching further pages only as they are consumed."""
+        params = self._posts_params(limit, since, until, after, fields)
+        async for post in self._iter_items(f"/{self.page_id}/posts", params, max_items):
+            yield post
+
+    async def get_post_comments(self, post_id: str, limit: int = DEFAULT_PAGE_SIZE, max_items: int = DEFAULT_MAX_ITEMS,
+                                after: Optional[str] = None, fields: Optional[list[str] | str] = None) -> dict[str, Any]:
+        """
+        Retrieves comments for a specific post, following pagination up to ``max_items``.
+
+        ``fields`` replaces the default Graph field selection, e.g. ``["id", "message", "like_count"]``.
+        """
+        return await self._collect(f"/{post_id}/comments", self._comments_params(limit, after, fields), max_items)
+
+    async def iter_post_comments(self, post_id: str, limit: int = DEFAULT_PAGE_SIZE, max_items: Optional[int] = None,
+                                 after: Optional[str] = None, fields: Optional[list[str] | str] = None) -> AsyncIterator[dict[str, Any]]:
+        """Yields comments of a post one at a time, fetching further pages only as they are consumed."""
+        async for comment in self._iter_items(f"/{post_id}/comments", self._comments_params(limit, after, fields), max_items):
+            yield comment
+
+    async def get_page_posts_with_comments(self, max_posts: int = DEFAULT_PAGE_SIZE, max_comments: int = DEFAULT_PAGE_SIZE,
+                                           since: Optional[str] = None, until: Optional[str] = None,
+                                           after: Optional[str] = None, fields: Optional[list[str] | str] = None,
+                                           comment_fields: Optional[list[str] | str] = None) -> dict[str, Any]:
+        """
+        Retrieves Page posts together with their comments.
+
+        Comments are embedded through nested field expansion, so one Graph request returns a
+        whole page of posts with their first comments. Extra comment pages are fetched (in
+        parallel) only for posts that have more than the embedded page and fewer than
+        ``max_comments`` so far. ``fields`` and ``comment_fields`` replace the default Graph
+        field selections for posts and comments.
+        """
+        params = self._posts_with_comments_params(max_posts, max_comments, since, until, after, fields, comment_fields)
+        result = await self._collect(f"/{self.page_id}/posts", params, max_posts)
+        if "data" not in result:
+            return result
+
+        result["data"] = await gather_limited(
+            self.read_concurrency,
+            (self._complete_post_comments(post, max_comments, comment_fields) for post in result["data"]),
+        )
+        return result
+
+    async def scan_page_negative_comments(self, days: float = 7, max_posts: int = DEFAULT_PAGE_SIZE,
+                                          max_comments_per_post: int = DEFAULT_MAX_ITEMS,
+                                          keywords: Optional[list[str]] = None, min_score: float = 0.0,
+                                          max_results: int = 50) -> dict[str, Any]:
+        """
+        Scans the comments of recent Page posts for negative ones and ranks them by score.
 
-    def get_page_posts(self) -> dict[str, Any]:
-        """Retrieves posts published on the Facebook Page."""
-        url = f"{GRAPH_API_BASE_URL}/{self.page_id}/posts"
+        Posts published in the last ``days`` are walked one Graph page at a time (comments
+        embedded via field expansion, extra comment pages fetched in parallel). Each post's
+        comments are classified as one batch and only the best ``max_results`` matches are
+        kept, so memory stays bounded however many comments are scanned.
+        """
+        started = time.perf_counter()
+        matcher = matcher_for(tuple(keywords)) if keywords else self.negative_matcher
+        since = str(int(time.time() - days * 86400))
+        params = self._posts_with_comments_params(max_posts, max_comments_per_post, since, None, None)
+
+        top: list[tuple[float, int, dict[str, Any]]] = []
+        posts_scanned = comments_scanned = flagged_total = 0
+        result: dict[str, Any] = {}
+        async for page in self.graph.paginate(f"/{self.page_id}/posts", params, max_items=max_posts):
+            if "error" in page:
+                if not posts_scanned:
+                    return page
+                result["error"] = page["error"]
+                break
+            posts = await gather_limited(
+                self.read_concurrency,
+                (self._complete_post_comments(post, max_comments_per_post) for post in page.get("data", [])),
+            )
+            for post in posts:
+                comments = post["comments"]["data"]
+                posts_scanned += 1
+                comments_scanned += len(comments)
+                for comment in matcher.score_comments(comments, min_score=min_score):
+                    flagged_total += 1
+                    # Ties keep the earlier hit, i.e. the comment on the more recent post
+                    entry = (comment["score"], -flagged_total, {**comment, "post_id": post["id"]})
+                    if len(top) < max_results:
+                        heapq.heappush(top, entry)
+                    else:
+                        heapq.heappushpop(top, entry)
+
+        result.update({
+            "flagged": [entry for _, _, entry in sorted(top, key=lambda item: (item[0], item[1]), reverse=True)],
+            "flagged_total": flagged_total,
+            "posts_scanned": posts_scanned,
+            "comments_scanned": comments_scanned,
+            "elapsed_ms": _elapsed_ms(started),
+        })
+        return result
+
+    def _posts_with_comments_params(self, max_posts: int, max_comments: int, since: Optional[str],
+                                    until: Optional[str], after: Optional[str],
+                                    fields: Optional[list[str] | str] = None,
+                                    comment_fields: Optional[list[str] | str] = None) -> dict[str, Any]:
+        embedded_limit = min(max_comments, MAX_EMBEDDED_COMMENTS)
+        # Comments are always embedded below; their fields come from comment_fields
+        if fields:
+            fields = graph_fields(fields, POST_FIELD_NAMES - {"comments"})
+        params = self._posts_params(min(max_posts, DEFAULT_PAGE_SIZE), since, until, after, fields)
+        # Posts need their id to page through the remaining comments
+        if "id" not in top_level_fields(params["fields"]):
+            params["fields"] = f"id,{params['fields']}"
+        comment_selection = self._comment_fields(comment_fields)
+        params["fields"] += f",comments.limit({embedded_limit}){{{comment_selection}}}"
+        return params
+
+    async def _complete_post_comments(self, post: dict[str, Any], max_comments: int,
+                                      comment_fields: Optional[list[str] | str] = None) -> dict[str, Any]:
+        # Pages may come from the read cache, so the post is copied rather than modified in place
+        embedded = post.get("comments") or {}
+        comments = list(embedded.get("data", []))[:max_comments]
+        cursor = next_cursor(embedded)
+        if cursor and len(comments) < max_comments:
+            rest = await self._collect(
+                f"/{post['id']}/comments",
+                self._comments_params(DEFAULT_PAGE_SIZE, cursor, comment_fields),
+                max_comments - len(comments),
+            )
+            comments.extend(rest.get("data", []))
+            cursor = rest.get("next_cursor")
+        return {**post, "comments": {"data": comments, "next_cursor": cursor}}
+
+    def _posts_params(self, limit: int, since: Optional[str], until: Optional[str], after: Optional[str],
+                      fields: Optional[list[str] | str] = None) -> dict[str, Any]:
         params = {
             "access_token": self.access_token,
-            "fields": "id,message,created_time",
+            "fields": graph_fields(fields, POST_FIELD_NAMES) if fields else POST_FIELDS,
+            "limit": limit,
         }
-        response = requests.get(url, params=params)
-        return response.json()
+        for key, value in (("since", since), ("until", until), ("after", after)):
+            if value:
+                params[key] = value
+        return params
 
-    def get_post_comments(self, post_id: str) -> dict[str, Any]:
-        """Retrieves comments for a specific post."""
-        url = f"{GRAPH_API_BASE_URL}/{post_id}/comments"
+    @staticmethod
+    def _comment_fields(fields: Optional[list[str] | str]) -> str:
+        return graph_fields(fields, COMMENT_FIELD_NAMES) if fields else COMMENT_FIELDS
+
+    def _comments_params(self, limit: int, after: Optional[str], fields: Optional[list[str] | str] = None) -> dict[str, Any]:
         params = {
             "access_token": self.access_token,
-            "fields": "id,message,from,created_time",
+            "fields": self._comment_fields(fields),
+            "limit": limit,
         }
-        response = requests.get(url, params=params)
-        return response.json()
-
-    def filter_negative_comments(self, comments: dict[str, Any]) -> list[dict[str, Any]]:
-        """Filters negative comments based on a simple keyword list."""
-        negative_keywords = ["bad", "terrible", "awful", "hate", "dislike", "problem", "issue"]
-        negative_comments = []
-        if 'data' in comments:
-            for comment in comments['data']:
-                if 'message' in comment:
-                    for keyword in negative_keywords:
-                        if keyword in comment['message'].lower():
-                            negative_comments.append(comment)
-                            break
-        return negative_comments
+        if after:
+            params["after"] = after
+        return params
+
+    async def _collect(self, path: str, params: dict[str, Any], max_items: Optional[int]) -> dict[str, Any]:
+        """
+        Gathers the items of a paginated edge into ``{"data": [...], "next_cursor": ...}``.
+
+        ``next_cursor`` is None once the edge is exhausted. If a later page fails, the items
+        fetched so far are returned along with the error and the cursor to retry from.
+        """
+        result: dict[str, Any] = {"data": [], "next_cursor": None}
+        async for page in self.graph.paginate(path, params, max_items=max_items):
+            if "error" in page:
+                if not result["data"]:
+                    return page
+                result["error"] = page["error"]
+                break
+            result["data"].extend(page.get("data", []))
+            result["next_cursor"] = next_cursor(page)
+        return result
+
+    async def _iter_items(self, path: str, params: dict[str, Any], max_items: Optional[int]) -> AsyncIterator[dict[str, Any]]:
+        async for page in self.graph.paginate(path, params, max_items=max_items):
+            if "error" in page:
+                raise RuntimeError(f"Graph API error while listing {path}: {page['error']}")
+            for item in page.get("data", []):
+                yield item
+
+    def filter_negative_comments(self, comments: dict[str, Any], keywords: Optional[list[str]] = None,
+                                 min_score: float = 0.0) -> list[dict[str, Any]]:
+        """
+        Filters negative comments with a precompiled whole-word keyword matcher.
+
+        Uses the configured lexicon unless ``keywords`` is given. Each flagged comment is
+        returned with its ``matched_terms`` and ``score``.
+        """
+        matcher = matcher_for(tuple(keywords)) if keywords else self.negative_matcher
+        return matcher.score_comments(comments.get('data', []), min_score=min_score)
     
-    def delete_post(self, post_id: str) -> dict[str, Any]:
+    async def delete_post(self, post_id: str) -> dict[str, Any]:
         """Deletes a post from the Facebook Page."""
-        url = f"{GRAPH_API_BASE_URL}/{post_id}"
         params = {
             "access_token": self.access_token,
         }
-        response = requests.delete(url, params=params)
-        return response.json()
+        result = await self.graph.delete(f"/{post_id}", params=params)
+        self._invalidate_reads(f"/{self.page_id}", f"/{post_id}")
+        return result
 
-    def delete_comment(self, comment_id: str) -> dict[str, Any]:
+    async def delete_comment(self, comment_id: str) -> dict[str, Any]:
         """Deletes a comment from a post."""
-        url = f"{GRAPH_API_BASE_URL}/{comment_id}"
         params = {
             "access_token": self.access_token,
         }
-        response = requests.delete(url, params=params)
-        return response.json()
+        result = await self.graph.delete(f"/{comment_id}", params=params)
+        self._invalidate_reads(f"/{comment_id}", comments=True)
+        return result
+
+    def _invalidate_reads(self, *paths: str, comments: bool = False) -> None:
+        """
+        Drops cached reads made stale by a write: each of ``paths`` and everything beneath it.
+
+        ``comments`` marks writes that add or remove comments. Their parent post is not always
+        known, so every cached comment listing is dropped, and so are the Page's post listings,
+        which embed comments through the ``comments{...}`` field expansion.
+        """
+        posts = f"/{self.page_id}/posts"
+
+        def stale(path: str) -> bool:
+            if comments and (path.endswith("/comments") or path == posts):
+                return True
+            return any(path == prefix or path.startswith(prefix + "/") for prefix in paths)
+
+        self.graph.invalidate(stale)
+
+    # --- Bulk Methods (Graph batch requests, 50 operations per HTTP call) ---
+
+    async def bulk_delete_comments(self, comment_ids: list[str]) -> list[dict[str, Any]]:
+        """Deletes many comments, returning one result per comment ID."""
+        responses = await self.graph.batch(
+            [{"method": "DELETE", "relative_url": comment_id} for comment_id in comment_ids],
+            access_token=self.access_token,
+        )
+        self._invalidate_reads(*(f"/{comment_id}" for comment_id in comment_ids), comments=True)
+        return [_batch_item_result(comment_id, response) for comment_id, response in zip(comment_ids, responses)]
+
+    async def bulk_reply(self, replies: list[dict[str, str]]) -> list[dict[str, Any]]:
+        """Replies to many comments; each reply is ``{"comment_id": ..., "message": ...}``."""
+        responses = await self.graph.batch(
+            [
+                {"method": "POST", "relative_url": f"{reply['comment_id']}/comments", "body": {"message": reply["message"]}}
+                for reply in replies
+            ],
+            access_token=self.access_token,
+        )
+        self._invalidate_reads(*(f"/{reply['comment_id']}" for reply in replies), comments=True)
+        return [_batch_item_result(reply["comment_id"], response) for reply, response in zip(replies, responses)]
+
+    async def get_comments_for_posts(self, post_ids: list[str], limit: int = DEFAULT_PAGE_SIZE,
+                                     fields: Optional[list[str] | str] = None) -> dict[str, Any]:
+        """
+        Retrieves the first page of comments of many posts, keyed by post ID.
+
+        Each post maps to ``{"data": [...], "next_cursor": ...}`` like ``get_post_comments``
+        (which continues from that cursor), or to ``{"error": ...}``.
+        """
+        query = urlencode({"fields": self._comment_fields(fields), "limit": limit})
+        responses = await self.graph.batch(
+            [{"method": "GET", "relative_url": f"{post_id}/comments?{query}"} for post_id in post_ids],
+            access_token=self.access_token,
+        )
+        return {post_id: _batch_page(response) for post_id, response in zip(post_ids, responses)}
 
     # --- Advanced Posting Methods ---
 
-    def post_media(self, caption: str, media_urls: list[str], media_type: str, platforms: list[str]) -> dict[str, Any]:
+    async def post_media(self, caption: str, media_urls: list[str], media_type: str, platforms: list[str],
+                         idempotency_key: Optional[str] = None, retry_unknown: bool = False) -> dict[str, Any]:
         """
         Posts media to Facebook and/or Instagram.
         
         :param caption: Text caption for the post.
-        :param media_urls: List of URLs for the media (images or video).
+        :param media_urls: List of URLs for the media (images or video). A Facebook video or
+            reel may instead be a local file in ``FACEBOOK_UPLOAD_DIR`` (a path or ``file://``
+            URL), which is uploaded in chunks without the Facebook publish deadline.
         :param media_type: 'image', 'video', 'reel', or 'carousel'.
         :param platforms: List containing 'facebook' and/or 'instagram'.
+        :param idempotency_key: Optional key; a retry with the same key returns the platforms
+            already published instead of posting them again, and only re-runs failed ones. A
+            platform that timed out may have published anyway, so it is not re-run either unless
+            ``retry_unknown`` is set. Keys are kept in memory, so a restart forgets them.
+        """
+        if not idempotency_key:
+            return await self._publish_media(caption, media_urls, media_type, platforms)
+
+        key = f"post_media:{idempotency_key}"
+        async with self.idempotency.claim(key) as previous:
+            published = {
+                platform: result for platform, result in (previous or {}).items()
+                if platform in platforms and (not _is_error(result) or (_outcome_unknown(result) and not retry_unknown))
+            }
+            pending = [platform for platform in platforms if platform not in published]
+            results = await self._publish_media(caption, media_urls, media_type, pending) if pending else {}
+            self.idempotency.save(key, {**(previous or {}), **results})
+            for platform, result in published.items():
+                results[platform] = {**result, "idempotent_replay": True}
+            return {platform: results[platform] for platform in ("facebook", "instagram") if platform in results}
+
+    def start_post_media(self, caption: str, media_urls: list[str], media_type: str, platforms: list[str],
+                         idempotency_key: Optional[str] = None, retry_unknown: bool = False) -> dict[str, Any]:
+        """
+        Runs ``post_media`` as a background job and returns its ID and status right away.
+        Follow the job's per-stage progress with ``self.jobs``.
         """
-        results = {}
+        return self.jobs.submit(
+            "post_media",
+            lambda: self.post_media(caption, media_urls, media_type, platforms, idempotency_key=idempotency_key,
+                                    retry_unknown=retry_unknown),
+            page_id=self.page_id,
+        )
+
+    async def _publish_media(self, caption: str, media_urls: list[str], media_type: str, platforms: list[str]) -> dict[str, Any]:
+        results: dict[str, Any] = {}
+        pipelines = {}
         
         if "facebook" in platforms:
-            try:
-                results["facebook"] = self._post_to_facebook_complex(caption, media_urls, media_type)
-            except Exception as e:
-                results["facebook"] = {"error": str(e)}
+            results["facebook"] = None
+            pipelines["facebook"] = self._post_to_facebook_complex(caption, media_urls, media_type)
         
         if "instagram" in platforms:
             if not self.instagram_account_id:
                 results["instagram"] = {"error": "INSTAGRAM_ACCOUNT_ID not configured."}
             else:
-                try:
-                    results["instagram"] = self._post_to_instagram(caption, media_urls, media_type)
-                except Exception as e:
-                    results["instagram"] = {"error": str(e)}
+                results["instagram"] = None
+                pipelines["instagram"] = self._post_to_instagram(caption, media_urls, media_type)
+
+        # Run the platform pipelines side by side; each has its own timeout and a failure in one
+        # never affects the other.
+        # A resumable upload of a local file takes as long as the file needs; each chunk request
+        # has its own HTTP timeout and retry deadline, so it cannot hang instead
+        timeouts = {platform: self.platform_timeouts[platform] for platform in pipelines}
+        if "facebook" in pipelines and media_type in ("video", "reel") and media_urls and is_local_media(media_urls[0]):
+            timeouts["facebook"] = None
+        outcomes = await asyncio.gather(*(
+            self._run_platform_pipeline(platform, pipeline, timeouts[platform]) for platform, pipeline in pipelines.items()
+        ))
+        results.update(zip(pipelines, outcomes))
+        if "facebook" in pipelines:
+            self._invalidate_reads(f"/{self.page_id}")
         
         return results
 
-    def _post_to_facebook_complex(self, caption: str, media_urls: list[str], media_type: str) -> dict[str, Any]:
+    async def _run_platform_pipeline(self, platform: str, pipeline: Awaitable[dict[str, Any]],
+                                     timeout: Optional[float]) -> dict[str, Any]:
+        try:
+            with stage_scope(platform):
+                return await asyncio.wait_for(pipeline, timeout)
+        except asyncio.TimeoutError:
+            return {
+                "error": f"{platform} publishing timed out after {timeout:g}s; the post may be partially created. "
+                         f"Check the {platform} account before publishing it again.",
+                "outcome": "unknown",
+            }
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def _post_to_facebook_complex(self, caption: str, media_urls: list[str], media_type: str) -> dict[str, Any]:
         if not media_urls:
-            return self.post_to_facebook(caption)
+            return await self.post_to_facebook(caption)
 
         if media_type == "image":
             if len(media_urls) == 1:
                 # Single Photo
-                url = f"{GRAPH_API_BASE_URL}/{self.page_id}/photos"
                 params = {
                     "url": media_urls[0],
                     "caption": caption,
                     "access_token": self.access_token
                 }
-                return requests.post(url, params=params).json()
+                with job_stage("publish"):
+                    return await self.graph.post(f"/{self.page_id}/photos", params=params)
             else:
                 # Multi-Photo (Album/Carousel style)
-                # 1. Upload photos without publishing
-                attached_media = []
-                for media_url in media_urls:
-                    photo_id = self._upload_fb_photo(media_url, published=False)
-                    if photo_id:
-                        attached_media.append({"media_fbid": photo_id})
+                # 1. Upload photos without publishing (concurrently, results stay in media_urls order)
+                with job_stage("upload"):
+                    photo_ids = await gather_limited(
+                        self.upload_concurrency,
+                        (self._upload_fb_photo(media_url, published=False) for media_url in media_urls),
+                        return_exceptions=True,
+                    )
+                failed_uploads = [
+                    {"index": index, "url": media_url, "error": str(photo_id)}
+                    for index, (media_url, photo_id) in enumerate(zip(media_urls, photo_ids))
+                    if isinstance(photo_id, BaseException)
+                ]
+                if failed_uploads:
+                    return {
+                        "error": f"{len(failed_uploads)} of {len(media_urls)} photo uploads failed; nothing was published.",
+                        "failed_uploads": failed_uploads,
+                    }
+                attached_media = [{"media_fbid": photo_id} for photo_id in photo_ids]
                 
                 # 2. Publish to feed
-                url = f"{GRAPH_API_BASE_URL}/{self.page_id}/feed"
                 params = {
                     "message": caption,
                     "attached_media": attached_media,
                     "access_token": self.access_token
                 }
-                return requests.post(url, json=params).json()
+                with job_stage("publish"):
+                    return await self.graph.post(f"/{self.page_id}/feed", json=params)
 
         elif media_type in ["video", "reel"]:
             # For now, treat reel as video for FB (FB Reels API is slightly different but video usually works)
-            url = f"{GRAPH_API_BASE_URL}/{self.page_id}/videos"
+            if is_local_media(media_urls[0]):
+                return await self.video_uploader.upload(self.page_id, self.access_token, media_urls[0], caption)
             params = {
                 "file_url": media_urls[0],
                 "description": caption,
                 "access_token": self.access_token
             }
-            return requests.post(url, params=params).json()
+            with job_stage("publish"):
+                return await self.graph.post(f"/{self.page_id}/videos", params=params)
 
         elif media_type == "carousel":
              # Same as multi-image for Facebook
-             return self._post_to_facebook_complex(caption, media_urls, "image")
+             return await self._post_to_facebook_complex(caption, media_urls, "image")
         
         else:
             raise ValueError(f"Unsupported media_type for Facebook: {media_type}")
 
-    def _upload_fb_photo(self, url: str, published: bool = False) -> Optional[str]:
-        endpoint = f"{GRAPH_API_BASE_URL}/{self.page_id}/photos"
+    async def _upload_fb_photo(self, url: str, published: bool = False) -> str:
         params = {
             "url": url,
             "published": published,
             "access_token": self.access_token
         }
-        resp = requests.post(endpoint, params=params).json()
-        return resp.get("id")
+        resp = await self.graph.post(f"/{self.page_id}/photos", params=params)
+        if "id" not in resp:
+            raise RuntimeError(f"Photo upload failed: {resp.get('error', resp)}")
+        return resp["id"]
 
-    def _post_to_instagram(self, caption: str, media_urls: list[str], media_type: str) -> dict[str, Any]:
+    async def _post_to_instagram(self, caption: str, media_urls: list[str], media_type: str) -> dict[str, Any]:
         # Instagram Content Publishing API involves:
         # 1. Create Media Container(s)
         # 2. Publish Container
+        # Each stage is timed and reported under "timings_ms" in the result.
         
+        if any(is_local_media(url) for url in media_urls):
+            raise ValueError("Instagram can only fetch media from public URLs; local files are not supported.")
+
         container_id = None
+        timings: dict[str, float] = {}
+        started = time.perf_counter()
 
         if media_type == "image" and len(media_urls) == 1:
             # Single Image
-            container_id = self._create_ig_container(image_url=media_urls[0], caption=caption)
+            with _timed_stage(timings, "container"):
+                container_id = await self._create_ig_container(image_url=media_urls[0], caption=caption)
             
         elif media_type in ["video", "reel"]:
             # Single Video/Reel
-            container_id = self._create_ig_container(video_url=media_urls[0], caption=caption, is_video=True, is_reel=(media_type == "reel"))
+            with _timed_stage(timings, "container"):
+                container_id = await self._create_ig_container(video_url=media_urls[0], caption=caption, is_video=True, is_reel=(media_type == "reel"))
 
         elif media_type == "carousel" or (media_type == "image" and len(media_urls) > 1):
-            # Carousel
-            child_ids = []
-            for url in media_urls:
-                # Create item container (no caption for children)
-                child_id = self._create_ig_container(image_url=url, is_carousel_item=True)
-                if child_id:
-                    child_ids.append(child_id)
-            
-            if child_ids:
-                container_id = self._create_ig_carousel_container(child_ids, caption)
+            # Carousel: create item containers (no caption for children) concurrently, keeping media_urls order
+            with _timed_stage(timings, "children"):
+                child_ids = await gather_limited(
+                    self.upload_concurrency,
+                    (self._create_ig_container(image_url=url, is_carousel_item=True) for url in media_urls),
+                    return_exceptions=True,
+                )
+            failed_items = [
+                {"index": index, "url": url, "error": str(child_id)}
+                for index, (url, child_id) in enumerate(zip(media_urls, child_ids))
+                if isinstance(child_id, BaseException)
+            ]
+            if failed_items:
+                timings["total"] = _elapsed_ms(started)
+                return {
+                    "error": f"{len(failed_items)} of {len(media_urls)} carousel items failed; nothing was published.",
+                    "failed_items": failed_items,
+                    "timings_ms": timings,
+                }
+
+            with _timed_stage(timings, "container"):
+                container_id = await self._create_ig_carousel_container(child_ids, caption)
         
         else:
              raise ValueError(f"Unsupported media_type for Instagram: {media_type}")
 
         if container_id:
-            return self._publish_ig_media(container_id)
+            with _timed_stage(timings, "wait"):
+                status_polls = await self._wait_for_ig_container(container_id, is_video=media_type in ["video", "reel"])
+            with _timed_stage(timings, "publish"):
+                result = await self._publish_ig_media(container_id)
+            timings["total"] = _elapsed_ms(started)
+            return {**result, "timings_ms": timings, "status_polls": status_polls}
         else:
             raise RuntimeError("Failed to create Instagram media container.")
 
-    def _create_ig_container(self, image_url: str = None, video_url: str = None, caption: str = None, 
-                             is_video: bool = False, is_reel: bool = False, is_carousel_item: bool = False) -> Optional[str]:
-        url = f"{GRAPH_API_BASE_URL}/{self.instagram_account_id}/media"
+    async def _create_ig_container(self, image_url: str = None, video_url: str = None, caption: str = None,
+                                   is_video: bool = False, is_reel: bool = False, is_carousel_item: bool = False) -> str:
         params = {
             "access_token": self.access_token
         }
@@ -274,206 +720,99 @@ class FacebookManager:
         if is_carousel_item:
             params["is_carousel_item"] = True
 
-        resp = requests.post(url, params=params).json()
+        resp = await self.graph.post(f"/{self.instagram_account_id}/media", params=params)
         if "id" not in resp:
             logger.error(f"IG Container Error: {resp}")
-        return resp.get("id")
+            raise RuntimeError(f"Instagram container creation failed: {resp.get('error', resp)}")
+        return resp["id"]
 
-    def _create_ig_carousel_container(self, children_ids: list[str], caption: str) -> Optional[str]:
-        url = f"{GRAPH_API_BASE_URL}/{self.instagram_account_id}/media"
+    async def _create_ig_carousel_container(self, children_ids: list[str], caption: str) -> Optional[str]:
         params = {
             "media_type": "CAROUSEL",
             "children": ",".join(children_ids),
             "caption": caption,
             "access_token": self.access_token
         }
-        resp = requests.post(url, params=params).json()
+        resp = await self.graph.post(f"/{self.instagram_account_id}/media", params=params)
         return resp.get("id")
 
-    def _publish_ig_media(self, creation_id: str) -> dict[str, Any]:
-        url = f"{GRAPH_API_BASE_URL}/{self.instagram_account_id}/media_publish"
+    async def _wait_for_ig_container(self, container_id: str, is_video: bool = False) -> int:
+        """
+        Polls a media container until Instagram has finished processing it and returns the
+        number of status checks made.
+
+        The first check is immediate (images are usually ready), then the interval grows
+        exponentially with jitter, starting longer for videos, and never sleeps past the
+        INSTAGRAM_CONTAINER_TIMEOUT deadline.
+        """
+        deadline = time.monotonic() + self.container_timeout
+        delays = backoff_delays(initial=2.0 if is_video else 0.5, factor=1.5, maximum=15.0)
+        params = {
+            "fields": "status_code,status",
+            "access_token": self.access_token,
+        }
+        polls = 0
+        while True:
+            polls += 1
+            resp = await self.graph.get(f"/{container_id}", params=params, cache=False)
+            status_code = resp.get("status_code")
+            if status_code in IG_CONTAINER_READY:
+                return polls
+            if status_code in IG_CONTAINER_FAILED or "error" in resp:
+                raise RuntimeError(f"Instagram container {container_id} failed processing: {resp.get('status') or resp.get('error', resp)}")
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError(
+                    f"Instagram container {container_id} still {status_code or 'processing'} after {self.container_timeout:g}s."
+                )
+            await asyncio.sleep(min(next(delays), remaining))
+
+    async def _publish_ig_media(self, creation_id: str) -> dict[str, Any]:
         params = {
             "creation_id": creation_id,
             "access_token": self.access_token
         }
-        # Publishing might take a moment if processing, usually handled by retries, but we'll do a simple call.
-        return requests.post(url, params=params).json()
+        # Only called once _wait_for_ig_container has seen the container FINISHED
+        return await self.graph.post(f"/{self.instagram_account_id}/media_publish", params=params)
 
 
 async def main():
+    configure_process()
     logger.info("Starting Facebook MCP Server")
 
+    from mcp.server import NotificationOptions, Server
+    from mcp.server.models import InitializationOptions
+
     try:
-        page_id, page_access_token, instagram_account_id = load_facebook_config()
+        config = load_facebook_config()
     except RuntimeError as exc:
         logger.error(str(exc))
         raise
 
-    fb_manager = FacebookManager(page_id=page_id, access_token=page_access_token, instagram_account_id=instagram_account_id)
-    server = Server("facebook-manager")
+    # Imported here because the Page directory and the tool definitions themselves import this module
+    from .pages import pages_from_config
+    from .tools import TOOLS
 
-    # Register handlers
-    logger.debug("Registering handlers")
-
-    @server.list_tools()
-    async def handle_list_tools() -> list[types.Tool]:
-        """List available tools"""
-        return [
-            types.Tool(
-                name="post_to_facebook",
-                description="Posts a message to the Facebook Page (Legacy - use post_media for advanced features)",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "message": {"type": "string", "description": "Message to post"},
-                    },
-                    "required": ["message"],
-                },
-            ),
-             types.Tool(
-                name="post_media",
-                description="Posts media (images, videos, reels, carousels) to Facebook and/or Instagram.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "caption": {"type": "string", "description": "Caption/Message for the post."},
-                        "media_urls": {
-                            "type": "array", 
-                            "items": {"type": "string"},
-                            "description": "List of public URLs for the media files."
-                        },
-                        "media_type": {
-                            "type": "string", 
-                            "enum": ["image", "video", "reel", "carousel"],
-                            "description": "Type of media to post."
-                        },
-                        "platforms": {
-                            "type": "array",
-                            "items": {"type": "string", "enum": ["facebook", "instagram"]},
-                            "description": "Platforms to post to."
-                        }
-                    },
-                    "required": ["caption", "media_urls", "media_type", "platforms"],
-                },
-            ),
-            types.Tool(
-                name="reply_to_comment",
-                description="Replies to a comment on a specific post",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "post_id": {"type": "string", "description": "ID of the post"},
-                        "comment_id": {"type": "string", "description": "ID of the comment"},
-                        "message": {"type": "string", "description": "Reply message"},
-                    },
-                    "required": ["post_id", "comment_id", "message"],
-                },
-            ),
-            types.Tool(
-                name="get_page_posts",
-                description="Retrieves posts published on the Facebook Page",
-                inputSchema={"type": "object", "properties": {}},
-            ),
-            types.Tool(
-                name="get_post_comments",
-                description="Retrieves comments for a specific post",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "post_id": {"type": "string", "description": "ID of the post"},
-                    },
-                    "required": ["post_id"],
-                },
-            ),
-            types.Tool(
-                name="filter_negative_comments",
-                description="Filters negative comments from a post",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "post_id": {"type": "string", "description": "ID of the post"},
-                    },
-                    "required": ["post_id"],
-                },
-            ),
-            types.Tool(
-                name="delete_post",
-                description="Deletes a post from the Facebook Page.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "post_id": {"type": "string", "description": "ID of the post to delete."},
-                    },
-                    "required": ["post_id"],
-                },
-            ),
-            types.Tool(
-                name="delete_comment",
-                description="Deletes a comment from a post.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "comment_id": {"type": "string", "description": "ID of the comment to delete."},
-                    },
-                    "required": ["comment_id"],
-                },
-            ),
-        ]
+    pages = pages_from_config(*config)
+    server = Server("facebook-manager")
+    TOOLS.attach(server, pages)
+    pages.scheduler.start()
 
-    @server.call_tool()
-    async def handle_call_tool(name: str, arguments: dict[str, Any] | None) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-        """Handle tool execution requests"""
-        try:
-            if name == "post_to_facebook":
-                result = fb_manager.post_to_facebook(arguments["message"])
-                return [types.TextContent(type="text", text=str(result))]
-            elif name == "post_media":
-                result = fb_manager.post_media(
-                    caption=arguments["caption"],
-                    media_urls=arguments["media_urls"],
-                    media_type=arguments["media_type"],
-                    platforms=arguments["platforms"]
-                )
-                return [types.TextContent(type="text", text=str(result))]
-            elif name == "reply_to_comment":
-                result = fb_manager.reply_to_comment(arguments["post_id"], arguments["comment_id"], arguments["message"])
-                return [types.TextContent(type="text", text=str(result))]
-            elif name == "get_page_posts":
-                result = fb_manager.get_page_posts()
-                return [types.TextContent(type="text", text=str(result))]
-            elif name == "get_post_comments":
-                result = fb_manager.get_post_comments(arguments["post_id"])
-                return [types.TextContent(type="text", text=str(result))]
-            elif name == "filter_negative_comments":
-                comments = fb_manager.get_post_comments(arguments["post_id"])
-                result = fb_manager.filter_negative_comments(comments)
-                return [types.TextContent(type="text", text=str(result))]
-            elif name == "delete_post":
-                result = fb_manager.delete_post(arguments["post_id"])
-                return [types.TextContent(type="text", text=str(result))]
-            elif name == "delete_comment":
-                result = fb_manager.delete_comment(arguments["comment_id"])
-                return [types.TextContent(type="text", text=str(result))]
-            else:
-                raise ValueError(f"Unknown tool: {name}")
+    if env_flag("FACEBOOK_PREWARM"):
+        start_prewarm(logger, "Graph API", pages.graph.prewarm)
 
-        except Exception as e:
-            return [types.TextContent(type="text", text=f"Error: {str(e)}")]
-
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        logger.info("Server running with stdio transport")
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="facebook",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
+    try:
+        await serve(server, InitializationOptions(
+            server_name="facebook",
+            server_version="0.1.0",
+            capabilities=server.get_capabilities(
+                notification_options=NotificationOptions(),
+                experimental_capabilities={},
             ),
-        )
+        ), logger)
+    finally:
+        await pages.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,441 @@
+from typing import Any
+
+from social_mcp_common.metrics import METRICS, METRICS_TOOL_DESCRIPTION, METRICS_TOOL_PROPERTIES
+from social_mcp_common.registry import ToolRegistry
+
+from .pages import FacebookPages
+from .scheduler import JOB_STATUSES
+from .server import (
+    COMMENT_FIELDS,
+    DEFAULT_MAX_ITEMS,
+    DEFAULT_PAGE_SIZE,
+    POST_FIELDS,
+    FacebookManager,
+    logger,
+)
+
+
+async def page_manager(pages: FacebookPages, arguments: dict[str, Any]) -> FacebookManager:
+    """The manager of the Page named by the call's ``page_id`` argument, or of the default Page."""
+    return await pages.manager(arguments.get("page_id"))
+
+
+PAGE_ID_PROPERTY = {"type": "string", "description": "Facebook Page to act on (see list_pages); defaults to the configured Page"}
+PUBLISH_AT_PROPERTY = {"type": "string", "description": "When to publish: ISO 8601 time (UTC unless an offset is given) or unix timestamp; a past time publishes right away"}
+# Longest a single wait_job call blocks, in seconds
+MAX_JOB_WAIT = 300.0
+
+# Every Facebook/Instagram tool, served by main() and reused by facebook_cli_tool.py. Page tools
+# take an optional page_id and run on that Page's FacebookManager.
+TOOLS: ToolRegistry[FacebookPages] = ToolRegistry(
+    logger,
+    context_properties={"page_id": PAGE_ID_PROPERTY},
+    resolve_context=page_manager,
+)
+
+
+@TOOLS.tool(
+    "post_to_facebook",
+    "Posts a message to the Facebook Page (Legacy - use post_media for advanced features)",
+    {
+        "message": {"type": "string", "description": "Message to post"},
+        "idempotency_key": {"type": "string", "description": "Optional unique key; retrying with the same key returns the original post instead of posting again. Keys are kept in memory and forgotten when the server restarts"},
+    },
+    required=("message",),
+)
+async def post_to_facebook(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    return await manager.post_to_facebook(arguments["message"], idempotency_key=arguments.get("idempotency_key"))
+
+
+@TOOLS.tool(
+    "post_media",
+    "Posts media (images, videos, reels, carousels) to Facebook and/or Instagram.",
+    {
+        "caption": {"type": "string", "description": "Caption/Message for the post."},
+        "media_urls": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "List of public URLs for the media files. A Facebook video/reel may be a local file in FACEBOOK_UPLOAD_DIR, uploaded in resumable chunks."
+        },
+        "media_type": {
+            "type": "string",
+            "enum": ["image", "video", "reel", "carousel"],
+            "description": "Type of media to post."
+        },
+        "platforms": {
+            "type": "array",
+            "items": {"type": "string", "enum": ["facebook", "instagram"]},
+            "description": "Platforms to post to."
+        },
+        "idempotency_key": {"type": "string", "description": "Optional unique key; retrying with the same key returns already-published platforms instead of posting again. Platforms that timed out (outcome 'unknown') are not re-run either. Keys are kept in memory and forgotten when the server restarts"},
+        "retry_unknown": {"type": "boolean", "description": "With idempotency_key: publish again to platforms whose earlier attempt timed out with outcome 'unknown'; check they were not published first (default false)"},
+        "background": {"type": "boolean", "description": "Return a job ID right away and publish in the background; follow it with get_job_status or wait_job (default false)"},
+    },
+    required=("caption", "media_urls", "media_type", "platforms"),
+)
+async def post_media(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    post = dict(
+        caption=arguments["caption"],
+        media_urls=arguments["media_urls"],
+        media_type=arguments["media_type"],
+        platforms=arguments["platforms"],
+        idempotency_key=arguments.get("idempotency_key"),
+        retry_unknown=arguments.get("retry_unknown", False),
+    )
+    if arguments.get("background"):
+        return manager.start_post_media(**post)
+    return await manager.post_media(**post)
+
+
+@TOOLS.tool(
+    "reply_to_comment",
+    "Replies to a comment on a specific post",
+    {
+        "post_id": {"type": "string", "description": "ID of the post"},
+        "comment_id": {"type": "string", "description": "ID of the comment"},
+        "message": {"type": "string", "description": "Reply message"},
+    },
+    required=("post_id", "comment_id", "message"),
+)
+async def reply_to_comment(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    return await manager.reply_to_comment(arguments["post_id"], arguments["comment_id"], arguments["message"])
+
+
+@TOOLS.tool(
+    "get_page_posts",
+    "Retrieves posts published on the Facebook Page, following pagination. Pass the returned next_cursor as 'after' to continue.",
+    {
+        "limit": {"type": "integer", "description": f"Posts per Graph page (default {DEFAULT_PAGE_SIZE})"},
+        "max_items": {"type": "integer", "description": f"Maximum posts to return (default {DEFAULT_MAX_ITEMS})"},
+        "since": {"type": "string", "description": "Only posts published after this time (unix timestamp or date)"},
+        "until": {"type": "string", "description": "Only posts published before this time (unix timestamp or date)"},
+        "after": {"type": "string", "description": "Cursor to resume from (next_cursor of a previous call)"},
+        "fields": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": f"Graph fields to fetch per post (default {POST_FIELDS}), e.g. permalink_url or comments.summary(true).limit(0) for comment counts only",
+        },
+    },
+    project_fields=False,
+)
+async def get_page_posts(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    return await manager.get_page_posts(**arguments)
+
+
+@TOOLS.tool(
+    "get_page_posts_with_comments",
+    "Retrieves Page posts together with their comments in as few Graph requests as possible (nested field expansion).",
+    {
+        "max_posts": {"type": "integer", "description": f"Maximum posts to return (default {DEFAULT_PAGE_SIZE})"},
+        "max_comments": {"type": "integer", "description": f"Maximum comments per post (default {DEFAULT_PAGE_SIZE})"},
+        "since": {"type": "string", "description": "Only posts published after this time (unix timestamp or date)"},
+        "until": {"type": "string", "description": "Only posts published before this time (unix timestamp or date)"},
+        "after": {"type": "string", "description": "Cursor to resume from (next_cursor of a previous call)"},
+        "fields": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": f"Graph fields to fetch per post (default {POST_FIELDS}); comments are always included",
+        },
+        "comment_fields": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": f"Graph fields to fetch per comment (default {COMMENT_FIELDS})",
+        },
+    },
+    project_fields=False,
+)
+async def get_page_posts_with_comments(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    return await manager.get_page_posts_with_comments(**arguments)
+
+
+@TOOLS.tool(
+    "get_post_comments",
+    "Retrieves comments for a specific post, following pagination. Pass the returned next_cursor as 'after' to continue.",
+    {
+        "post_id": {"type": "string", "description": "ID of the post"},
+        "limit": {"type": "integer", "description": f"Comments per Graph page (default {DEFAULT_PAGE_SIZE})"},
+        "max_items": {"type": "integer", "description": f"Maximum comments to return (default {DEFAULT_MAX_ITEMS})"},
+        "after": {"type": "string", "description": "Cursor to resume from (next_cursor of a previous call)"},
+        "fields": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": f"Graph fields to fetch per comment (default {COMMENT_FIELDS}), e.g. like_count, permalink_url",
+        },
+    },
+    required=("post_id",),
+    project_fields=False,
+)
+async def get_post_comments(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    return await manager.get_post_comments(**arguments)
+
+
+@TOOLS.tool(
+    "filter_negative_comments",
+    "Filters negative comments from a post. Each flagged comment includes its matched_terms and score.",
+    {
+        "post_id": {"type": "string", "description": "ID of the post"},
+        "keywords": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Optional keywords to use instead of the configured lexicon"
+        },
+        "min_score": {"type": "number", "description": "Only return comments scoring above this (default 0)"},
+    },
+    required=("post_id",),
+)
+async def filter_negative_comments(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    comments = await manager.get_post_comments(arguments["post_id"])
+    return manager.filter_negative_comments(
+        comments, keywords=arguments.get("keywords"), min_score=arguments.get("min_score", 0.0)
+    )
+
+
+@TOOLS.tool(
+    "scan_page_negative_comments",
+    "Scans comments on recent Page posts and returns the negative ones ranked by score (highest first).",
+    {
+        "days": {"type": "number", "description": "Only scan posts published in the last N days (default 7)"},
+        "max_posts": {"type": "integer", "description": f"Maximum posts to scan (default {DEFAULT_PAGE_SIZE})"},
+        "max_comments_per_post": {"type": "integer", "description": f"Maximum comments scanned per post (default {DEFAULT_MAX_ITEMS})"},
+        "keywords": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Optional keywords to use instead of the configured lexicon"
+        },
+        "min_score": {"type": "number", "description": "Only return comments scoring above this (default 0)"},
+        "max_results": {"type": "integer", "description": "Maximum flagged comments to return (default 50)"},
+    },
+)
+async def scan_page_negative_comments(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    return await manager.scan_page_negative_comments(**arguments)
+
+
+@TOOLS.tool(
+    "delete_post",
+    "Deletes a post from the Facebook Page.",
+    {
+        "post_id": {"type": "string", "description": "ID of the post to delete."},
+    },
+    required=("post_id",),
+)
+async def delete_post(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    return await manager.delete_post(arguments["post_id"])
+
+
+@TOOLS.tool(
+    "delete_comment",
+    "Deletes a comment from a post.",
+    {
+        "comment_id": {"type": "string", "description": "ID of the comment to delete."},
+    },
+    required=("comment_id",),
+)
+async def delete_comment(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    return await manager.delete_comment(arguments["comment_id"])
+
+
+@TOOLS.tool(
+    "bulk_delete_comments",
+    "Deletes many comments at once using Graph batch requests. Returns one result per comment.",
+    {
+        "comment_ids": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "IDs of the comments to delete."
+        },
+    },
+    required=("comment_ids",),
+)
+async def bulk_delete_comments(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    return await manager.bulk_delete_comments(arguments["comment_ids"])
+
+
+@TOOLS.tool(
+    "bulk_reply",
+    "Replies to many comments at once using Graph batch requests. Returns one result per reply.",
+    {
+        "replies": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "comment_id": {"type": "string", "description": "ID of the comment"},
+                    "message": {"type": "string", "description": "Reply message"},
+                },
+                "required": ["comment_id", "message"],
+            },
+            "description": "Replies to send."
+        },
+    },
+    required=("replies",),
+)
+async def bulk_reply(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    return await manager.bulk_reply(arguments["replies"])
+
+
+@TOOLS.tool(
+    "get_comments_for_posts",
+    "Retrieves the first page of comments for many posts at once using Graph batch requests, keyed by post ID. "
+    "Pass a post's next_cursor as 'after' to get_post_comments to continue.",
+    {
+        "post_ids": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "IDs of the posts."
+        },
+        "limit": {"type": "integer", "description": f"Comments per post (default {DEFAULT_PAGE_SIZE})"},
+        "fields": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": f"Graph fields to fetch per comment (default {COMMENT_FIELDS})",
+        },
+    },
+    required=("post_ids",),
+    project_fields=False,
+)
+async def get_comments_for_posts(manager: FacebookManager, arguments: dict[str, Any]) -> Any:
+    return await manager.get_comments_for_posts(**arguments)
+
+
+@TOOLS.tool(
+    "schedule_post",
+    "Schedules a text post to the Facebook Page for a later time. The post is kept in a persistent queue and published in the background.",
+    {
+        "message": {"type": "string", "description": "Message to post"},
+        "publish_at": PUBLISH_AT_PROPERTY,
+        "page_id": PAGE_ID_PROPERTY,
+    },
+    required=("message", "publish_at"),
+    resolve_context=False,
+)
+async def schedule_post(pages: FacebookPages, arguments: dict[str, Any]) -> Any:
+    return await pages.schedule_post(arguments["message"], arguments["publish_at"], page_id=arguments.get("page_id"))
+
+
+@TOOLS.tool(
+    "schedule_media",
+    "Schedules a post_media publish (images, videos, reels, carousels to Facebook and/or Instagram) for a later time.",
+    {
+        "caption": {"type": "string", "description": "Caption/Message for the post."},
+        "media_urls": {"type": "array", "items": {"type": "string"}, "description": "List of public URLs for the media files."},
+        "media_type": {"type": "string", "enum": ["image", "video", "reel", "carousel"], "description": "Type of media to post."},
+        "platforms": {
+            "type": "array",
+            "items": {"type": "string", "enum": ["facebook", "instagram"]},
+            "description": "Platforms to post to."
+        },
+        "publish_at": PUBLISH_AT_PROPERTY,
+        "page_id": PAGE_ID_PROPERTY,
+    },
+    required=("caption", "media_urls", "media_type", "platforms", "publish_at"),
+    resolve_context=False,
+)
+async def schedule_media(pages: FacebookPages, arguments: dict[str, Any]) -> Any:
+    return await pages.schedule_media(
+        caption=arguments["caption"],
+        media_urls=arguments["media_urls"],
+        media_type=arguments["media_type"],
+        platforms=arguments["platforms"],
+        publish_at=arguments["publish_at"],
+        page_id=arguments.get("page_id"),
+    )
+
+
+@TOOLS.tool(
+    "list_scheduled_posts",
+    "Lists scheduled posts in publish order, optionally only those with a given status or Page.",
+    {
+        "status": {"type": "string", "enum": list(JOB_STATUSES), "description": "Only jobs with this status"},
+        "page_id": {"type": "string", "description": "Only jobs for this Page"},
+        "limit": {"type": "integer", "description": "Number of jobs to return (default 50)"},
+    },
+    resolve_context=False,
+)
+async def list_scheduled_posts(pages: FacebookPages, arguments: dict[str, Any]) -> Any:
+    return await pages.scheduler.list_jobs(
+        status=arguments.get("status"),
+        page_id=arguments.get("page_id"),
+        limit=arguments.get("limit", 50),
+    )
+
+
+@TOOLS.tool(
+    "get_scheduled_post",
+    "Shows a scheduled post: its content, status and, once published, the publish result or error.",
+    {"job_id": {"type": "string", "description": "ID returned by schedule_post/schedule_media"}},
+    required=("job_id",),
+    resolve_context=False,
+)
+async def get_scheduled_post(pages: FacebookPages, arguments: dict[str, Any]) -> Any:
+    return await pages.scheduler.get(arguments["job_id"])
+
+
+@TOOLS.tool(
+    "cancel_scheduled_post",
+    "Cancels a scheduled post that has not started publishing yet.",
+    {"job_id": {"type": "string", "description": "ID returned by schedule_post/schedule_media"}},
+    required=("job_id",),
+    resolve_context=False,
+)
+async def cancel_scheduled_post(pages: FacebookPages, arguments: dict[str, Any]) -> Any:
+    return await pages.scheduler.cancel(arguments["job_id"])
+
+
+@TOOLS.tool(
+    "get_job_status",
+    "Shows a background publish job (see post_media background): running/completed/failed, per-stage progress and, once finished, the result.",
+    {"job_id": {"type": "string", "description": "ID returned by post_media with background=true"}},
+    required=("job_id",),
+    resolve_context=False,
+)
+def get_job_status(pages: FacebookPages, arguments: dict[str, Any]) -> Any:
+    return pages.jobs.status(arguments["job_id"])
+
+
+@TOOLS.tool(
+    "wait_job",
+    "Waits for a background publish job to finish and returns its status and result; returns the current progress if it is still running after the timeout.",
+    {
+        "job_id": {"type": "string", "description": "ID returned by post_media with background=true"},
+        "timeout": {"type": "number", "description": f"Seconds to wait, at most {MAX_JOB_WAIT:g} (default 30)"},
+    },
+    required=("job_id",),
+    resolve_context=False,
+)
+async def wait_job(pages: FacebookPages, arguments: dict[str, Any]) -> Any:
+    return await pages.jobs.wait(arguments["job_id"], min(arguments.get("timeout", 30.0), MAX_JOB_WAIT))
+
+
+@TOOLS.tool(
+    "list_pages",
+    "Lists the Facebook Pages this server can act on, with their linked Instagram account IDs.",
+    {
+        "refresh": {"type": "boolean", "description": "Re-read the Pages and tokens from Facebook first (default false)"},
+    },
+    resolve_context=False,
+)
+async def list_pages(pages: FacebookPages, arguments: dict[str, Any]) -> Any:
+    return await pages.list_pages(refresh=arguments.get("refresh", False))
+
+
+@TOOLS.tool(
+    "get_rate_limit_status",
+    "Shows the Graph API usage budget (app, page, business use case) and how requests are currently being paced.",
+    resolve_context=False,
+)
+def get_rate_limit_status(pages: FacebookPages, arguments: dict[str, Any]) -> Any:
+    return pages.rate_limit_status()
+
+
+@TOOLS.tool(
+    "get_cache_stats",
+    "Shows hit/miss counters and occupancy of the Graph API read cache.",
+    resolve_context=False,
+)
+def get_cache_stats(pages: FacebookPages, arguments: dict[str, Any]) -> Any:
+    return pages.cache_stats()
+
+
+@TOOLS.tool("get_metrics", METRICS_TOOL_DESCRIPTION, METRICS_TOOL_PROPERTIES, resolve_context=False)
+def get_metrics(pages: FacebookPages, arguments: dict[str, Any]) -> Any:
+    return METRICS.snapshot(arguments.get("kind"))
@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import tempfile
+from typing import Any, Optional
+from urllib.parse import unquote, urlparse
+from weakref import WeakValueDictionary
+
+from .graph import GRAPH_VIDEO_BASE_URL, GraphClient
+from .jobs import job_stage, report_progress
+
+
+logger = logging.getLogger('facebook_mcp_server')
+
+
+def is_local_media(media_url: str) -> bool:
+    """Whether ``media_url`` names a local file (a path or ``file://`` URL) rather than a URL to fetch."""
+    return urlparse(media_url).scheme in ("", "file")
+
+
+def local_video_path(media_url: str, source_dir: Optional[str]) -> str:
+    """
+    The real path of the local file named by ``media_url`` (a ``file://`` URL, or a path that
+    may be relative to ``source_dir``). Only regular files inside ``source_dir`` are served,
+    after resolving symlinks; anything else raises ValueError, so a caller cannot have the
+    server upload arbitrary files it can read.
+    """
+    if not source_dir:
+        raise ValueError("Uploading local video files is disabled; set FACEBOOK_UPLOAD_DIR to the directory "
+                         "they may be read from, or pass a public URL.")
+    parsed = urlparse(media_url)
+    path = unquote(parsed.path) if parsed.scheme == "file" else media_url
+    root = os.path.realpath(source_dir)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath((root, resolved)) != root or not os.path.isfile(resolved):
+        raise ValueError(f"Local video {media_url} is not a file inside FACEBOOK_UPLOAD_DIR ({source_dir}).")
+    return resolved
+
+
+class ChunkedVideoUploader:
+    """
+    Uploads local video files to a Page through Graph's resumable upload sessions.
+
+    Facebook drives the transfer: the ``start`` phase and every ``transfer`` phase response
+    name the byte range (``start_offset``/``end_offset``) to send next, and the chunks are
+    sent one at a time until the two meet; ``finish`` then publishes the video. Chunks are
+    sliced from a read-only memory map, so only the chunk in flight is held in memory.
+
+    Progress (session id and the next range to send) is written to a small JSON file in
+    ``state_dir`` after every chunk. Uploading the same unchanged file again picks up the
+    saved session from that range; if Facebook no longer accepts that session a fresh one
+    is started.
+
+    Files are only read from ``source_dir`` (see ``local_video_path``); without one, local
+    uploads are refused.
+    """
+
+    def __init__(self, graph: GraphClient, state_dir: Optional[str] = None, source_dir: Optional[str] = None) -> None:
+        self.graph = graph
+        self.state_dir = state_dir or os.path.join(tempfile.gettempdir(), "facebook_mcp_uploads")
+        self.source_dir = source_dir
+        # One lock per resume-state file: concurrent uploads of the same file run one after the other
+        self._locks: WeakValueDictionary[str, asyncio.Lock] = WeakValueDictionary()
+
+    async def upload(self, page_id: str, access_token: str, media_url: str, description: str) -> dict[str, Any]:
+        """Uploads and publishes the local video named by ``media_url`` (a path or ``file://`` URL)."""
+        path = local_video_path(media_url, self.source_dir)
+        stat = os.stat(path)
+        if not stat.st_size:
+            raise ValueError(f"Video file is empty: {path}")
+        state_path = self._state_path(page_id, path, stat)
+        lock = self._locks.setdefault(state_path, asyncio.Lock())
+        async with lock:
+            return await self._upload(page_id, access_token, path, description, stat, state_path)
+
+    async def _upload(self, page_id: str, access_token: str, path: str, description: str,
+                      stat: os.stat_result, state_path: str) -> dict[str, Any]:
+        state = self._load_state(state_path)
+        resumed = state is not None
+
+        # The path is already resolved; a symlink swapped in since then is not followed
+        descriptor = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        with open(descriptor, "rb") as video, mmap.mmap(video.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            with job_stage("upload"):
+                if state is None:
+                    state = await self._start(page_id, access_token, stat.st_size, state_path)
+                acknowledged = state["chunks"]
+                try:
+                    await self._transfer(page_id, access_token, data, state, state_path)
+                except RuntimeError:
+                    if not resumed or state["chunks"] > acknowledged:
+                        raise
+                    # Not a single chunk was accepted on the saved session, which has most likely
+                    # expired; start over once with a fresh one
+                    logger.warning(f"Resumed upload session for {path} was rejected; starting a new session")
+                    resumed = False
+                    state = await self._start(page_id, access_token, stat.st_size, state_path)
+                    await self._transfer(page_id, access_token, data, state, state_path)
+
+        with job_stage("publish"):
+            result = await self.graph.post(f"{GRAPH_VIDEO_BASE_URL}/{page_id}/videos", data={
+                "upload_phase": "finish",
+                "upload_session_id": state["upload_session_id"],
+                "description": description,
+                "access_token": access_token,
+            })
+        if not result.get("success"):
+            raise RuntimeError(f"Video upload finish failed: {result.get('error', result)}")
+        os.remove(state_path)
+        return {
+            "id": state["video_id"],
+            "success": True,
+            "file_size": stat.st_size,
+            "chunks": state["chunks"],
+            "resumed": resumed,
+        }
+
+    async def _start(self, page_id: str, access_token: str, file_size: int, state_path: str) -> dict[str, Any]:
+        resp = await self.graph.post(f"{GRAPH_VIDEO_BASE_URL}/{page_id}/videos", data={
+            "upload_phase": "start",
+            "file_size": file_size,
+            "access_token": access_token,
+        })
+        if "upload_session_id" not in resp:
+            raise RuntimeError(f"Video upload start failed: {resp.get('error', resp)}")
+        state = {
+            "upload_session_id": resp["upload_session_id"],
+            "video_id": resp["video_id"],
+            "file_size": file_size,
+            "start_offset": int(resp["start_offset"]),
+            "end_offset": int(resp["end_offset"]),
+            "chunks": 0,
+        }
+        self._save_state(state_path, state)
+        return state
+
+    async def _transfer(self, page_id: str, access_token: str, data: mmap.mmap, state: dict[str, Any],
+                        state_path: str) -> None:
+        file_size = state["file_size"]
+        report_progress(bytes_done=state["start_offset"], bytes_total=file_size, chunks_done=state["chunks"])
+        while state["start_offset"] < min(state["end_offset"], file_size):
+            start, end = state["start_offset"], min(state["end_offset"], file_size)
+            # Re-sending a chunk at the same offset is harmless, so transport failures are retried
+            resp = await self.graph.request("POST", f"{GRAPH_VIDEO_BASE_URL}/{page_id}/videos", data={
+                "upload_phase": "transfer",
+                "upload_session_id": state["upload_session_id"],
+                "start_offset": start,
+                "access_token": access_token,
+            }, files={"video_file_chunk": ("chunk", data[start:end], "application/octet-stream")}, idempotent=True)
+            if "error" in resp or "start_offset" not in resp:
+                raise RuntimeError(
+                    f"Video chunk at offset {start} failed: {resp.get('error', resp)}; progress is saved and "
+                    f"uploading the same file again resumes the transfer."
+                )
+            state["start_offset"] = int(resp["start_offset"])
+            state["end_offset"] = int(resp["end_offset"])
+            state["chunks"] += 1
+            self._save_state(state_path, state)
+            report_progress(bytes_done=min(state["start_offset"], file_size), bytes_total=file_size,
+                            chunks_done=state["chunks"])
+
+    def _state_path(self, page_id: str, path: str, stat: os.stat_result) -> str:
+        # Keyed on the file's identity, so an edited or replaced file never resumes a stale session
+        identity = f"{page_id}:{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        return os.path.join(self.state_dir, hashlib.sha256(identity.encode()).hexdigest()[:32] + ".json")
+
+    @staticmethod
+    def _load_state(state_path: str) -> Optional[dict[str, Any]]:
+        try:
+            with open(state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # State saved before uploads followed Facebook's offsets has no range to resume from
+        return state if "start_offset" in state else None
+
+    def _save_state(self, state_path: str, state: dict[str, Any]) -> None:
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, state_path)
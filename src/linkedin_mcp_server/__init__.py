@@ -1,30 +1,18 @@
 import asyncio
 import logging
 import os
-import sys
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
-import mcp.server.stdio
-import requests
-from dotenv import load_dotenv
-from mcp.server import NotificationOptions, Server
-from mcp.server.models import InitializationOptions
-import mcp.types as types
+from social_mcp_common.http import create_http_client
+from social_mcp_common.metrics import METRICS, METRICS_TOOL_DESCRIPTION, METRICS_TOOL_PROPERTIES
+from social_mcp_common.registry import ToolRegistry
+from social_mcp_common.startup import configure_process, env_flag, start_prewarm
+from social_mcp_common.transport import serve
 
+if TYPE_CHECKING:
+    import httpx
 
-# Load environment variables from .env file if present
-load_dotenv()
 
-# Reconfigure UnicodeEncodeError prone default (i.e. windows-1252) to utf-8
-if sys.platform == "win32" and os.environ.get("PYTHONIOENCODING") is None:
-    sys.stdin.reconfigure(encoding="utf-8")
-    sys.stdout.reconfigure(encoding="utf-8")
-    sys.stderr.reconfigure(encoding="utf-8")
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-)
 logger = logging.getLogger("linkedin_mcp_server")
 
 API_BASE_URL = "https://api.linkedin.com/v2"
@@ -56,9 +44,31 @@ def load_linkedin_config() -> tuple[str, str]:
 class LinkedInManager:
     """Enhanced LinkedIn manager with image, carousel, article, and hashtag support."""
 
-    def __init__(self, access_token: str, organization_id: str) -> None:
+    def __init__(self, access_token: str, organization_id: str,
+                 client: Optional["httpx.AsyncClient"] = None) -> None:
         self.access_token = access_token
         self.organization_urn = f"urn:li:organization:{organization_id}"
+        self._client = client
+        # A client passed in is shared with other managers and closed by its owner
+        self._owns_client = client is None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """The pooled HTTP client, created on first use so it binds to the running event loop."""
+        if self._client is None or self._client.is_closed:
+            self._client = create_http_client()
+            self._owns_client = True
+        return self._client
+
+    async def prewarm(self) -> None:
+        """Opens a pooled connection (DNS, TCP and TLS setup) ahead of the first real call."""
+        await self.client.head(API_BASE_URL)
+
+    async def aclose(self) -> None:
+        """Closes the connection pool unless it is shared with other managers."""
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     @property
     def _headers(self) -> dict[str, str]:
@@ -76,7 +86,7 @@ class LinkedInManager:
         hashtag_str = " ".join(f"#{tag.lstrip('#')}" for tag in hashtags)
         return f"{text}\n\n{hashtag_str}"
 
-    def create_text_post(self, text: str, hashtags: Optional[list[str]] = None) -> dict[str, Any]:
+    async def create_text_post(self, text: str, hashtags: Optional[list[str]] = None) -> dict[str, Any]:
         """Create a simple text post with optional hashtags."""
         formatted_text = self._format_text_with_hashtags(text, hashtags)
         
@@ -92,10 +102,10 @@ class LinkedInManager:
             },
             "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"},
         }
-        response = requests.post(url, json=payload, headers=self._headers)
+        response = await self.client.post(url, json=payload, headers=self._headers)
         return response.json()
 
-    def create_image_post(self, text: str, image_url: str, hashtags: Optional[list[str]] = None) -> dict[str, Any]:
+    async def create_image_post(self, text: str, image_url: str, hashtags: Optional[list[str]] = None) -> dict[str, Any]:
         """Create a single image post with optional hashtags."""
         formatted_text = self._format_text_with_hashtags(text, hashtags)
         
@@ -113,7 +123,7 @@ class LinkedInManager:
                 ]
             }
         }
-        register_response = requests.post(register_url, json=register_payload, headers=self._headers)
+        register_response = await self.client.post(register_url, json=register_payload, headers=self._headers)
         register_data = register_response.json()
         
         if "value" not in register_data:
@@ -123,9 +133,9 @@ class LinkedInManager:
         upload_url = register_data["value"]["uploadMechanism"]["com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest"]["uploadUrl"]
         
         # Step 2: Upload the image
-        image_data = requests.get(image_url).content
+        image_data = (await self.client.get(image_url, follow_redirects=True)).content
         upload_headers = {"Authorization": f"Bearer {self.access_token}"}
-        requests.put(upload_url, data=image_data, headers=upload_headers)
+        await self.client.put(upload_url, content=image_data, headers=upload_headers)
         
         # Step 3: Create the post
         post_url = f"{API_BASE_URL}/ugcPosts"
@@ -146,10 +156,10 @@ class LinkedInManager:
             },
             "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
         }
-        response = requests.post(post_url, json=post_payload, headers=self._headers)
+        response = await self.client.post(post_url, json=post_payload, headers=self._headers)
         return response.json()
 
-    def create_carousel_post(self, text: str, image_urls: list[str], hashtags: Optional[list[str]] = None) -> dict[str, Any]:
+    async def create_carousel_post(self, text: str, image_urls: list[str], hashtags: Optional[list[str]] = None) -> dict[str, Any]:
         """Create a carousel post with multiple images and optional hashtags."""
         formatted_text = self._format_text_with_hashtags(text, hashtags)
         
@@ -170,7 +180,7 @@ class LinkedInManager:
                     ]
                 }
             }
-            register_response = requests.post(register_url, json=register_payload, headers=self._headers)
+            register_response = await self.client.post(register_url, json=register_payload, headers=self._headers)
             register_data = register_response.json()
             
             if "value" not in register_data:
@@ -180,9 +190,9 @@ class LinkedInManager:
             upload_url = register_data["value"]["uploadMechanism"]["com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest"]["uploadUrl"]
             
             # Upload image
-            image_data = requests.get(image_url).content
+            image_data = (await self.client.get(image_url, follow_redirects=True)).content
             upload_headers = {"Authorization": f"Bearer {self.access_token}"}
-            requests.put(upload_url, data=image_data, headers=upload_headers)
+            await self.client.put(upload_url, content=image_data, headers=upload_headers)
             
             media_list.append({
                 "status": "READY",
@@ -203,10 +213,10 @@ class LinkedInManager:
             },
             "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
         }
-        response = requests.post(post_url, json=post_payload, headers=self._headers)
+        response = await self.client.post(post_url, json=post_payload, headers=self._headers)
         return response.json()
 
-    def create_link_post(self, text: str, link_url: str, hashtags: Optional[list[str]] = None) -> dict[str, Any]:
+    async def create_link_post(self, text: str, link_url: str, hashtags: Optional[list[str]] = None) -> dict[str, Any]:
         """Create an article/link sharing post with optional hashtags."""
         formatted_text = self._format_text_with_hashtags(text, hashtags)
         
@@ -228,10 +238,10 @@ class LinkedInManager:
             },
             "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
         }
-        response = requests.post(url, json=payload, headers=self._headers)
+        response = await self.client.post(url, json=payload, headers=self._headers)
         return response.json()
 
-    def list_recent_posts(self, count: int = 5) -> dict[str, Any]:
+    async def list_recent_posts(self, count: int = 5) -> dict[str, Any]:
         """Fetch recent posts for the organization."""
         url = f"{API_BASE_URL}/ugcPosts"
         params = {
@@ -240,37 +250,184 @@ class LinkedInManager:
             "sortBy": "LAST_MODIFIED",
             "count": count,
         }
-        response = requests.get(url, headers=self._headers, params=params)
+        response = await self.client.get(url, headers=self._headers, params=params)
         return response.json()
 
-    def comment_on_post(self, post_urn: str, message: str) -> dict[str, Any]:
+    async def comment_on_post(self, post_urn: str, message: str) -> dict[str, Any]:
         """Add a comment to a post."""
         url = f"{API_BASE_URL}/socialActions/{post_urn}/comments"
         payload = {
             "actor": self.organization_urn,
             "message": {"text": message},
         }
-        response = requests.post(url, json=payload, headers=self._headers)
+        response = await self.client.post(url, json=payload, headers=self._headers)
         return response.json()
 
-    def get_comments(self, post_urn: str) -> dict[str, Any]:
+    async def get_comments(self, post_urn: str) -> dict[str, Any]:
         """Fetch comments on a post."""
         url = f"{API_BASE_URL}/socialActions/{post_urn}/comments"
-        response = requests.get(url, headers=self._headers)
+        response = await self.client.get(url, headers=self._headers)
         return response.json()
 
-    def delete_post(self, post_urn: str) -> dict[str, Any]:
+    async def delete_post(self, post_urn: str) -> dict[str, Any]:
         """Delete a post."""
         url = f"{API_BASE_URL}/ugcPosts/{post_urn}"
-        response = requests.delete(url, headers=self._headers)
+        response = await self.client.delete(url, headers=self._headers)
         if response.text:
             return response.json()
         return {"status": response.status_code}
 
 
+TOOLS: ToolRegistry[LinkedInManager] = ToolRegistry(logger)
+
+
+@TOOLS.tool(
+    "linkedin_create_text_post",
+    "Create a LinkedIn text post with optional hashtags",
+    {
+        "text": {"type": "string", "description": "Post text"},
+        "hashtags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Optional hashtags (without # symbol)"
+        }
+    },
+    required=("text",),
+)
+async def linkedin_create_text_post(manager: LinkedInManager, arguments: dict[str, Any]) -> Any:
+    return await manager.create_text_post(arguments["text"], arguments.get("hashtags"))
+
+
+@TOOLS.tool(
+    "linkedin_create_image_post",
+    "Create a LinkedIn post with a single image and optional hashtags",
+    {
+        "text": {"type": "string", "description": "Post caption"},
+        "image_url": {"type": "string", "description": "Public URL of the image"},
+        "hashtags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Optional hashtags"
+        }
+    },
+    required=("text", "image_url"),
+)
+async def linkedin_create_image_post(manager: LinkedInManager, arguments: dict[str, Any]) -> Any:
+    return await manager.create_image_post(arguments["text"], arguments["image_url"], arguments.get("hashtags"))
+
+
+@TOOLS.tool(
+    "linkedin_create_carousel_post",
+    "Create a LinkedIn carousel post with multiple images and optional hashtags",
+    {
+        "text": {"type": "string", "description": "Post caption"},
+        "image_urls": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "List of public image URLs (2-10 images)"
+        },
+        "hashtags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Optional hashtags"
+        }
+    },
+    required=("text", "image_urls"),
+)
+async def linkedin_create_carousel_post(manager: LinkedInManager, arguments: dict[str, Any]) -> Any:
+    return await manager.create_carousel_post(arguments["text"], arguments["image_urls"], arguments.get("hashtags"))
+
+
+@TOOLS.tool(
+    "linkedin_create_link_post",
+    "Share an article or link on LinkedIn with optional hashtags",
+    {
+        "text": {"type": "string", "description": "Post text/commentary"},
+        "link_url": {"type": "string", "description": "URL of the article/link to share"},
+        "hashtags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Optional hashtags"
+        }
+    },
+    required=("text", "link_url"),
+)
+async def linkedin_create_link_post(manager: LinkedInManager, arguments: dict[str, Any]) -> Any:
+    return await manager.create_link_post(arguments["text"], arguments["link_url"], arguments.get("hashtags"))
+
+
+@TOOLS.tool(
+    "linkedin_list_posts",
+    "List recent LinkedIn posts",
+    {
+        "count": {
+            "type": "integer",
+            "description": "Number of posts to fetch (default 5)",
+        },
+    },
+)
+async def linkedin_list_posts(manager: LinkedInManager, arguments: dict[str, Any]) -> Any:
+    return await manager.list_recent_posts(count=arguments.get("count", 5))
+
+
+@TOOLS.tool(
+    "linkedin_comment_on_post",
+    "Comment on a LinkedIn post",
+    {
+        "post_urn": {
+            "type": "string",
+            "description": "URN of the LinkedIn post",
+        },
+        "message": {"type": "string", "description": "Comment text"},
+    },
+    required=("post_urn", "message"),
+)
+async def linkedin_comment_on_post(manager: LinkedInManager, arguments: dict[str, Any]) -> Any:
+    return await manager.comment_on_post(arguments["post_urn"], arguments["message"])
+
+
+@TOOLS.tool(
+    "linkedin_get_comments",
+    "Get comments for a LinkedIn post",
+    {
+        "post_urn": {
+            "type": "string",
+            "description": "URN of the LinkedIn post",
+        },
+    },
+    required=("post_urn",),
+)
+async def linkedin_get_comments(manager: LinkedInManager, arguments: dict[str, Any]) -> Any:
+    return await manager.get_comments(arguments["post_urn"])
+
+
+@TOOLS.tool(
+    "linkedin_delete_post",
+    "Delete a LinkedIn post",
+    {
+        "post_urn": {
+            "type": "string",
+            "description": "URN of the LinkedIn post",
+        },
+    },
+    required=("post_urn",),
+)
+async def linkedin_delete_post(manager: LinkedInManager, arguments: dict[str, Any]) -> Any:
+    return await manager.delete_post(arguments["post_urn"])
+
+
+@TOOLS.tool("linkedin_get_metrics", METRICS_TOOL_DESCRIPTION, METRICS_TOOL_PROPERTIES)
+def linkedin_get_metrics(manager: LinkedInManager, arguments: dict[str, Any]) -> Any:
+    return METRICS.snapshot(arguments.get("kind"))
+
+
 async def main():
+    configure_process()
     logger.info("Starting LinkedIn MCP Server")
 
+    from mcp.server import NotificationOptions, Server
+    from mcp.server.models import InitializationOptions
+
     try:
         access_token, org_id = load_linkedin_config()
     except RuntimeError as exc:
@@ -280,185 +437,22 @@ async def main():
     manager = LinkedInManager(access_token=access_token, organization_id=org_id)
     server = Server("linkedin-manager")
 
-    @server.list_tools()
-    async def handle_list_tools() -> list[types.Tool]:
-        return [
-            types.Tool(
-                name="linkedin_create_text_post",
-                description="Create a LinkedIn text post with optional hashtags",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "text": {"type": "string", "description": "Post text"},
-                        "hashtags": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optional hashtags (without # symbol)"
-                        }
-                    },
-                    "required": ["text"],
-                },
-            ),
-            types.Tool(
-                name="linkedin_create_image_post",
-                description="Create a LinkedIn post with a single image and optional hashtags",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "text": {"type": "string", "description": "Post caption"},
-                        "image_url": {"type": "string", "description": "Public URL of the image"},
-                        "hashtags": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optional hashtags"
-                        }
-                    },
-                    "required": ["text", "image_url"],
-                },
-            ),
-            types.Tool(
-                name="linkedin_create_carousel_post",
-                description="Create a LinkedIn carousel post with multiple images and optional hashtags",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "text": {"type": "string", "description": "Post caption"},
-                        "image_urls": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "List of public image URLs (2-10 images)"
-                        },
-                        "hashtags": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optional hashtags"
-                        }
-                    },
-                    "required": ["text", "image_urls"],
-                },
-            ),
-            types.Tool(
-                name="linkedin_create_link_post",
-                description="Share an article or link on LinkedIn with optional hashtags",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "text": {"type": "string", "description": "Post text/commentary"},
-                        "link_url": {"type": "string", "description": "URL of the article/link to share"},
-                        "hashtags": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optional hashtags"
-                        }
-                    },
-                    "required": ["text", "link_url"],
-                },
-            ),
-            types.Tool(
-                name="linkedin_list_posts",
-                description="List recent LinkedIn posts",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "count": {
-                            "type": "integer",
-                            "description": "Number of posts to fetch (default 5)",
-                        },
-                    },
-                },
-            ),
-            types.Tool(
-                name="linkedin_comment_on_post",
-                description="Comment on a LinkedIn post",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "post_urn": {
-                            "type": "string",
-                            "description": "URN of the LinkedIn post",
-                        },
-                        "message": {"type": "string", "description": "Comment text"},
-                    },
-                    "required": ["post_urn", "message"],
-                },
-            ),
-            types.Tool(
-                name="linkedin_get_comments",
-                description="Get comments for a LinkedIn post",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "post_urn": {
-                            "type": "string",
-                            "description": "URN of the LinkedIn post",
-                        },
-                    },
-                    "required": ["post_urn"],
-                },
-            ),
-            types.Tool(
-                name="linkedin_delete_post",
-                description="Delete a LinkedIn post",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "post_urn": {
-                            "type": "string",
-                            "description": "URN of the LinkedIn post",
-                        },
-                    },
-                    "required": ["post_urn"],
-                },
-            ),
-        ]
-
-    @server.call_tool()
-    async def handle_call_tool(
-        name: str, arguments: dict[str, Any] | None
-    ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-        try:
-            if name == "linkedin_create_text_post":
-                hashtags = arguments.get("hashtags") if arguments else None
-                result = manager.create_text_post(arguments["text"], hashtags)
-            elif name == "linkedin_create_image_post":
-                hashtags = arguments.get("hashtags") if arguments else None
-                result = manager.create_image_post(arguments["text"], arguments["image_url"], hashtags)
-            elif name == "linkedin_create_carousel_post":
-                hashtags = arguments.get("hashtags") if arguments else None
-                result = manager.create_carousel_post(arguments["text"], arguments["image_urls"], hashtags)
-            elif name == "linkedin_create_link_post":
-                hashtags = arguments.get("hashtags") if arguments else None
-                result = manager.create_link_post(arguments["text"], arguments["link_url"], hashtags)
-            elif name == "linkedin_list_posts":
-                count = arguments.get("count", 5) if arguments else 5
-                result = manager.list_recent_posts(count=count)
-            elif name == "linkedin_comment_on_post":
-                result = manager.comment_on_post(arguments["post_urn"], arguments["message"])
-            elif name == "linkedin_get_comments":
-                result = manager.get_comments(arguments["post_urn"])
-            elif name == "linkedin_delete_post":
-                result = manager.delete_post(arguments["post_urn"])
-            else:
-                raise ValueError(f"Unknown tool: {name}")
-            return [types.TextContent(type="text", text=str(result))]
-        except Exception as exc:
-            logger.exception("Tool execution failed")
-            return [types.TextContent(type="text", text=f"Error: {exc}")]
-
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        logger.info("LinkedIn MCP Server running with stdio transport")
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="linkedin",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
+    TOOLS.attach(server, manager)
+
+    if env_flag("LINKEDIN_PREWARM"):
+        start_prewarm(logger, "LinkedIn API", manager.prewarm)
+
+    try:
+        await serve(server, InitializationOptions(
+            server_name="linkedin",
+            server_version="0.1.0",
+            capabilities=server.get_capabilities(
+                notification_options=NotificationOptions(),
+                experimental_capabilities={},
             ),
-        )
+        ), logger)
+    finally:
+        await manager.aclose()
 
 
 def run():
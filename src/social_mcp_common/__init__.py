@@ -0,0 +1 @@
+"""Helpers shared by the Facebook, LinkedIn and Telegram MCP servers."""
@@ -0,0 +1,52 @@
+import importlib.util
+import logging
+import os
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+
+# httpx logs every request URL at INFO, which would leak tokens (e.g. the Telegram bot token) into the log
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def env_number(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def create_http_client(
+    *,
+    max_connections: int = 20,
+    max_keepalive_connections: int = 10,
+    keepalive_expiry: float = 60.0,
+    timeout: float = 60.0,
+    http2: Optional[bool] = None,
+) -> "httpx.AsyncClient":
+    """
+    A pooled ``httpx.AsyncClient`` for talking to the platform APIs.
+
+    Requests use absolute URLs, so one client can be shared by several managers (and
+    hosts); the pool then bounds the connections of the whole process. HTTP/2 is used
+    when the ``h2`` package is installed. Every request is recorded in the upstream
+    metrics. Create it inside the running event loop.
+    """
+    import httpx
+
+    from .upstream import MeteredTransport
+
+    if http2 is None:
+        http2 = importlib.util.find_spec("h2") is not None
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        http2=http2,
+    )
+    return httpx.AsyncClient(
+        transport=MeteredTransport(transport),
+        timeout=httpx.Timeout(timeout, connect=min(10.0, timeout)),
+    )
@@ -0,0 +1,175 @@
+import time
+from bisect import bisect_left
+from typing import Any, Optional
+
+
+# Histogram bucket upper bounds, in seconds; one more bucket counts everything slower
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Metric kind -> (Prometheus name prefix, label names, description)
+KINDS = {
+    "tool": ("mcp_tool_call", ("tool",), "MCP tool calls"),
+    "upstream": ("mcp_upstream_request", ("platform", "method", "endpoint"), "HTTP requests to the platform APIs"),
+}
+
+
+class Series:
+    """Latency histogram, error count and in-flight gauge of one tool or upstream endpoint."""
+
+    __slots__ = ("buckets", "count", "errors", "in_flight", "total", "max")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float, failed: bool) -> None:
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if failed:
+            self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimated ``q`` quantile in seconds, interpolated within its bucket (as Prometheus does)."""
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.buckets):
+            if count and cumulative + count >= rank:
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - cumulative) / count)
+            cumulative += count
+        return 0.0
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "calls": self.count,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "latency_ms": {
+                "mean": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+                "p50": round(self.quantile(0.50) * 1000, 2),
+                "p95": round(self.quantile(0.95) * 1000, 2),
+                "p99": round(self.quantile(0.99) * 1000, 2),
+                "max": round(self.max * 1000, 2),
+            },
+        }
+
+
+class Tracked:
+    """Times one call into a Series; set ``failed`` for calls that return an error instead of raising."""
+
+    __slots__ = ("series", "started", "failed")
+
+    def __init__(self, series: Series) -> None:
+        self.series = series
+        self.failed = False
+
+    def __enter__(self) -> "Tracked":
+        self.series.in_flight += 1
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        self.series.observe(time.perf_counter() - self.started, self.failed or exc_type is not None)
+        self.series.in_flight -= 1
+
+
+class _Untracked:
+    __slots__ = ("failed",)
+
+    def __enter__(self) -> "_Untracked":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        pass
+
+
+class Metrics:
+    """
+    Process-wide latency, error and in-flight metrics per tool and per upstream endpoint.
+
+    Recording a call costs one dict lookup, a bisect over the bucket bounds and a few integer
+    updates; nothing is locked, since every server runs on a single event loop. Read them
+    with ``snapshot()`` (the ``get_metrics`` tools) or ``prometheus()`` (the ``/metrics``
+    endpoint). With ``enabled`` off, ``track`` hands out a no-op.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.started = time.time()
+        self._series: dict[tuple[str, tuple[str, ...]], Series] = {}
+
+    def track(self, kind: str, labels: tuple[str, ...]) -> Tracked | _Untracked:
+        """Context manager timing one call of the ``kind`` series with ``labels``."""
+        if not self.enabled:
+            return _Untracked()
+        key = (kind, labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = Series()
+        return Tracked(series)
+
+    def reset(self) -> None:
+        self._series.clear()
+        self.started = time.time()
+
+    def snapshot(self, kind: Optional[str] = None) -> dict[str, Any]:
+        """Per-series call and error counts, in-flight calls and estimated latency percentiles."""
+        result: dict[str, Any] = {"enabled": self.enabled, "uptime_s": round(time.time() - self.started, 1)}
+        for name in KINDS if kind is None else (kind,):
+            result[name] = {
+                " ".join(labels): series.summary()
+                for (series_kind, labels), series in sorted(self._series.items())
+                if series_kind == name
+            }
+        return result
+
+    def prometheus(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        lines = []
+        for kind, (prefix, label_names, description) in KINDS.items():
+            series = sorted((labels, item) for (series_kind, labels), item in self._series.items() if series_kind == kind)
+            lines += [
+                f"# HELP {prefix}_duration_seconds Latency of {description}.",
+                f"# TYPE {prefix}_duration_seconds histogram",
+            ]
+            for labels, item in series:
+                selector = _labels(label_names, labels)
+                cumulative = 0
+                for bound, count in zip((*BUCKETS, "+Inf"), item.buckets):
+                    cumulative += count
+                    lines.append(f'{prefix}_duration_seconds_bucket{{{selector},le="{bound}"}} {cumulative}')
+                lines.append(f"{prefix}_duration_seconds_sum{{{selector}}} {item.total:.6f}")
+                lines.append(f"{prefix}_duration_seconds_count{{{selector}}} {item.count}")
+            lines += [f"# HELP {prefix}_errors_total Failed {description}.", f"# TYPE {prefix}_errors_total counter"]
+            lines += [f"{prefix}_errors_total{{{_labels(label_names, labels)}}} {item.errors}" for labels, item in series]
+            lines += [f"# HELP {prefix}s_in_flight {description} in progress.", f"# TYPE {prefix}s_in_flight gauge"]
+            lines += [f"{prefix}s_in_flight{{{_labels(label_names, labels)}}} {item.in_flight}" for labels, item in series]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+
+# Shared by every server in the process; MCP_METRICS=0 turns recording off (see transport.serve)
+METRICS = Metrics()
+
+# Definition of each server's get_metrics tool
+METRICS_TOOL_DESCRIPTION = (
+    "Shows where time goes in this server process: calls, errors, in-flight calls and latency "
+    "percentiles per tool and per upstream API endpoint."
+)
+METRICS_TOOL_PROPERTIES = {
+    "kind": {"type": "string", "enum": list(KINDS), "description": "Only tool or only upstream API metrics"},
+}
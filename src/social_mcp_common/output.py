@@ -0,0 +1,77 @@
+import json
+from typing import Any, Iterable, Optional
+
+
+# Envelope keys that hold the items of a listing: Graph ("data"), LinkedIn ("elements")
+# and the Telegram Bot API ("result")
+ITEM_KEYS = ("data", "elements", "result")
+
+OUTPUT_ARGUMENTS = ("fields", "max_items")
+
+OUTPUT_PROPERTIES = {
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Only return these fields of each item; nested fields use dots, e.g. 'from.name'",
+    },
+    "max_items": {"type": "integer", "description": "Return at most this many items"},
+}
+
+
+def _field_tree(fields: Iterable[str]) -> dict[str, Any]:
+    tree: dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        for part in field.strip().split("."):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def _project(value: Any, tree: dict[str, Any]) -> Any:
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [_project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: _project(value[key], subtree) for key, subtree in tree.items() if key in value}
+
+
+def project(result: Any, fields: Optional[Iterable[str] | str] = None, max_items: Optional[int] = None) -> Any:
+    """
+    Trims a tool result to the requested ``fields`` and at most ``max_items`` items.
+
+    Listings (a bare list, or an envelope with a ``data``/``elements``/``result`` list) are
+    capped and projected item by item, leaving envelope keys such as cursors and errors
+    intact; any other result has ``fields`` applied to its top level.
+    """
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    tree = _field_tree(fields or ())
+    if not tree and max_items is None:
+        return result
+
+    def trim(items: list[Any]) -> list[Any]:
+        if max_items is not None:
+            items = items[:max(0, max_items)]
+        return _project(items, tree)
+
+    if isinstance(result, list):
+        return trim(result)
+    if isinstance(result, dict):
+        for key in ITEM_KEYS:
+            items = result.get(key)
+            if isinstance(items, list):
+                trimmed = {**result, key: trim(items)}
+                if len(trimmed[key]) < len(items):
+                    trimmed["truncated_from"] = len(items)
+                return trimmed
+            if isinstance(items, dict):
+                return {**result, key: _project(items, tree)}
+    return _project(result, tree)
+
+
+def to_json(result: Any) -> str:
+    """Serialises a tool result as compact JSON."""
+    return json.dumps(result, separators=(",", ":"), ensure_ascii=False, default=str)
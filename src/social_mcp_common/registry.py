@@ -0,0 +1,329 @@
+import inspect
+import logging
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Generic, Iterable, Optional, TypeVar
+
+from .metrics import METRICS
+from .output import OUTPUT_ARGUMENTS, OUTPUT_PROPERTIES, project, to_json
+
+
+if TYPE_CHECKING:
+    import mcp.types as types
+    from mcp.server import Server
+
+ContextT = TypeVar("ContextT")
+Handler = Callable[[ContextT, dict[str, Any]], Any | Awaitable[Any]]
+ContextResolver = Callable[[ContextT, dict[str, Any]], Awaitable[Any]]
+Validator = Callable[[Any, str], None]
+
+class ToolArgumentError(ValueError):
+    """Raised when a tool call names an unknown tool or its arguments do not match the schema."""
+
+
+_JSON_TYPES: dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool),
+    "array": lambda value: isinstance(value, list),
+    "object": lambda value: isinstance(value, dict),
+    "null": lambda value: value is None,
+}
+
+
+def _nullable(schema: dict[str, Any]) -> bool:
+    """Whether an argument may be passed as null: its type allows ``"null"`` or it has a default."""
+    expected = schema.get("type")
+    return "default" in schema or expected == "null" or (isinstance(expected, list) and "null" in expected)
+
+
+def compile_schema(schema: dict[str, Any]) -> Validator:
+    """
+    Compiles the JSON Schema subset used by tool definitions into a validator function.
+
+    Supports ``type`` (a name or a list of names), ``enum``, ``items``, ``properties``,
+    ``required`` and ``additionalProperties: false``. A null argument is rejected like any
+    other type mismatch unless its schema allows ``"null"`` or has a ``default``. The schema
+    is walked once here; the returned function only runs the checks, and raises
+    ToolArgumentError naming the offending argument.
+    """
+    checks: list[Validator] = []
+
+    expected = schema.get("type")
+    if expected:
+        type_checks = tuple(_JSON_TYPES[name] for name in (expected if isinstance(expected, list) else (expected,)))
+        type_names = " or ".join(expected) if isinstance(expected, list) else expected
+
+        def check_type(value: Any, path: str) -> None:
+            if not any(is_type(value) for is_type in type_checks):
+                raise ToolArgumentError(f"{path} must be of type {type_names}, got {type(value).__name__}")
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = tuple(schema["enum"])
+
+        def check_enum(value: Any, path: str) -> None:
+            if value not in allowed:
+                raise ToolArgumentError(f"{path} must be one of {', '.join(map(str, allowed))}; got {value!r}")
+        checks.append(check_enum)
+
+    if "items" in schema:
+        validate_item = compile_schema(schema["items"])
+
+        def check_items(value: Any, path: str) -> None:
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    validate_item(item, f"{path}[{index}]")
+        checks.append(check_items)
+
+    if "properties" in schema or "required" in schema:
+        properties = {name: compile_schema(sub) for name, sub in schema.get("properties", {}).items()}
+        nullable = frozenset(name for name, sub in schema.get("properties", {}).items() if _nullable(sub))
+        required = tuple(schema.get("required", ()))
+        closed = schema.get("additionalProperties") is False
+
+        def check_object(value: Any, path: str) -> None:
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    raise ToolArgumentError(f"{path}.{name} is required")
+            for name, item in value.items():
+                validate = properties.get(name)
+                if validate is not None:
+                    if item is not None or name not in nullable:
+                        validate(item, f"{path}.{name}")
+                elif closed:
+                    raise ToolArgumentError(f"{path}.{name} is not a recognised argument")
+        checks.append(check_object)
+
+    def validate(value: Any, path: str) -> None:
+        for check in checks:
+            check(value, path)
+
+    return validate
+
+
+class ToolSpec(Generic[ContextT]):
+    """One registered tool: its name, description and input schema, compiled argument validator and handler."""
+
+    def __init__(self, name: str, description: str, schema: dict[str, Any], handler: Handler,
+                 project_fields: bool, reserved: frozenset[str], resolve_context: bool) -> None:
+        self.name = name
+        self.description = description
+        self.schema = schema
+        self.handler = handler
+        self.project_fields = project_fields
+        # Output and context arguments the handler does not take itself; they are stripped before it runs
+        self.reserved = reserved
+        self.resolve_context = resolve_context
+        self.validate = compile_schema(schema)
+        # Arguments passed as null that the handler should see as absent, so it applies its default
+        self.defaulted = frozenset(name for name, sub in schema["properties"].items() if "default" in sub)
+
+
+class ToolRegistry(Generic[ContextT]):
+    """
+    Declarative tool table shared by the MCP servers.
+
+    Tools are defined once with the ``tool`` decorator. Each handler receives the server's
+    context object (its platform manager) and the validated arguments, and returns a plain
+    result that is rendered as compact JSON. The ``list_tools`` response is built once,
+    calls are dispatched with a dict lookup, and arguments are checked against the tool's
+    compiled schema before the handler runs, so malformed calls never reach the network.
+
+    Defining tools does not import ``mcp``; the MCP types are only built when the tools
+    are first listed or called, so command-line users of a registry skip that import.
+
+    ``context_properties`` are extra arguments accepted by every tool that select what the
+    handler works on (e.g. which Facebook Page). They are passed, with the server context,
+    to ``resolve_context``, and the handler receives the resolved context instead.
+    """
+
+    def __init__(self, logger: logging.Logger, context_properties: Optional[dict[str, Any]] = None,
+                 resolve_context: Optional[ContextResolver] = None) -> None:
+        self.logger = logger
+        self.context_properties = context_properties or {}
+        self.resolve_context = resolve_context
+        self._specs: dict[str, ToolSpec[ContextT]] = {}
+        self._tools: Optional[list["types.Tool"]] = None
+
+    def tool(self, name: str, description: str, properties: Optional[dict[str, Any]] = None,
+             required: tuple[str, ...] = (), project_fields: bool = True,
+             resolve_context: bool = True) -> Callable[[Handler], Handler]:
+        """
+        Registers the decorated ``handler(context, arguments)`` as tool ``name``.
+
+        Every tool also accepts the ``fields``/``max_items`` output arguments unless it
+        defines its own; ``project_fields=False`` marks tools whose ``fields`` argument is
+        consumed by the handler instead of trimming the output. ``resolve_context=False``
+        leaves out the registry's context arguments and hands the server context as is.
+        """
+        if name in self._specs:
+            raise ValueError(f"Tool {name!r} is already registered.")
+
+        def register(handler: Handler) -> Handler:
+            contextual = resolve_context and self.resolve_context is not None
+            context_properties = self.context_properties if contextual else {}
+            schema: dict[str, Any] = {
+                "type": "object",
+                "properties": {**OUTPUT_PROPERTIES, **context_properties, **(properties or {})},
+                "additionalProperties": False,
+            }
+            if required:
+                schema["required"] = list(required)
+            reserved = (frozenset(OUTPUT_ARGUMENTS) - set(properties or {})) | frozenset(context_properties)
+            self._specs[name] = ToolSpec(name, description, schema, handler, project_fields, reserved, contextual)
+            self._tools = None
+            return handler
+
+        return register
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def names(self) -> list[str]:
+        return list(self._specs)
+
+    def list_tools(self) -> list["types.Tool"]:
+        """The tool definitions, built on first use and reused for every ``list_tools`` request."""
+        if self._tools is None:
+            import mcp.types as types
+
+            self._tools = [
+                types.Tool(name=spec.name, description=spec.description, inputSchema=spec.schema)
+                for spec in self._specs.values()
+            ]
+        return self._tools
+
+    async def dispatch(self, name: str, context: ContextT, arguments: Optional[dict[str, Any]]) -> Any:
+        """Validates ``arguments`` and runs tool ``name``, returning its raw result."""
+        spec = self._specs.get(name)
+        if spec is None:
+            raise ToolArgumentError(f"Unknown tool: {name}")
+        arguments = arguments or {}
+        spec.validate(arguments, "arguments")
+        if spec.resolve_context:
+            context = await self.resolve_context(context, arguments)
+        result = spec.handler(context, {
+            key: value for key, value in arguments.items()
+            if key not in spec.reserved and not (value is None and key in spec.defaulted)
+        })
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def project(self, name: str, result: Any, arguments: Optional[dict[str, Any]]) -> Any:
+        """Trims a result of tool ``name`` by the caller's ``fields``/``max_items`` arguments."""
+        arguments = arguments or {}
+        fields = arguments.get("fields") if self._specs[name].project_fields else None
+        return project(result, fields, arguments.get("max_items"))
+
+    def render(self, name: str, result: Any, arguments: Optional[dict[str, Any]]) -> str:
+        """Compact JSON for a result of tool ``name``, trimmed by the caller's output arguments."""
+        return to_json(self.project(name, result, arguments))
+
+    async def call(self, name: str, context: ContextT,
+                   arguments: Optional[dict[str, Any]]) -> list["types.TextContent"]:
+        """
+        Runs a tool for an MCP ``call_tool`` request; failures are reported as an ``Error:`` text
+        result. Each call is recorded in the tool metrics, counting error results as failures.
+        """
+        import mcp.types as types
+
+        # Unknown names share one series, so callers cannot create series at will
+        with METRICS.track("tool", (name if name in self._specs else "(unknown)",)) as call:
+            try:
+                result = await self.dispatch(name, context, arguments)
+                call.failed = isinstance(result, dict) and "error" in result
+                return [types.TextContent(type="text", text=self.render(name, result, arguments))]
+            except ToolArgumentError as exc:
+                call.failed = True
+                self.logger.warning(f"Rejected call to {name}: {exc}")
+                return [types.TextContent(type="text", text=f"Error: {exc}")]
+            except Exception as exc:
+                call.failed = True
+                self.logger.exception(f"Tool {name} failed")
+                return [types.TextContent(type="text", text=f"Error: {exc}")]
+
+    def attach(self, server: "Server", context: ContextT) -> None:
+        """Serves the registered tools on ``server``, calling handlers with ``context``."""
+
+        @server.list_tools()
+        async def handle_list_tools() -> list["types.Tool"]:
+            return self.list_tools()
+
+        @server.call_tool()
+        async def handle_call_tool(name: str, arguments: dict[str, Any] | None) -> list["types.TextContent"]:
+            return await self.call(name, context, arguments)
+
+
+class ToolRouter:
+    """
+    Serves the tools of several registries, each bound to its own context, from one MCP server.
+
+    Every registry is mounted under a namespace prefix (``facebook_``, ``linkedin_`` ...) that
+    is added to the tool names that do not already carry it, so tools of different platforms
+    can never collide. Calls are routed with one dict lookup to the owning registry.
+    """
+
+    def __init__(self, logger: logging.Logger) -> None:
+        self.logger = logger
+        self._routes: dict[str, tuple[ToolRegistry[Any], Any, str]] = {}
+        self._tools: Optional[list["types.Tool"]] = None
+
+    def mount(self, registry: ToolRegistry[ContextT], context: ContextT, prefix: str,
+              exclude: Iterable[str] = ()) -> None:
+        """
+        Adds the tools of ``registry``, called with ``context``, under the ``prefix`` namespace.
+        Tools whose namespaced name is in ``exclude`` are left out.
+        """
+        exclude = frozenset(exclude)
+        for name in registry.names():
+            routed = name if name.startswith(prefix) else prefix + name
+            if routed in exclude:
+                continue
+            if routed in self._routes:
+                raise ValueError(f"Tool {routed!r} is already mounted.")
+            self._routes[routed] = (registry, context, name)
+        self._tools = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._routes
+
+    def names(self) -> list[str]:
+        return list(self._routes)
+
+    def list_tools(self) -> list["types.Tool"]:
+        """The namespaced tool definitions of all mounted registries, built once."""
+        if self._tools is None:
+            definitions: dict[int, dict[str, "types.Tool"]] = {}
+            tools = []
+            for routed, (registry, _, name) in self._routes.items():
+                if id(registry) not in definitions:
+                    definitions[id(registry)] = {tool.name: tool for tool in registry.list_tools()}
+                tool = definitions[id(registry)][name]
+                tools.append(tool if routed == name else tool.model_copy(update={"name": routed}))
+            self._tools = tools
+        return self._tools
+
+    async def call(self, name: str, arguments: Optional[dict[str, Any]]) -> list["types.TextContent"]:
+        """Runs a namespaced tool for an MCP ``call_tool`` request."""
+        route = self._routes.get(name)
+        if route is None:
+            import mcp.types as types
+
+            self.logger.warning(f"Rejected call to {name}: Unknown tool")
+            return [types.TextContent(type="text", text=f"Error: Unknown tool: {name}")]
+        registry, context, tool_name = route
+        return await registry.call(tool_name, context, arguments)
+
+    def attach(self, server: "Server") -> None:
+        """Serves every mounted tool on ``server``."""
+
+        @server.list_tools()
+        async def handle_list_tools() -> list["types.Tool"]:
+            return self.list_tools()
+
+        @server.call_tool()
+        async def handle_call_tool(name: str, arguments: dict[str, Any] | None) -> list["types.TextContent"]:
+            return await self.call(name, arguments)
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+import os
+import sys
+from typing import Awaitable, Callable
+
+
+# Background startup tasks; referenced here so they are not garbage-collected mid-flight
+_background_tasks: set[asyncio.Task] = set()
+
+
+def configure_process() -> None:
+    """
+    Process-wide setup for a server entry point: UTF-8 stdio on Windows, ``.env`` loading
+    and logging. Run from ``main()`` rather than at import, so importing a server package
+    (for its manager or tool definitions) stays cheap and side-effect free.
+    """
+    # Reconfigure UnicodeEncodeError prone default (i.e. windows-1252) to utf-8
+    if sys.platform == "win32" and os.environ.get("PYTHONIOENCODING") is None:
+        sys.stdin.reconfigure(encoding="utf-8")
+        sys.stdout.reconfigure(encoding="utf-8")
+        sys.stderr.reconfigure(encoding="utf-8")
+
+    from dotenv import load_dotenv
+
+    # Load environment variables from .env file if present
+    load_dotenv()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+    )
+
+
+def env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def start_prewarm(logger: logging.Logger, target: str, warm: Callable[[], Awaitable[None]]) -> None:
+    """
+    Opens the connection to ``target`` in the background while the server waits for its
+    first request, so the first tool call does not pay for DNS and the TLS handshake.
+    Failures are only logged; the real call simply connects as usual.
+    """
+
+    async def run() -> None:
+        try:
+            await warm()
+            logger.info(f"Pre-warmed connection to {target}")
+        except Exception as exc:
+            logger.warning(f"Could not pre-warm connection to {target}: {exc}")
+
+    task = asyncio.create_task(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
@@ -0,0 +1,332 @@
+import asyncio
+import hmac
+import ipaddress
+import logging
+import os
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import urlsplit
+
+from .http import env_number
+from .metrics import METRICS
+
+if TYPE_CHECKING:
+    from mcp.server import Server
+    from mcp.server.models import InitializationOptions
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+TRANSPORTS = ("stdio", "sse")
+# Paths served without the bearer token: the liveness check reveals nothing but session counts
+PUBLIC_PATHS = ("/health",)
+
+
+def is_loopback(host: str) -> bool:
+    """Whether ``host`` only accepts connections from this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+def auth_token(host: str) -> Optional[str]:
+    """
+    The bearer token HTTP clients must present (``MCP_AUTH_TOKEN``), or None on a loopback
+    host without one. Anyone who can reach the server can publish and delete on the
+    configured accounts, so a non-loopback host without a token is refused.
+    """
+    token = os.environ.get("MCP_AUTH_TOKEN", "").strip() or None
+    if token is None and not is_loopback(host):
+        raise RuntimeError(
+            f"MCP_HOST={host} accepts connections from other machines; set MCP_AUTH_TOKEN to a secret "
+            "that clients send as 'Authorization: Bearer <token>', or bind to 127.0.0.1."
+        )
+    return token
+
+
+def loopback_request(host: Optional[str], origin: Optional[str], port: Optional[int] = None) -> bool:
+    """
+    Whether a request was addressed to a loopback name (on ``port``, if given) by a client
+    that is not a web page on another site. This is what protects a server without a token
+    from the browser: a page using DNS rebinding reaches 127.0.0.1 under its own name, which
+    the browser still sends as ``Host``. Its ``Origin`` gives the page away too.
+    """
+    try:
+        requested = urlsplit(f"//{host or ''}")
+        if not requested.hostname or not is_loopback(requested.hostname):
+            return False
+        if port is not None and requested.port is not None and requested.port != port:
+            return False
+        return not origin or is_loopback(urlsplit(origin).hostname or "")
+    except ValueError:
+        return False
+
+
+def authorized(authorization: Optional[str], token: Optional[str]) -> bool:
+    """Whether an ``Authorization`` header value carries ``token`` (always true without a token)."""
+    if token is None:
+        return True
+    scheme, _, credentials = (authorization or "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(credentials.strip().encode(), token.encode())
+
+
+def limit_tool_calls(server: "Server", limit: int) -> None:
+    """
+    Caps the number of tool calls running at once across every session of ``server``.
+
+    MCP sessions handle their requests concurrently, so without a cap many clients (or one
+    busy client) can start an unbounded number of publishes at the same time. Calls over the
+    limit wait for a free slot instead of failing. Install after the tools are attached.
+    """
+    import mcp.types as types
+
+    handler = server.request_handlers[types.CallToolRequest]
+    slots = asyncio.Semaphore(limit)
+
+    async def limited(request: types.CallToolRequest) -> types.ServerResult:
+        async with slots:
+            return await handler(request)
+
+    server.request_handlers[types.CallToolRequest] = limited
+
+
+async def serve(server: "Server", options: "InitializationOptions", logger: logging.Logger) -> None:
+    """
+    Runs ``server`` over the transport selected by ``MCP_TRANSPORT``.
+
+    ``stdio`` (the default) serves the single client that spawned the process. ``sse`` serves
+    any number of concurrent MCP sessions over HTTP with Server-Sent Events, so one process
+    can be shared by many agents. In both modes at most ``MCP_MAX_CONCURRENT_CALLS`` tool
+    calls run at once.
+
+    Tool and upstream metrics are recorded unless ``MCP_METRICS=0``. Prometheus can scrape
+    them at ``/metrics`` on the SSE port, or, with stdio, on ``MCP_METRICS_PORT`` if set.
+
+    HTTP endpoints require ``Authorization: Bearer $MCP_AUTH_TOKEN`` when the token is set;
+    binding ``MCP_HOST`` to anything but a loopback address requires it. Without a token only
+    requests addressed to a loopback name are served (see ``loopback_request``).
+    """
+    transport = os.environ.get("MCP_TRANSPORT", "stdio").strip().lower()
+    if transport not in TRANSPORTS:
+        raise ValueError(f"MCP_TRANSPORT must be one of {', '.join(TRANSPORTS)}; got {transport!r}")
+    limit_tool_calls(server, int(env_number("MCP_MAX_CONCURRENT_CALLS", 32)))
+    METRICS.enabled = os.environ.get("MCP_METRICS", "1").strip().lower() not in ("0", "false", "no", "off")
+    host = os.environ.get("MCP_HOST", "127.0.0.1")
+
+    if transport == "sse":
+        await serve_sse(
+            server,
+            options,
+            logger,
+            host=host,
+            port=int(env_number("MCP_PORT", 8000)),
+            max_sessions=int(env_number("MCP_MAX_SESSIONS", 100)),
+            token=auth_token(host),
+        )
+        return
+
+    import mcp.server.stdio
+
+    metrics_port = os.environ.get("MCP_METRICS_PORT")
+    metrics_server = None
+    if metrics_port and METRICS.enabled:
+        metrics_server = await serve_metrics(host, int(metrics_port), logger, auth_token(host))
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            logger.info(f"{options.server_name} server running with stdio transport")
+            await server.run(read_stream, write_stream, options)
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+
+
+async def serve_metrics(host: str, port: int, logger: logging.Logger, token: Optional[str] = None) -> asyncio.Server:
+    """
+    Serves the Prometheus metrics at ``http://host:port/metrics`` next to a stdio server.
+    A bare asyncio HTTP responder: one GET per connection, nothing else to configure. With
+    ``token`` set, requests must carry it as a bearer token; without one, only requests
+    addressed to a loopback name are served.
+    """
+
+    async def respond(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            headers = {}
+            while line := (await reader.readline()).strip():
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            parts = request_line.split()
+            extra = ""
+            if token is None and not loopback_request(headers.get("host"), headers.get("origin"), port):
+                status, body = "403 Forbidden", b"Forbidden\n"
+            elif not authorized(headers.get("authorization"), token):
+                status, body, extra = "401 Unauthorized", b"Unauthorized\n", "WWW-Authenticate: Bearer\r\n"
+            elif len(parts) > 1 and parts[1].split(b"?")[0] == b"/metrics":
+                status, body = "200 OK", METRICS.prometheus().encode()
+            else:
+                status, body = "404 Not Found", b"Not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n{extra}"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    metrics_server = await asyncio.start_server(respond, host, port)
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return metrics_server
+
+
+class SseSessions:
+    """
+    ASGI app for the SSE endpoint: opens one MCP session per ``GET`` and runs ``server`` on it
+    until the client disconnects.
+
+    At most ``max_sessions`` sessions are open at once; further clients get ``503`` with a
+    ``Retry-After`` header rather than being queued, so a crowd of clients cannot exhaust the
+    process. All sessions share the server's managers, connection pools and caches.
+    """
+
+    def __init__(self, server: "Server", options: "InitializationOptions", logger: logging.Logger,
+                 max_sessions: int, message_path: str = "/messages/") -> None:
+        from mcp.server.sse import SseServerTransport
+
+        self.server = server
+        self.options = options
+        self.logger = logger
+        self.max_sessions = max_sessions
+        self.active = 0
+        self.transport = SseServerTransport(message_path)
+
+    async def __call__(self, scope: "Scope", receive: "Receive", send: "Send") -> None:
+        if self.active >= self.max_sessions:
+            from starlette.responses import PlainTextResponse
+
+            self.logger.warning(f"Rejected SSE session: {self.active} of {self.max_sessions} sessions open")
+            response = PlainTextResponse("Too many open sessions", status_code=503, headers={"Retry-After": "5"})
+            await response(scope, receive, send)
+            return
+
+        import anyio
+
+        # The server keeps waiting for messages after the client has gone away, so the
+        # session is ended explicitly once the connection reports the disconnect
+        disconnected = anyio.Event()
+
+        async def watched_receive() -> "Message":
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            return message
+
+        async def end_on_disconnect(scope: anyio.CancelScope) -> None:
+            await disconnected.wait()
+            scope.cancel()
+
+        self.active += 1
+        self.logger.info(f"SSE session opened ({self.active} open)")
+        try:
+            async with self.transport.connect_sse(scope, watched_receive, send) as (read_stream, write_stream):
+                async with anyio.create_task_group() as session:
+                    session.start_soon(end_on_disconnect, session.cancel_scope)
+                    await self.server.run(read_stream, write_stream, self.options)
+                    session.cancel_scope.cancel()
+        finally:
+            self.active -= 1
+            self.logger.info(f"SSE session closed ({self.active} open)")
+
+
+class BearerAuth:
+    """ASGI middleware answering ``401`` to HTTP requests without ``Authorization: Bearer <token>``."""
+
+    def __init__(self, app: "ASGIApp", token: str, logger: logging.Logger) -> None:
+        self.app = app
+        self.token = token
+        self.logger = logger
+
+    async def __call__(self, scope: "Scope", receive: "Receive", send: "Send") -> None:
+        if scope["type"] == "http" and scope["path"] not in PUBLIC_PATHS:
+            headers = dict(scope["headers"])
+            authorization = headers.get(b"authorization", b"").decode("latin-1")
+            if not authorized(authorization, self.token):
+                from starlette.responses import PlainTextResponse
+
+                client = scope.get("client") or ("unknown",)
+                self.logger.warning(f"Rejected unauthenticated request to {scope['path']} from {client[0]}")
+                response = PlainTextResponse("Unauthorized", status_code=401, headers={"WWW-Authenticate": "Bearer"})
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class LoopbackOnly:
+    """ASGI middleware answering ``403`` to HTTP requests not addressed to a loopback name (see ``loopback_request``)."""
+
+    def __init__(self, app: "ASGIApp", port: Optional[int], logger: logging.Logger) -> None:
+        self.app = app
+        self.port = port
+        self.logger = logger
+
+    async def __call__(self, scope: "Scope", receive: "Receive", send: "Send") -> None:
+        if scope["type"] == "http":
+            headers = dict(scope["headers"])
+            host = headers.get(b"host", b"").decode("latin-1")
+            origin = headers.get(b"origin", b"").decode("latin-1")
+            if not loopback_request(host, origin, self.port):
+                from starlette.responses import PlainTextResponse
+
+                self.logger.warning(f"Rejected request to {scope['path']} for host {host!r} (origin {origin!r})")
+                await PlainTextResponse("Forbidden", status_code=403)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+def sse_app(server: "Server", options: "InitializationOptions", logger: logging.Logger, max_sessions: int,
+            token: Optional[str] = None, port: Optional[int] = None):
+    """
+    Starlette app serving ``server`` over SSE: clients connect to ``GET /sse`` and post their
+    messages to ``/messages/``; ``GET /health`` reports the open sessions and ``GET /metrics``
+    the tool and upstream metrics for Prometheus (unless they are disabled). With ``token``
+    set, every endpoint but ``/health`` requires it as a bearer token; without one, only
+    requests addressed to a loopback name (on ``port``) are served.
+    """
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, PlainTextResponse
+    from starlette.routing import Mount, Route
+
+    sessions = SseSessions(server, options, logger, max_sessions)
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok", "sessions": sessions.active, "max_sessions": sessions.max_sessions})
+
+    async def metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(METRICS.prometheus(), media_type="text/plain; version=0.0.4")
+
+    routes = [
+        Route("/sse", endpoint=sessions, methods=["GET"]),
+        Mount("/messages/", app=sessions.transport.handle_post_message),
+        Route("/health", endpoint=health, methods=["GET"]),
+    ]
+    if METRICS.enabled:
+        routes.append(Route("/metrics", endpoint=metrics, methods=["GET"]))
+    app = Starlette(routes=routes)
+    return LoopbackOnly(app, port, logger) if token is None else BearerAuth(app, token, logger)
+
+
+async def serve_sse(server: "Server", options: "InitializationOptions", logger: logging.Logger,
+                    host: str, port: int, max_sessions: int, token: Optional[str] = None) -> None:
+    """Serves ``server`` over SSE with uvicorn on the running event loop until the process is stopped."""
+    import uvicorn
+
+    app = sse_app(server, options, logger, max_sessions, token, port)
+    # SSE streams stay open until the client leaves; on shutdown they are cut after a short grace period
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="off",
+                            timeout_graceful_shutdown=5)
+    logger.info(f"{options.server_name} server running with SSE transport on http://{host}:{port}/sse "
+                f"(max {max_sessions} sessions, {'bearer token required' if token else 'loopback clients only'})")
+    await uvicorn.Server(config).serve()
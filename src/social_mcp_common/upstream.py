@@ -0,0 +1,58 @@
+import httpx
+
+from .metrics import METRICS, Metrics
+
+
+GRAPH_HOSTS = ("graph.facebook.com", "graph-video.facebook.com")
+
+
+def _template(segment: str) -> str:
+    # API names never contain digits; Page, post, container and URN identifiers do
+    return "{id}" if any(char.isdigit() for char in segment) else segment
+
+
+def endpoint_label(url: httpx.URL) -> tuple[str, str]:
+    """
+    ``(platform, endpoint)`` of a platform API request, with identifiers replaced by ``{id}``
+    so one series covers every Page or post: ``("graph", "/{id}/photos")``,
+    ``("linkedin", "assets?action=registerUpload")``, ``("telegram", "sendMediaGroup")``.
+    Requests to any other host (media downloads) are grouped as ``("media", "download")``.
+    """
+    host = url.host
+    segments = [segment for segment in url.path.split("/") if segment]
+    if host in GRAPH_HOSTS:
+        # The first segment is the API version
+        return "graph", "/" + "/".join(_template(segment) for segment in segments[1:])
+    if host == "api.telegram.org":
+        # The bot token is part of the path, so only the method name is kept
+        return "telegram", segments[-1] if len(segments) > 1 else "/"
+    if host == "api.linkedin.com":
+        if segments and segments[0] == "v2":
+            segments = segments[1:]
+        endpoint = "/".join(_template(segment) for segment in segments)
+        action = url.params.get("action")
+        return "linkedin", f"{endpoint}?action={action}" if action else endpoint
+    return "media", "download"
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps an httpx transport to record, per platform API endpoint, the time to the response
+    headers, the requests in flight and the failures (transport errors and HTTP 4xx/5xx).
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, metrics: Metrics = METRICS) -> None:
+        self.transport = transport
+        self.metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.metrics.enabled:
+            return await self.transport.handle_async_request(request)
+        platform, endpoint = endpoint_label(request.url)
+        with self.metrics.track("upstream", (platform, request.method, endpoint)) as call:
+            response = await self.transport.handle_async_request(request)
+            call.failed = response.status_code >= 400
+            return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
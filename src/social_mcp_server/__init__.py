@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterator
+
+from social_mcp_common.http import create_http_client, env_number
+from social_mcp_common.metrics import METRICS, METRICS_TOOL_DESCRIPTION, METRICS_TOOL_PROPERTIES
+from social_mcp_common.registry import ToolRegistry, ToolRouter
+from social_mcp_common.startup import configure_process, env_flag, start_prewarm
+from social_mcp_common.transport import serve
+
+if TYPE_CHECKING:
+    import httpx
+
+
+logger = logging.getLogger("social_mcp_server")
+
+# A platform is served when all credentials of one of its alternatives are set
+REQUIRED_CREDENTIALS = {
+    "facebook": (("FACEBOOK_PAGE_ACCESS_TOKEN", "FACEBOOK_PAGE_ID"), ("FACEBOOK_USER_ACCESS_TOKEN",)),
+    "linkedin": (("LINKEDIN_ACCESS_TOKEN", "LINKEDIN_ORGANIZATION_ID"),),
+    "telegram": (("TELEGRAM_BOT_TOKEN", "TELEGRAM_CHAT_ID"),),
+}
+
+Platform = tuple[ToolRegistry[Any], Any, Callable[[], Awaitable[None]]]
+
+
+def enabled_platforms() -> list[str]:
+    """The platforms whose credentials are all present; partially configured ones are skipped with a warning."""
+    enabled = []
+    for platform, alternatives in REQUIRED_CREDENTIALS.items():
+        missing = [[name for name in names if not os.environ.get(name)] for names in alternatives]
+        if any(not names for names in missing):
+            enabled.append(platform)
+            continue
+        partial = next((names for names, alternative in zip(missing, alternatives) if len(names) < len(alternative)), None)
+        if partial:
+            logger.warning(f"{platform.capitalize()} tools disabled; missing environment variable(s): {', '.join(partial)}")
+    return enabled
+
+
+def _facebook(client: "httpx.AsyncClient") -> Platform:
+    from facebook_mcp_server.graph import GraphClient
+    from facebook_mcp_server.pages import pages_from_config
+    from facebook_mcp_server.server import load_facebook_config
+    from facebook_mcp_server.tools import TOOLS
+
+    pages = pages_from_config(*load_facebook_config(), graph=GraphClient(client=client))
+    pages.scheduler.start()
+    return TOOLS, pages, pages.graph.prewarm
+
+
+def _linkedin(client: "httpx.AsyncClient") -> Platform:
+    from linkedin_mcp_server import TOOLS, LinkedInManager, load_linkedin_config
+
+    access_token, org_id = load_linkedin_config()
+    manager = LinkedInManager(access_token=access_token, organization_id=org_id, client=client)
+    return TOOLS, manager, manager.prewarm
+
+
+def _telegram(client: "httpx.AsyncClient") -> Platform:
+    from telegram_mcp_server import TOOLS, TelegramManager, load_telegram_config
+
+    token, chat_id = load_telegram_config()
+    manager = TelegramManager(bot_token=token, chat_id=chat_id, client=client)
+    return TOOLS, manager, manager.prewarm
+
+
+# Platform name -> (tool namespace, prewarm flag, manager factory)
+PLATFORMS = {
+    "facebook": ("facebook_", "FACEBOOK_PREWARM", _facebook),
+    "linkedin": ("linkedin_", "LINKEDIN_PREWARM", _linkedin),
+    "telegram": ("telegram_", "TELEGRAM_PREWARM", _telegram),
+}
+
+# The metrics cover the whole process, so the platforms' own get_metrics tools (which would
+# all return the same thing) are replaced by this one
+METRICS_TOOLS: ToolRegistry[None] = ToolRegistry(logger)
+
+
+@METRICS_TOOLS.tool("get_metrics", METRICS_TOOL_DESCRIPTION, METRICS_TOOL_PROPERTIES)
+def get_metrics(context: None, arguments: dict[str, Any]) -> Any:
+    return METRICS.snapshot(arguments.get("kind"))
+
+
+def mount_platforms(router: ToolRouter, platforms: list[str],
+                    client: "httpx.AsyncClient") -> Iterator[tuple[str, Any, Callable[[], Awaitable[None]]]]:
+    """
+    Mounts the tools of ``platforms`` and the shared ``get_metrics`` tool on ``router``, yielding
+    ``(platform, manager, prewarm)`` as each manager is created (so a caller can close the ones
+    made before a later platform fails). Run from a running event loop.
+    """
+    for platform in platforms:
+        prefix, _, factory = PLATFORMS[platform]
+        registry, manager, prewarm = factory(client)
+        yield platform, manager, prewarm
+        router.mount(registry, manager, prefix, exclude=(f"{prefix}get_metrics",))
+    router.mount(METRICS_TOOLS, None, "")
+
+
+async def main():
+    configure_process()
+    logger.info("Starting Social MCP Server")
+
+    from mcp.server import NotificationOptions, Server
+    from mcp.server.models import InitializationOptions
+
+    platforms = enabled_platforms()
+    if not platforms:
+        message = (
+            "No platform is configured. Set the credentials of at least one of: "
+            + "; ".join(
+                f"{platform} ({' or '.join(', '.join(names) for names in alternatives)})"
+                for platform, alternatives in REQUIRED_CREDENTIALS.items()
+            )
+        )
+        logger.error(message)
+        raise RuntimeError(message)
+
+    # One connection pool for every platform; requests use absolute URLs, so hosts do not mix
+    client = create_http_client(
+        max_connections=int(env_number("SOCIAL_HTTP_MAX_CONNECTIONS", 30)),
+        max_keepalive_connections=int(env_number("SOCIAL_HTTP_MAX_KEEPALIVE", 15)),
+        keepalive_expiry=env_number("SOCIAL_HTTP_KEEPALIVE_EXPIRY", 60.0),
+        timeout=env_number("SOCIAL_HTTP_TIMEOUT", 60.0),
+    )
+    router = ToolRouter(logger)
+    server = Server("social-manager")
+    managers = []
+
+    try:
+        for platform, manager, prewarm in mount_platforms(router, platforms, client):
+            managers.append(manager)
+            if env_flag(PLATFORMS[platform][1]):
+                start_prewarm(logger, f"{platform.capitalize()} API", prewarm)
+        router.attach(server)
+        logger.info(f"Serving {len(router.names())} tools for {', '.join(platforms)}")
+
+        await serve(server, InitializationOptions(
+            server_name="social",
+            server_version="0.1.0",
+            capabilities=server.get_capabilities(
+                notification_options=NotificationOptions(),
+                experimental_capabilities={},
+            ),
+        ), logger)
+    finally:
+        # The managers stop their background work but only borrow the shared client, so
+        # closing it releases every connection
+        for manager in managers:
+            await manager.aclose()
+        await client.aclose()
+
+
+def run():
+    """Entry point for the combined Facebook/Instagram, LinkedIn and Telegram MCP server."""
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    run()
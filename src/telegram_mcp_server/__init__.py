@@ -1,29 +1,18 @@
 import asyncio
 import logging
 import os
-import sys
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
-import mcp.server.stdio
-import requests
-from dotenv import load_dotenv
-from mcp.server import NotificationOptions, Server
-from mcp.server.models import InitializationOptions
-import mcp.types as types
+from social_mcp_common.http import create_http_client
+from social_mcp_common.metrics import METRICS, METRICS_TOOL_DESCRIPTION, METRICS_TOOL_PROPERTIES
+from social_mcp_common.registry import ToolRegistry
+from social_mcp_common.startup import configure_process, env_flag, start_prewarm
+from social_mcp_common.transport import serve
 
+if TYPE_CHECKING:
+    import httpx
 
-# Load environment variables from .env file if present
-load_dotenv()
 
-if sys.platform == "win32" and os.environ.get("PYTHONIOENCODING") is None:
-    sys.stdin.reconfigure(encoding="utf-8")
-    sys.stdout.reconfigure(encoding="utf-8")
-    sys.stderr.reconfigure(encoding="utf-8")
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-)
 logger = logging.getLogger("telegram_mcp_server")
 
 
@@ -52,10 +41,31 @@ def load_telegram_config() -> tuple[str, str]:
 class TelegramManager:
     """Enhanced Telegram manager with media groups, carousel posts, and link previews."""
     
-    def __init__(self, bot_token: str, chat_id: str) -> None:
+    def __init__(self, bot_token: str, chat_id: str, client: Optional["httpx.AsyncClient"] = None) -> None:
         self.bot_token = bot_token
         self.chat_id = chat_id
         self.base_url = f"https://api.telegram.org/bot{bot_token}"
+        self._client = client
+        # A client passed in is shared with other managers and closed by its owner
+        self._owns_client = client is None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """The pooled HTTP client, created on first use so it binds to the running event loop."""
+        if self._client is None or self._client.is_closed:
+            self._client = create_http_client()
+            self._owns_client = True
+        return self._client
+
+    async def prewarm(self) -> None:
+        """Opens a pooled connection (DNS, TCP and TLS setup) ahead of the first real call."""
+        await self.client.head("https://api.telegram.org")
+
+    async def aclose(self) -> None:
+        """Closes the connection pool unless it is shared with other managers."""
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     def _format_text_with_hashtags(self, text: str, hashtags: Optional[list[str]] = None) -> str:
         """Format text with hashtags appended."""
@@ -65,7 +75,7 @@ class TelegramManager:
         hashtag_str = " ".join(f"#{tag.lstrip('#')}" for tag in hashtags)
         return f"{text}\n\n{hashtag_str}"
 
-    def send_message(self, text: str, hashtags: Optional[list[str]] = None, disable_preview: bool = False) -> dict[str, Any]:
+    async def send_message(self, text: str, hashtags: Optional[list[str]] = None, disable_preview: bool = False) -> dict[str, Any]:
         """Send a text message with optional hashtags and link preview control."""
         formatted_text = self._format_text_with_hashtags(text, hashtags)
         
@@ -75,10 +85,10 @@ class TelegramManager:
             "text": formatted_text,
             "disable_web_page_preview": disable_preview
         }
-        response = requests.post(url, json=payload)
+        response = await self.client.post(url, json=payload)
         return response.json()
 
-    def send_photo(self, photo_url: str, caption: str | None = None, hashtags: Optional[list[str]] = None) -> dict[str, Any]:
+    async def send_photo(self, photo_url: str, caption: str | None = None, hashtags: Optional[list[str]] = None) -> dict[str, Any]:
         """Send a single photo with optional caption and hashtags."""
         if caption:
             formatted_caption = self._format_text_with_hashtags(caption, hashtags)
@@ -89,10 +99,10 @@ class TelegramManager:
         payload = {"chat_id": self.chat_id, "photo": photo_url}
         if formatted_caption:
             payload["caption"] = formatted_caption
-        response = requests.post(url, json=payload)
+        response = await self.client.post(url, json=payload)
         return response.json()
 
-    def send_media_group(self, media_urls: list[str], caption: str | None = None, hashtags: Optional[list[str]] = None) -> dict[str, Any]:
+    async def send_media_group(self, media_urls: list[str], caption: str | None = None, hashtags: Optional[list[str]] = None) -> dict[str, Any]:
         """Send multiple photos as a carousel/album (media group) with optional caption and hashtags."""
         if not media_urls or len(media_urls) < 2:
             return {"error": "Media group requires at least 2 images"}
@@ -122,10 +132,10 @@ class TelegramManager:
             "chat_id": self.chat_id,
             "media": media
         }
-        response = requests.post(url, json=payload)
+        response = await self.client.post(url, json=payload)
         return response.json()
 
-    def send_link_with_preview(self, text: str, link_url: str, hashtags: Optional[list[str]] = None) -> dict[str, Any]:
+    async def send_link_with_preview(self, text: str, link_url: str, hashtags: Optional[list[str]] = None) -> dict[str, Any]:
         """Send a message with link preview enabled and optional hashtags."""
         formatted_text = f"{text}\n\n{link_url}"
         if hashtags:
@@ -137,19 +147,125 @@ class TelegramManager:
             "text": formatted_text,
             "disable_web_page_preview": False  # Enable preview
         }
-        response = requests.post(url, json=payload)
+        response = await self.client.post(url, json=payload)
         return response.json()
 
-    def get_updates(self, limit: int = 20) -> dict[str, Any]:
+    async def get_updates(self, limit: int = 20) -> dict[str, Any]:
         """Fetch recent updates for the bot."""
         url = f"{self.base_url}/getUpdates"
         params = {"limit": limit}
-        response = requests.get(url, params=params)
+        response = await self.client.get(url, params=params)
         return response.json()
 
 
+TOOLS: ToolRegistry[TelegramManager] = ToolRegistry(logger)
+
+
+@TOOLS.tool(
+    "telegram_send_message",
+    "Send a text message with optional hashtags and link preview control",
+    {
+        "text": {"type": "string", "description": "Message text"},
+        "hashtags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Optional hashtags"
+        },
+        "disable_preview": {
+            "type": "boolean",
+            "description": "Disable link preview (default: false)"
+        }
+    },
+    required=("text",),
+)
+async def telegram_send_message(manager: TelegramManager, arguments: dict[str, Any]) -> Any:
+    return await manager.send_message(arguments["text"], arguments.get("hashtags"), arguments.get("disable_preview", False))
+
+
+@TOOLS.tool(
+    "telegram_send_photo",
+    "Send a single photo with optional caption and hashtags",
+    {
+        "photo_url": {"type": "string", "description": "URL of the photo"},
+        "caption": {"type": "string", "description": "Optional caption"},
+        "hashtags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Optional hashtags"
+        }
+    },
+    required=("photo_url",),
+)
+async def telegram_send_photo(manager: TelegramManager, arguments: dict[str, Any]) -> Any:
+    return await manager.send_photo(arguments["photo_url"], arguments.get("caption"), arguments.get("hashtags"))
+
+
+@TOOLS.tool(
+    "telegram_send_media_group",
+    "Send multiple photos as carousel/album (2-10 images) with optional caption and hashtags",
+    {
+        "media_urls": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "List of image URLs (2-10 images)"
+        },
+        "caption": {"type": "string", "description": "Optional caption for the media group"},
+        "hashtags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Optional hashtags"
+        }
+    },
+    required=("media_urls",),
+)
+async def telegram_send_media_group(manager: TelegramManager, arguments: dict[str, Any]) -> Any:
+    return await manager.send_media_group(arguments["media_urls"], arguments.get("caption"), arguments.get("hashtags"))
+
+
+@TOOLS.tool(
+    "telegram_send_link",
+    "Send a link with preview enabled and optional hashtags",
+    {
+        "text": {"type": "string", "description": "Message text to accompany the link"},
+        "link_url": {"type": "string", "description": "URL to share"},
+        "hashtags": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Optional hashtags"
+        }
+    },
+    required=("text", "link_url"),
+)
+async def telegram_send_link(manager: TelegramManager, arguments: dict[str, Any]) -> Any:
+    return await manager.send_link_with_preview(arguments["text"], arguments["link_url"], arguments.get("hashtags"))
+
+
+@TOOLS.tool(
+    "telegram_get_updates",
+    "Fetch recent updates for the bot",
+    {
+        "limit": {
+            "type": "integer",
+            "description": "Number of updates to fetch (default 20)",
+        },
+    },
+)
+async def telegram_get_updates(manager: TelegramManager, arguments: dict[str, Any]) -> Any:
+    return await manager.get_updates(limit=arguments.get("limit", 20))
+
+
+@TOOLS.tool("telegram_get_metrics", METRICS_TOOL_DESCRIPTION, METRICS_TOOL_PROPERTIES)
+def telegram_get_metrics(manager: TelegramManager, arguments: dict[str, Any]) -> Any:
+    return METRICS.snapshot(arguments.get("kind"))
+
+
 async def main():
+    configure_process()
     logger.info("Starting Telegram MCP Server")
+
+    from mcp.server import NotificationOptions, Server
+    from mcp.server.models import InitializationOptions
+
     try:
         token, chat_id = load_telegram_config()
     except RuntimeError as exc:
@@ -159,143 +275,22 @@ async def main():
     manager = TelegramManager(bot_token=token, chat_id=chat_id)
     server = Server("telegram-manager")
 
-    @server.list_tools()
-    async def handle_list_tools() -> list[types.Tool]:
-        return [
-            types.Tool(
-                name="telegram_send_message",
-                description="Send a text message with optional hashtags and link preview control",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "text": {"type": "string", "description": "Message text"},
-                        "hashtags": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optional hashtags"
-                        },
-                        "disable_preview": {
-                            "type": "boolean",
-                            "description": "Disable link preview (default: false)"
-                        }
-                    },
-                    "required": ["text"],
-                },
-            ),
-            types.Tool(
-                name="telegram_send_photo",
-                description="Send a single photo with optional caption and hashtags",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "photo_url": {"type": "string", "description": "URL of the photo"},
-                        "caption": {"type": "string", "description": "Optional caption"},
-                        "hashtags": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optional hashtags"
-                        }
-                    },
-                    "required": ["photo_url"],
-                },
-            ),
-            types.Tool(
-                name="telegram_send_media_group",
-                description="Send multiple photos as carousel/album (2-10 images) with optional caption and hashtags",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "media_urls": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "List of image URLs (2-10 images)"
-                        },
-                        "caption": {"type": "string", "description": "Optional caption for the media group"},
-                        "hashtags": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optional hashtags"
-                        }
-                    },
-                    "required": ["media_urls"],
-                },
-            ),
-            types.Tool(
-                name="telegram_send_link",
-                description="Send a link with preview enabled and optional hashtags",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "text": {"type": "string", "description": "Message text to accompany the link"},
-                        "link_url": {"type": "string", "description": "URL to share"},
-                        "hashtags": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Optional hashtags"
-                        }
-                    },
-                    "required": ["text", "link_url"],
-                },
-            ),
-            types.Tool(
-                name="telegram_get_updates",
-                description="Fetch recent updates for the bot",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "limit": {
-                            "type": "integer",
-                            "description": "Number of updates to fetch (default 20)",
-                        },
-                    },
-                },
-            ),
-        ]
-
-    @server.call_tool()
-    async def handle_call_tool(
-        name: str, arguments: dict[str, Any] | None
-    ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-        try:
-            if name == "telegram_send_message":
-                hashtags = arguments.get("hashtags") if arguments else None
-                disable_preview = arguments.get("disable_preview", False) if arguments else False
-                result = manager.send_message(arguments["text"], hashtags, disable_preview)
-            elif name == "telegram_send_photo":
-                caption = arguments.get("caption") if arguments else None
-                hashtags = arguments.get("hashtags") if arguments else None
-                result = manager.send_photo(arguments["photo_url"], caption, hashtags)
-            elif name == "telegram_send_media_group":
-                caption = arguments.get("caption") if arguments else None
-                hashtags = arguments.get("hashtags") if arguments else None
-                result = manager.send_media_group(arguments["media_urls"], caption, hashtags)
-            elif name == "telegram_send_link":
-                hashtags = arguments.get("hashtags") if arguments else None
-                result = manager.send_link_with_preview(arguments["text"], arguments["link_url"], hashtags)
-            elif name == "telegram_get_updates":
-                limit = arguments.get("limit", 20) if arguments else 20
-                result = manager.get_updates(limit=limit)
-            else:
-                raise ValueError(f"Unknown tool: {name}")
-            return [types.TextContent(type="text", text=str(result))]
-        except Exception as exc:
-            logger.exception("Tool execution failed")
-            return [types.TextContent(type="text", text=f"Error: {exc}")]
-
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        logger.info("Telegram MCP Server running with stdio transport")
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="telegram",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
+    TOOLS.attach(server, manager)
+
+    if env_flag("TELEGRAM_PREWARM"):
+        start_prewarm(logger, "Telegram Bot API", manager.prewarm)
+
+    try:
+        await serve(server, InitializationOptions(
+            server_name="telegram",
+            server_version="0.1.0",
+            capabilities=server.get_capabilities(
+                notification_options=NotificationOptions(),
+                experimental_capabilities={},
             ),
-        )
+        ), logger)
+    finally:
+        await manager.aclose()
 
 
 def run():
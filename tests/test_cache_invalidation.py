@@ -0,0 +1,92 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from facebook_mcp_server.cache import TTLCache
+from facebook_mcp_server.graph import GRAPH_API_BASE_URL, GraphClient
+from facebook_mcp_server.server import FacebookManager
+
+
+class FakePage:
+    """One Page with one post whose comments are embedded in the posts listing, as the Graph API returns them."""
+
+    def __init__(self) -> None:
+        self.comments = {"c1": "first", "c2": "second"}
+        self.reads = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/", 2)[2]
+        if request.method == "POST" and not path:
+            return self.batch(request)
+        if request.method == "GET" and path == "page/posts":
+            self.reads += 1
+            comments = [{"id": comment_id, "message": message} for comment_id, message in self.comments.items()]
+            post = {"id": "page_1", "message": "hello", "comments": {"data": comments}}
+            return httpx.Response(200, json={"data": [post]})
+        if request.method == "DELETE" and path in self.comments:
+            del self.comments[path]
+            return httpx.Response(200, json={"success": True})
+        if request.method == "POST" and path.endswith("/comments"):
+            self.comments["c3"] = "reply"
+            return httpx.Response(200, json={"id": "c3"})
+        return httpx.Response(404, json={"error": {"message": f"Unknown path {path}", "code": 100}})
+
+    def batch(self, request: httpx.Request) -> httpx.Response:
+        results = []
+        for operation in json.loads(parse_qs(request.content.decode())["batch"][0]):
+            url = f"{GRAPH_API_BASE_URL.rsplit('/', 1)[0]}/{operation['relative_url']}"
+            response = self.handle(httpx.Request(operation["method"], url))
+            results.append({"code": response.status_code, "body": response.text})
+        return httpx.Response(200, json=results)
+
+
+def manager_for(page: FakePage) -> FacebookManager:
+    client = httpx.AsyncClient(base_url=GRAPH_API_BASE_URL, transport=httpx.MockTransport(page.handle))
+    graph = GraphClient(client=client, cache=TTLCache(maxsize=64, ttl=300))
+    return FacebookManager("page", "token", graph=graph)
+
+
+def comment_ids(result):
+    return [comment["id"] for post in result["data"] for comment in post["comments"]["data"]]
+
+
+@pytest.mark.parametrize("write, expected", [
+    (lambda manager: manager.delete_comment("c1"), ["c2"]),
+    (lambda manager: manager.bulk_delete_comments(["c1"]), ["c2"]),
+    (lambda manager: manager.reply_to_comment("page_1", "c1", "thanks"), ["c1", "c2", "c3"]),
+])
+def test_comment_write_refreshes_cached_posts_with_comments(write, expected):
+    page = FakePage()
+    manager = manager_for(page)
+
+    async def run():
+        assert comment_ids(await manager.get_page_posts_with_comments()) == ["c1", "c2"]
+        assert comment_ids(await manager.get_page_posts_with_comments()) == ["c1", "c2"]
+        assert page.reads == 1
+        await write(manager)
+        return await manager.get_page_posts_with_comments()
+
+    assert comment_ids(asyncio.run(run())) == expected
+    assert page.reads == 2
+
+
+def test_cached_reads_are_not_shared_between_page_tokens():
+    def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.params["access_token"] != "token_a":
+            return httpx.Response(400, json={"error": {"message": "Unsupported get request", "code": 100}})
+        return httpx.Response(200, json={"data": [{"id": "c1", "message": "only for Page A"}]})
+
+    client = httpx.AsyncClient(base_url=GRAPH_API_BASE_URL, transport=httpx.MockTransport(handle))
+    graph = GraphClient(client=client, cache=TTLCache(maxsize=64, ttl=300))
+    page_a = FacebookManager("a", "token_a", graph=graph)
+    page_b = FacebookManager("b", "token_b", graph=graph)
+
+    async def run():
+        return await page_a.get_post_comments("a_1"), await page_b.get_post_comments("a_1")
+
+    comments_a, comments_b = asyncio.run(run())
+    assert [comment["id"] for comment in comments_a["data"]] == ["c1"]
+    assert comments_b["error"]["message"] == "Unsupported get request"
@@ -0,0 +1,36 @@
+import asyncio
+
+import httpx
+
+from facebook_mcp_server.graph import GRAPH_API_BASE_URL, GraphClient
+from facebook_mcp_server.server import FacebookManager
+
+
+def test_timed_out_platforms_are_not_published_again_without_confirmation():
+    photos = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        photos.append(request.url.path)
+        # The first publish outlives the deadline, but Facebook still creates the post
+        if len(photos) == 1:
+            await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"id": f"photo_{len(photos)}", "post_id": f"page_{len(photos)}"})
+
+    client = httpx.AsyncClient(base_url=GRAPH_API_BASE_URL, transport=httpx.MockTransport(handle))
+    manager = FacebookManager("page", "token", graph=GraphClient(client=client), platform_timeouts={"facebook": 0.05})
+
+    async def publish(**kwargs):
+        return await manager.post_media("Hello", ["https://media.example.com/a.jpg"], "image", ["facebook"],
+                                        idempotency_key="launch", **kwargs)
+
+    async def run():
+        first = await publish()
+        await asyncio.sleep(0.3)
+        return first, await publish(), await publish(retry_unknown=True)
+
+    first, replay, confirmed = asyncio.run(run())
+    assert first["facebook"]["outcome"] == "unknown"
+    assert replay["facebook"]["outcome"] == "unknown"
+    assert replay["facebook"]["idempotent_replay"] is True
+    assert confirmed["facebook"]["id"] == "photo_2"
+    assert len(photos) == 2
@@ -0,0 +1,49 @@
+import asyncio
+import json
+import logging
+
+import httpx
+import pytest
+
+from social_mcp_common.http import create_http_client
+from social_mcp_common.registry import ToolRouter
+from social_mcp_common.upstream import endpoint_label
+from social_mcp_server import mount_platforms
+
+
+@pytest.mark.parametrize("url, label", [
+    ("https://graph.facebook.com/v18.0/1234567890/photos", ("graph", "/{id}/photos")),
+    ("https://graph.facebook.com/v18.0/123_456/comments?access_token=secret", ("graph", "/{id}/comments")),
+    ("https://graph-video.facebook.com/v18.0/1234567890/videos", ("graph", "/{id}/videos")),
+    ("https://graph.facebook.com/v18.0/", ("graph", "/")),
+    ("https://api.telegram.org/bot123456:ABC-secret/sendMediaGroup", ("telegram", "sendMediaGroup")),
+    ("https://api.telegram.org/", ("telegram", "/")),
+    ("https://api.linkedin.com/v2/ugcPosts", ("linkedin", "ugcPosts")),
+    ("https://api.linkedin.com/v2/assets?action=registerUpload", ("linkedin", "assets?action=registerUpload")),
+    ("https://api.linkedin.com/v2/socialActions/urn:li:share:6844785523593134080/comments", ("linkedin", "socialActions/{id}/comments")),
+    ("https://media.example.com/photo.jpg", ("media", "download")),
+])
+def test_endpoint_label_drops_identifiers_and_tokens(url, label):
+    assert endpoint_label(httpx.URL(url)) == label
+
+
+def test_combined_server_lists_one_get_metrics(monkeypatch):
+    monkeypatch.setenv("LINKEDIN_ACCESS_TOKEN", "token")
+    monkeypatch.setenv("LINKEDIN_ORGANIZATION_ID", "1")
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "123:abc")
+    monkeypatch.setenv("TELEGRAM_CHAT_ID", "1")
+
+    async def run():
+        client = create_http_client()
+        router = ToolRouter(logging.getLogger("test"))
+        managers = [manager for _, manager, _ in mount_platforms(router, ["linkedin", "telegram"], client)]
+        result = await router.call("get_metrics", {"kind": "tool"})
+        for manager in managers:
+            await manager.aclose()
+        await client.aclose()
+        return router.names(), result
+
+    names, result = asyncio.run(run())
+    assert [name for name in names if name.endswith("get_metrics")] == ["get_metrics"]
+    assert {name.split("_", 1)[0] for name in names if name != "get_metrics"} == {"linkedin", "telegram"}
+    assert "tool" in json.loads(result[0].text)
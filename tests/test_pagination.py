@@ -0,0 +1,127 @@
+import asyncio
+import json
+from urllib.parse import parse_qs, urlencode
+
+import httpx
+
+from facebook_mcp_server.graph import GRAPH_API_BASE_URL, TIME_CURSOR_PREFIX, GraphClient
+from facebook_mcp_server.server import FacebookManager
+
+
+class FakeTimeline:
+    """Page posts listed with time-based paging, as Graph does for since/until queries: no cursors, only a next URL."""
+
+    def __init__(self, count: int) -> None:
+        self.posts = [{"id": f"page_{n}", "created_time": 1000 - n} for n in range(count)]
+        self.requests: list[httpx.QueryParams] = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        query = request.url.params
+        self.requests.append(query)
+        if query.get("access_token") != "token":
+            return httpx.Response(400, json={"error": {"message": "An active access token must be used", "code": 2500}})
+        since = int(query.get("since", 0))
+        until = int(query.get("until", 10 ** 9))
+        limit = int(query.get("limit", 25))
+        matching = [post for post in self.posts if since <= post["created_time"] < until]
+        body = {"data": matching[:limit]}
+        if len(matching) > limit:
+            last = matching[limit - 1]["created_time"]
+            next_query = {key: value for key, value in query.items() if key != "until"}
+            next_query.update({"until": last, "__paging_token": f"enc_{last}"})
+            body["paging"] = {"next": f"{GRAPH_API_BASE_URL}/page/posts?{urlencode(next_query)}"}
+        return httpx.Response(200, json=body)
+
+
+def manager_for(timeline: FakeTimeline) -> FacebookManager:
+    client = httpx.AsyncClient(base_url=GRAPH_API_BASE_URL, transport=httpx.MockTransport(timeline.handle))
+    return FacebookManager("page", "token", graph=GraphClient(client=client))
+
+
+def post_ids(result):
+    return [post["id"] for post in result["data"]]
+
+
+def test_time_based_pages_keep_the_query():
+    timeline = FakeTimeline(5)
+    result = asyncio.run(manager_for(timeline).get_page_posts(limit=2, max_items=10, since="990", until="2000"))
+
+    assert "error" not in result
+    assert post_ids(result) == [f"page_{n}" for n in range(5)]
+    assert result["next_cursor"] is None
+    assert len(timeline.requests) == 3
+    for query in timeline.requests:
+        assert query["access_token"] == "token"
+        assert query["since"] == "990"
+        assert "fields" in query
+    assert timeline.requests[1]["__paging_token"] == "enc_999"
+    assert timeline.requests[2]["limit"] == "2"
+
+
+def test_time_based_pages_resume_from_next_cursor():
+    timeline = FakeTimeline(5)
+    manager = manager_for(timeline)
+
+    async def run():
+        first = await manager.get_page_posts(limit=2, max_items=2, since="990")
+        second = await manager.get_page_posts(limit=2, max_items=2, since="990", after=first["next_cursor"])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert post_ids(first) == ["page_0", "page_1"]
+    assert first["next_cursor"].startswith(TIME_CURSOR_PREFIX)
+    assert post_ids(second) == ["page_2", "page_3"]
+    assert second["next_cursor"].startswith(TIME_CURSOR_PREFIX)
+    assert "after" not in timeline.requests[-1]
+
+
+def test_batched_comments_come_back_as_pages_without_paging_urls():
+    requested = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        results = []
+        for operation in json.loads(parse_qs(request.content.decode())["batch"][0]):
+            requested.append(operation["relative_url"])
+            post_id = operation["relative_url"].split("/")[1]
+            if post_id == "missing":
+                body = {"error": {"message": "Unsupported get request", "code": 100}}
+            else:
+                next_url = f"{GRAPH_API_BASE_URL}/{post_id}/comments?access_token=token&after=c2"
+                body = {"data": [{"id": "c1"}, {"id": "c2"}], "paging": {"cursors": {"after": "c2"}, "next": next_url}}
+            results.append({"code": 200, "body": json.dumps(body)})
+        return httpx.Response(200, json=results)
+
+    client = httpx.AsyncClient(base_url=GRAPH_API_BASE_URL, transport=httpx.MockTransport(handle))
+    manager = FacebookManager("page", "token", graph=GraphClient(client=client))
+    result = asyncio.run(manager.get_comments_for_posts(["page_1", "missing"], limit=2, fields=["id", "like_count"]))
+
+    assert result == {
+        "page_1": {"data": [{"id": "c1"}, {"id": "c2"}], "next_cursor": "c2"},
+        "missing": {"error": {"message": "Unsupported get request", "code": 100}},
+    }
+    assert "token" not in json.dumps(result)
+    assert parse_qs(requested[0].split("?")[1]) == {"fields": ["id,like_count"], "limit": ["2"]}
+
+
+def test_posts_with_comments_keep_the_post_id_when_a_nested_field_selects_id():
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url)
+        if request.url.path.endswith("/page/posts"):
+            fields = request.url.params["fields"]
+            post = {"message": "hello", "comments": {
+                "data": [{"id": "c1"}],
+                "paging": {"cursors": {"after": "c1"}, "next": f"{GRAPH_API_BASE_URL}/page_1/comments?after=c1"},
+            }}
+            if fields.startswith("id,"):
+                post["id"] = "page_1"
+            return httpx.Response(200, json={"data": [post]})
+        return httpx.Response(200, json={"data": [{"id": "c2"}]})
+
+    client = httpx.AsyncClient(base_url=GRAPH_API_BASE_URL, transport=httpx.MockTransport(handle))
+    manager = FacebookManager("page", "token", graph=GraphClient(client=client))
+    result = asyncio.run(manager.get_page_posts_with_comments(max_comments=5, fields=["message", "from{name,id,picture}"]))
+
+    assert [comment["id"] for comment in result["data"][0]["comments"]["data"]] == ["c1", "c2"]
+    assert requests[1].path.endswith("/page_1/comments")
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import httpx
+
+from facebook_mcp_server.graph import GRAPH_API_BASE_URL, GraphClient
+from facebook_mcp_server.ratelimit import UsageThrottle
+from facebook_mcp_server.retry import RetryPolicy
+
+
+THROTTLED = {"error": {"message": "Application request limit reached", "code": 4}}
+
+
+def test_acquire_fails_fast_beyond_max_wait():
+    throttle = UsageThrottle()
+    throttle.observe({}, THROTTLED)
+
+    async def run():
+        started = time.monotonic()
+        assert await throttle.acquire(max_wait=1.0) is None
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 0.1
+    assert throttle.rejection()["error"]["code"] == 4
+
+
+def test_waiters_do_not_block_each_other_while_sleeping():
+    throttle = UsageThrottle(cooldown=0.2)
+    throttle.observe({}, THROTTLED)
+
+    async def run():
+        started = time.monotonic()
+        # The second caller can only wait briefly; it is refused without queueing behind the first
+        waiting = asyncio.create_task(throttle.acquire(max_wait=5.0))
+        await asyncio.sleep(0)
+        assert await throttle.acquire(max_wait=0.05) is None
+        refused_after = time.monotonic() - started
+        assert await waiting >= 0.15
+        return refused_after
+
+    assert asyncio.run(run()) < 0.1
+
+
+def test_graph_request_returns_rate_limit_error_during_long_lockout():
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        headers = {"x-business-use-case-usage": '{"1": [{"call_count": 100, "estimated_time_to_regain_access": 30}]}'}
+        return httpx.Response(400, headers=headers, json={"error": {"message": "Page request limit reached", "code": 32}})
+
+    client = httpx.AsyncClient(base_url=GRAPH_API_BASE_URL, transport=httpx.MockTransport(handle))
+    graph = GraphClient(client=client, throttle=UsageThrottle(max_wait=5.0))
+
+    async def run():
+        first = await graph.get("/1/posts", params={"access_token": "token"}, cache=False)
+        started = time.monotonic()
+        second = await graph.get("/1/feed", params={"access_token": "token"}, cache=False)
+        return first, second, time.monotonic() - started
+
+    first, second, elapsed = asyncio.run(run())
+    assert first["error"]["code"] == 32
+    assert second["error"]["code"] == 32 and second["error"]["is_transient"]
+    assert elapsed < 0.1
+    assert len(requests) == 1
+
+
+def test_page_limit_only_pauses_that_page():
+    throttle = UsageThrottle()
+    throttle.observe({"x-page-usage": '{"call_count": 100}'}, {"error": {"message": "Page limit", "code": 32}}, "token-a")
+
+    async def run():
+        return await throttle.acquire("token-a", max_wait=1.0), await throttle.acquire("token-b", max_wait=1.0)
+
+    page_a, page_b = asyncio.run(run())
+    assert page_a is None
+    assert page_b is not None and page_b < 0.1
+    assert throttle.status({"a": "token-a"})["pages"]["a"]["blocked_for_seconds"] > 0
+    assert throttle.status()["blocked_for_seconds"] == 0
+
+
+def test_app_limit_pauses_every_page():
+    throttle = UsageThrottle()
+    throttle.observe({"x-app-usage": '{"call_count": 100}'}, THROTTLED, "token-a")
+
+    async def run():
+        return await throttle.acquire("token-b", max_wait=1.0)
+
+    assert asyncio.run(run()) is None
+
+
+def test_throttled_responses_back_off_without_a_cooldown():
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(400, json=THROTTLED)
+
+    client = httpx.AsyncClient(base_url=GRAPH_API_BASE_URL, transport=httpx.MockTransport(handle))
+    graph = GraphClient(client=client, throttle=UsageThrottle(cooldown=0),
+                        retry=RetryPolicy(max_attempts=3, base_delay=0.05, deadline=5.0))
+
+    async def run():
+        started = time.monotonic()
+        result = await graph.get("/1/posts", params={"access_token": "token"}, cache=False)
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(run())
+    assert result["error"]["code"] == 4
+    assert len(requests) == 3
+    assert elapsed >= 0.1
@@ -0,0 +1,63 @@
+import asyncio
+import logging
+
+import pytest
+
+from facebook_mcp_server.tools import TOOLS
+from social_mcp_common.registry import ToolArgumentError, ToolRegistry, compile_schema
+
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "post_id": {"type": "string"},
+        "limit": {"type": "integer"},
+        "note": {"type": ["string", "null"]},
+        "timeout": {"type": "number", "default": 30},
+    },
+    "required": ["post_id"],
+    "additionalProperties": False,
+}
+
+
+def call(name, arguments, context=None):
+    """Text of the result of an MCP ``call_tool`` on the Facebook tools; validation runs before the context is used."""
+    return asyncio.run(TOOLS.call(name, context, arguments))[0].text
+
+
+@pytest.mark.parametrize("arguments, message", [
+    ({"post_id": None}, "arguments.post_id must be of type string, got NoneType"),
+    ({"post_id": "1", "limit": None}, "arguments.limit must be of type integer, got NoneType"),
+    ({"post_id": 1}, "arguments.post_id must be of type string, got int"),
+    ({"post_id": "1", "limit": "10"}, "arguments.limit must be of type integer, got str"),
+    ({}, "arguments.post_id is required"),
+    ({"post_id": "1", "colour": "red"}, "arguments.colour is not a recognised argument"),
+])
+def test_rejects_invalid_arguments(arguments, message):
+    with pytest.raises(ToolArgumentError, match=message.replace(".", r"\.")):
+        compile_schema(SCHEMA)(arguments, "arguments")
+
+
+def test_accepts_null_when_nullable_or_defaulted():
+    compile_schema(SCHEMA)({"post_id": "1", "note": None, "timeout": None}, "arguments")
+
+
+def test_null_defaulted_argument_reaches_handler_as_absent():
+    registry = ToolRegistry(logging.getLogger("test"))
+
+    @registry.tool("wait", "Waits.", {"timeout": {"type": "number", "default": 30}})
+    def wait(context, arguments):
+        return arguments.get("timeout", 30)
+
+    assert asyncio.run(registry.dispatch("wait", None, {"timeout": None})) == 30
+
+
+@pytest.mark.parametrize("name, arguments, message", [
+    ("get_post_comments", {"post_id": None}, "Error: arguments.post_id must be of type string, got NoneType"),
+    ("get_post_comments", {"post_id": 123}, "Error: arguments.post_id must be of type string, got int"),
+    ("get_post_comments", {}, "Error: arguments.post_id is required"),
+    ("get_page_posts", {"limit": None}, "Error: arguments.limit must be of type integer, got NoneType"),
+    ("wait_job", {"job_id": "abc", "timeout": None}, "Error: arguments.timeout must be of type number, got NoneType"),
+])
+def test_tool_call_reports_invalid_arguments(name, arguments, message):
+    assert call(name, arguments) == message
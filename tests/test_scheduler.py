@@ -0,0 +1,138 @@
+import asyncio
+import sqlite3
+import time
+
+from facebook_mcp_server.scheduler import LEASE_SECONDS, PostScheduler, ScheduledPostQueue
+
+
+class FakeManager:
+    def __init__(self, page_id: str) -> None:
+        self.page_id = page_id
+        self.posts: list[str] = []
+
+    async def post_to_facebook(self, message: str, idempotency_key: str = None) -> dict:
+        self.posts.append(message)
+        return {"id": f"{self.page_id}_{len(self.posts)}"}
+
+
+def scheduler_for(path, managers, page_ids=None):
+    async def resolve(page_id):
+        return managers[page_id]
+
+    async def managed():
+        return list(managers) if page_ids is None else page_ids()
+
+    return PostScheduler(resolve, managed, str(path), poll_interval=0.05)
+
+
+async def until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not await predicate():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.02)
+
+
+def test_only_publishes_jobs_of_managed_pages(tmp_path):
+    page = FakeManager("1")
+    scheduler = scheduler_for(tmp_path / "queue.sqlite3", {"1": page})
+
+    async def run():
+        scheduler.start()
+        ours = await scheduler.schedule("1", "post", {"message": "ours"}, time.time())
+        theirs = await scheduler.schedule("2", "post", {"message": "theirs"}, time.time())
+
+        async def published():
+            return (await scheduler.get(ours["id"]))["status"] == "published"
+
+        await until(published)
+        await asyncio.sleep(0.1)
+        status = (await scheduler.get(theirs["id"]))["status"]
+        await scheduler.aclose()
+        return status
+
+    assert asyncio.run(run()) == "scheduled"
+    assert page.posts == ["ours"]
+
+
+def test_publishes_jobs_queued_by_another_process_after_start(tmp_path):
+    path = tmp_path / "queue.sqlite3"
+    page = FakeManager("1")
+    scheduler = scheduler_for(path, {"1": page})
+
+    async def run():
+        scheduler.start()
+        await asyncio.sleep(0.1)
+        assert not path.exists()
+        # A command-line run creates the queue and adds a due post
+        other = ScheduledPostQueue(str(path))
+        job = other.add("1", "post", {"message": "queued elsewhere"}, time.time())
+        other.close()
+
+        async def published():
+            return (await scheduler.get(job["id"]))["status"] == "published"
+
+        await until(published)
+        await scheduler.aclose()
+
+    asyncio.run(run())
+    assert page.posts == ["queued elsewhere"]
+
+
+def test_only_stale_leases_are_failed(tmp_path):
+    path = tmp_path / "queue.sqlite3"
+    queue = ScheduledPostQueue(str(path))
+    live = queue.add("1", "post", {"message": "live"}, time.time())
+    stale = queue.add("1", "post", {"message": "stale"}, time.time() + 1)
+    now = time.time()
+    assert [job["id"] for job in queue.claim_due("other-process", ["1"], now, 1)] == [live["id"]]
+    assert [job["id"] for job in queue.claim_due("dead-process", ["1"], now + 1, 1)] == [stale["id"]]
+
+    assert queue.expire_leases(now + 1 + LEASE_SECONDS / 2) == 0
+    queue.renew("other-process", now + LEASE_SECONDS)
+    assert queue.expire_leases(now + LEASE_SECONDS + 2) == 1
+    assert queue.get(live["id"])["status"] == "running"
+    assert queue.get(stale["id"])["status"] == "failed"
+    queue.close()
+
+
+def test_dispatch_errors_are_logged_and_retried(tmp_path, caplog):
+    page = FakeManager("1")
+    failures = [RuntimeError("directory unavailable")]
+
+    def page_ids():
+        if failures:
+            raise failures.pop()
+        return ["1"]
+
+    scheduler = scheduler_for(tmp_path / "queue.sqlite3", {"1": page}, page_ids)
+
+    async def run():
+        job = await scheduler.schedule("1", "post", {"message": "hello"}, time.time())
+        scheduler.start()
+
+        async def published():
+            return (await scheduler.get(job["id"]))["status"] == "published"
+
+        await until(published)
+        await scheduler.aclose()
+
+    asyncio.run(run())
+    assert "Scheduled post dispatch failed" in caplog.text
+    assert page.posts == ["hello"]
+
+
+def test_queues_created_before_leases_are_upgraded(tmp_path):
+    path = tmp_path / "queue.sqlite3"
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE scheduled_posts (id TEXT PRIMARY KEY, page_id TEXT NOT NULL, kind TEXT NOT NULL,"
+        " payload TEXT NOT NULL, publish_at REAL NOT NULL, status TEXT NOT NULL, result TEXT, error TEXT,"
+        " created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+    )
+    db.execute("INSERT INTO scheduled_posts VALUES ('old', '1', 'post', '{}', 0, 'running', NULL, NULL, 0, 0)")
+    db.commit()
+    db.close()
+
+    queue = ScheduledPostQueue(str(path))
+    assert queue.expire_leases(time.time()) == 1
+    queue.close()
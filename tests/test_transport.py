@@ -0,0 +1,56 @@
+import logging
+
+import pytest
+from mcp.server import Server
+from starlette.testclient import TestClient
+
+from social_mcp_common.transport import auth_token, is_loopback, sse_app
+
+
+@pytest.mark.parametrize("host, loopback", [
+    ("127.0.0.1", True), ("localhost", True), ("::1", True),
+    ("0.0.0.0", False), ("::", False), ("192.168.1.10", False), ("example.com", False),
+])
+def test_is_loopback(host, loopback):
+    assert is_loopback(host) is loopback
+
+
+def test_non_loopback_host_requires_token(monkeypatch):
+    monkeypatch.delenv("MCP_AUTH_TOKEN", raising=False)
+    assert auth_token("127.0.0.1") is None
+    with pytest.raises(RuntimeError, match="MCP_AUTH_TOKEN"):
+        auth_token("0.0.0.0")
+    monkeypatch.setenv("MCP_AUTH_TOKEN", "secret")
+    assert auth_token("0.0.0.0") == "secret"
+
+
+def test_sse_endpoints_require_bearer_token():
+    app = sse_app(Server("test"), None, logging.getLogger("test"), max_sessions=1, token="secret")
+    client = TestClient(app)
+
+    assert client.get("/health").status_code == 200
+    for path in ("/metrics", "/sse", "/messages/?session_id=0"):
+        response = client.post(path, json={}) if path.startswith("/messages/") else client.get(path)
+        assert response.status_code == 401
+        assert response.headers["www-authenticate"] == "Bearer"
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer secret"}).status_code == 200
+
+
+@pytest.mark.parametrize("headers, status", [
+    ({"Host": "127.0.0.1:8000"}, 200),
+    ({"Host": "localhost:8000"}, 200),
+    ({"Host": "[::1]:8000"}, 200),
+    ({"Host": "localhost:8000", "Origin": "http://localhost:3000"}, 200),
+    ({"Host": "attacker.example:8000"}, 403),
+    ({"Host": "localhost:9999"}, 403),
+    ({"Host": "localhost:8000", "Origin": "http://attacker.example"}, 403),
+    ({"Host": "localhost:8000", "Origin": "null"}, 403),
+])
+def test_sse_without_token_only_serves_loopback_names(headers, status):
+    app = sse_app(Server("test"), None, logging.getLogger("test"), max_sessions=1, port=8000)
+    client = TestClient(app)
+
+    assert client.get("/metrics", headers=headers).status_code == status
+    if status == 403:
+        assert client.post("/messages/?session_id=0", json={}, headers=headers).status_code == 403
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import re
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from facebook_mcp_server.graph import GraphClient
+from facebook_mcp_server.server import FacebookManager
+from facebook_mcp_server.video_upload import ChunkedVideoUploader, local_video_path
+
+
+# No CR/LF pair or "--" in the video, so the chunks can be read back out of the multipart bodies
+VIDEO = bytes(range(256)) * 16
+
+
+def form(request: httpx.Request) -> dict[str, str]:
+    body = request.content.decode("latin-1")
+    if not request.headers["content-type"].startswith("multipart/"):
+        return {key: values[0] for key, values in parse_qs(body).items()}
+    return dict(re.findall(r'name="([^"]+)"[^\r]*\r\n(?:[^\r]+\r\n)*\r\n(.*?)\r\n--', body, re.S))
+
+
+class FakeUploadSessions:
+    """Graph's resumable video uploads: every response names the byte range to send next."""
+
+    def __init__(self, chunk_sizes=(1024,), delay=0.0, fail_at=None) -> None:
+        # Successive chunk sizes asked for; the last one repeats
+        self.chunk_sizes = chunk_sizes
+        self.delay = delay
+        # The transfer at this offset is rejected once
+        self.fail_at = fail_at
+        self.sessions: dict[str, dict] = {}
+        self.open = 0
+        self.most_open = 0
+
+    def next_range(self, session: dict, start: int) -> dict[str, str]:
+        size = self.chunk_sizes[min(len(session["ranges"]), len(self.chunk_sizes) - 1)]
+        return {"start_offset": str(start), "end_offset": str(min(start + size, session["size"]))}
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.delay)
+        fields = form(request)
+        if fields.get("upload_phase") == "start":
+            session_id = f"s{len(self.sessions) + 1}"
+            session = self.sessions[session_id] = {"size": int(fields["file_size"]), "received": bytearray(), "ranges": []}
+            self.open += 1
+            self.most_open = max(self.most_open, self.open)
+            return httpx.Response(200, json={"upload_session_id": session_id, "video_id": session_id, **self.next_range(session, 0)})
+        session = self.sessions[fields["upload_session_id"]]
+        if fields.get("upload_phase") == "transfer":
+            start = int(fields["start_offset"])
+            if start == self.fail_at:
+                self.fail_at = None
+                return httpx.Response(400, json={"error": {"message": "Chunk rejected", "code": 100}})
+            chunk = fields["video_file_chunk"].encode("latin-1")
+            session["ranges"].append((start, start + len(chunk)))
+            session["received"][start:start + len(chunk)] = chunk
+            return httpx.Response(200, json=self.next_range(session, start + len(chunk)))
+        self.open -= 1
+        return httpx.Response(200, json={"success": True})
+
+
+def uploader_for(sessions: FakeUploadSessions, upload_dir, tmp_path) -> ChunkedVideoUploader:
+    graph = GraphClient(client=httpx.AsyncClient(transport=httpx.MockTransport(sessions.handle)), cache=None)
+    return ChunkedVideoUploader(graph, state_dir=str(tmp_path / "state"), source_dir=str(upload_dir))
+
+
+@pytest.fixture
+def upload_dir(tmp_path):
+    media = tmp_path / "media"
+    media.mkdir()
+    (media / "clip.mp4").write_bytes(VIDEO)
+    (tmp_path / "secret.txt").write_text("secret")
+    os.symlink(tmp_path / "secret.txt", media / "escape.mp4")
+    return media
+
+
+def test_accepts_files_inside_the_upload_dir(upload_dir):
+    expected = os.path.realpath(upload_dir / "clip.mp4")
+    assert local_video_path("clip.mp4", str(upload_dir)) == expected
+    assert local_video_path(str(upload_dir / "clip.mp4"), str(upload_dir)) == expected
+    assert local_video_path(f"file://{upload_dir}/clip.mp4", str(upload_dir)) == expected
+
+
+@pytest.mark.parametrize("media_url", ["../secret.txt", "escape.mp4", "/etc/passwd", "file:///etc/passwd", "missing.mp4", "."])
+def test_refuses_files_outside_the_upload_dir(upload_dir, media_url):
+    with pytest.raises(ValueError, match="FACEBOOK_UPLOAD_DIR"):
+        local_video_path(media_url, str(upload_dir))
+
+
+def test_refuses_local_files_without_an_upload_dir(upload_dir):
+    with pytest.raises(ValueError, match="disabled"):
+        local_video_path(str(upload_dir / "clip.mp4"), None)
+
+
+def test_sends_the_ranges_facebook_asks_for(upload_dir, tmp_path):
+    sessions = FakeUploadSessions(chunk_sizes=(1000, 1500, 700))
+    result = asyncio.run(uploader_for(sessions, upload_dir, tmp_path).upload("page", "token", "clip.mp4", "Clip"))
+
+    assert result == {"id": "s1", "success": True, "file_size": 4096, "chunks": 5, "resumed": False}
+    assert sessions.sessions["s1"]["ranges"] == [(0, 1000), (1000, 2500), (2500, 3200), (3200, 3900), (3900, 4096)]
+    assert sessions.sessions["s1"]["received"] == VIDEO
+
+
+def test_resumes_from_the_saved_range(upload_dir, tmp_path):
+    sessions = FakeUploadSessions(chunk_sizes=(1000,), fail_at=2000)
+    uploader = uploader_for(sessions, upload_dir, tmp_path)
+    with pytest.raises(RuntimeError, match="resumes"):
+        asyncio.run(uploader.upload("page", "token", "clip.mp4", "Clip"))
+
+    result = asyncio.run(uploader.upload("page", "token", "clip.mp4", "Clip"))
+    assert result == {"id": "s1", "success": True, "file_size": 4096, "chunks": 5, "resumed": True}
+    assert list(sessions.sessions) == ["s1"]
+    assert sessions.sessions["s1"]["ranges"] == [(0, 1000), (1000, 2000), (2000, 3000), (3000, 4000), (4000, 4096)]
+    assert sessions.sessions["s1"]["received"] == VIDEO
+
+
+def test_local_upload_is_not_cut_off_by_the_publish_deadline(upload_dir, tmp_path, monkeypatch):
+    monkeypatch.setenv("FACEBOOK_UPLOAD_DIR", str(upload_dir))
+    monkeypatch.setenv("FACEBOOK_UPLOAD_STATE_DIR", str(tmp_path / "state"))
+    # Each chunk is quick, but the whole upload takes longer than the deadline
+    sessions = FakeUploadSessions(delay=0.05)
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if "file_url" in request.url.params:
+            await asyncio.sleep(0.3)
+            return httpx.Response(200, json={"id": "remote"})
+        return await sessions.handle(request)
+
+    graph = GraphClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handle)), cache=None)
+    manager = FacebookManager("page", "token", graph=graph, platform_timeouts={"facebook": 0.1})
+    result = asyncio.run(manager.post_media("Clip", ["clip.mp4"], "video", ["facebook"]))
+    assert result["facebook"] == {"id": "s1", "success": True, "file_size": 4096, "chunks": 4, "resumed": False}
+
+    # Remote media keeps the deadline
+    result = asyncio.run(manager.post_media("Clip", ["https://media.example.com/clip.mp4"], "video", ["facebook"]))
+    assert "timed out" in result["facebook"]["error"]
+
+
+def test_concurrent_uploads_of_the_same_file_run_one_after_the_other(upload_dir, tmp_path):
+    sessions = FakeUploadSessions(delay=0.01)
+    uploader = uploader_for(sessions, upload_dir, tmp_path)
+
+    async def run():
+        return await asyncio.gather(*(uploader.upload("page", "token", "clip.mp4", "Clip") for _ in range(2)))
+
+    results = asyncio.run(run())
+    assert [result["id"] for result in results] == ["s1", "s2"]
+    assert all(result["success"] for result in results)
+    assert sessions.most_open == 1
+    assert not os.listdir(tmp_path / "state")